@@ -0,0 +1,108 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from loguru import logger
+
+
+def percentile(values, fraction: float) -> float:
+    """Nearest-rank percentile of a sequence of numbers (0.0 for an empty sequence)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+class BackgroundJobQueue:
+    """
+    Bounded queue of fire-and-forget coroutines run by a fixed number of workers.
+
+    `submit()` never awaits: it enqueues the job or returns False when the queue is
+    full, so request handlers and tool calls can hand work off without delaying the
+    conversation. Queue depth and queue-wait/run latencies are tracked for /metrics.
+    """
+
+    def __init__(self, name: str, concurrency: int = 4, max_queue_size: int = 100, latency_window: int = 200):
+        self.name = name
+        self.concurrency = concurrency
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._workers: List[asyncio.Task] = []
+        self._running = 0
+
+        # Metrics
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._wait_times: Deque[float] = deque(maxlen=latency_window)
+        self._run_times: Deque[float] = deque(maxlen=latency_window)
+
+    def start(self):
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker(), name=f"{self.name}-worker-{i}")
+                for i in range(self.concurrency)
+            ]
+            logger.info(f"Background job queue '{self.name}' started with {self.concurrency} worker(s)")
+
+    async def stop(self, drain_timeout: float = 5.0):
+        """Give queued jobs a chance to finish, then cancel the workers"""
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Background job queue '{self.name}' stopped with {self._queue.qsize()} job(s) pending")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, job: Callable[..., Awaitable[Any]], *args, **kwargs) -> bool:
+        """Enqueue `job(*args, **kwargs)`. Returns False if the queue is full."""
+        if not self._workers:
+            self.start()
+        try:
+            self._queue.put_nowait((time.monotonic(), job, args, kwargs))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            logger.warning(f"Background job queue '{self.name}' is full, rejecting job")
+            return False
+        self.submitted += 1
+        return True
+
+    async def _worker(self):
+        while True:
+            enqueued_at, job, args, kwargs = await self._queue.get()
+            started_at = time.monotonic()
+            self._wait_times.append(started_at - enqueued_at)
+            self._running += 1
+            try:
+                await job(*args, **kwargs)
+                self.completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Background job in '{self.name}' failed: {e}", exc_info=True)
+            finally:
+                self._running -= 1
+                self._run_times.append(time.monotonic() - started_at)
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        return {
+            "depth": self._queue.qsize(),
+            "running": self._running,
+            "concurrency": self.concurrency,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "wait_p50_ms": round(percentile(self._wait_times, 0.5) * 1000, 1),
+            "wait_p95_ms": round(percentile(self._wait_times, 0.95) * 1000, 1),
+            "run_p50_ms": round(percentile(self._run_times, 0.5) * 1000, 1),
+            "run_p95_ms": round(percentile(self._run_times, 0.95) * 1000, 1),
+        }
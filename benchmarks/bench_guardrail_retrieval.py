@@ -0,0 +1,88 @@
+"""
+Compare guardrail injection modes as the guardrail list grows.
+
+For each guardrail count this prints the system instruction size in "prompt" mode
+(every pair in the prompt) and "retrieval" mode (a short note; matching pairs are
+injected per turn), the retrieval index build time, and the per-utterance
+retrieval latency and injected size. No external services needed.
+
+Time-to-first-audio itself can only be measured against a live Gemini session:
+enable_metrics is on in run_bot, so compare the TTFB metrics pipecat logs for
+calls made with GUARDRAIL_INJECTION_MODE=prompt and =retrieval.
+
+    python benchmarks/bench_guardrail_retrieval.py
+    python benchmarks/bench_guardrail_retrieval.py --guardrails 0 100 1000 10000 --queries 500
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from guardrail_retrieval import GuardrailRetriever, format_guardrail_guidance  # noqa: E402
+from guardrails import GuardrailStore  # noqa: E402
+from prompt_builder import PromptAssembler, estimate_tokens  # noqa: E402
+from system_prompt import SYSTEM_PROMPT  # noqa: E402
+
+TOPICS = ["fees", "hostel", "scholarship", "placement", "admission", "exam", "transport", "library", "canteen", "sports"]
+PROGRAMS = ["B.Tech CSE", "B.Tech ECE", "MBA", "M.Tech", "BBA", "B.Sc Physics", "MCA", "B.Des", "LLB", "B.Com"]
+
+
+def make_guardrails(count, rng):
+    return [
+        {
+            "question": f"What is the {rng.choice(TOPICS)} policy for {rng.choice(PROGRAMS)} students in batch {i}?",
+            "answer": f"For batch {i}, explain the policy briefly and offer to send the official brochure on WhatsApp.",
+        }
+        for i in range(count)
+    ]
+
+
+def make_queries(count, rng):
+    return [f"Can you tell me about the {rng.choice(TOPICS)} for {rng.choice(PROGRAMS)}?" for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guardrails", type=int, nargs="+", default=[0, 100, 1000, 10000])
+    parser.add_argument("--queries", type=int, default=200, help="User utterances to retrieve for")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--max-tokens", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    queries = make_queries(args.queries, rng)
+
+    print(
+        f"{'guardrails':>10} {'prompt-mode tok':>16} {'retrieval-mode tok':>19} {'index build ms':>15}"
+        f" {'retrieve p50 ms':>16} {'retrieve p95 ms':>16} {'injected tok/turn':>18}"
+    )
+    for count in args.guardrails:
+        store = GuardrailStore(make_guardrails(count, rng))
+        assembler = PromptAssembler(SYSTEM_PROMPT, lambda: store.snapshot)
+        prompt_tokens = estimate_tokens(assembler.build(include_guardrails=True))
+        retrieval_tokens = estimate_tokens(assembler.build(include_guardrails=False))
+
+        retriever = GuardrailRetriever(lambda: store.snapshot, top_k=args.top_k, max_tokens=args.max_tokens)
+        retriever.refresh()
+
+        timings, injected = [], []
+        for query in queries:
+            started = time.perf_counter()
+            matches = retriever.retrieve(query)
+            timings.append((time.perf_counter() - started) * 1000)
+            injected.append(estimate_tokens(format_guardrail_guidance(matches)) if matches else 0)
+        timings.sort()
+
+        print(
+            f"{count:>10} {prompt_tokens:>16} {retrieval_tokens:>19} {retriever.last_build_ms:>15.1f}"
+            f" {statistics.median(timings):>16.3f} {timings[int(len(timings) * 0.95) - 1]:>16.3f}"
+            f" {statistics.mean(injected):>18.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compare answering FAQs from the system instruction vs the search_knowledge_base tool.
+
+Prints the static system instruction size with the knowledge files inlined (how
+the FAQ used to ship) and without them (current), then the knowledge base index
+build time and per-query search latency. --copies N indexes the documents N
+times over to show how search scales with a larger knowledge base. No external
+services needed.
+
+The tool adds one function-call round trip to FAQ answers, while the smaller
+instruction speeds up every Gemini Live session setup and turn; compare the TTFB
+metrics pipecat logs (enable_metrics is on in run_bot) for calls asking FAQs.
+
+    python benchmarks/bench_knowledge_base.py
+    python benchmarks/bench_knowledge_base.py --copies 1 10 100 --queries 1000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from knowledge_base import KNOWLEDGE_FILE_EXTENSIONS, KnowledgeBase, Passage  # noqa: E402
+from prompt_builder import estimate_tokens  # noqa: E402
+from system_prompt import SYSTEM_PROMPT  # noqa: E402
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "knowledge")
+QUERIES = [
+    "fee structure", "hostel fees", "AC hostel rooms", "transport fee", "placement packages",
+    "top recruiters", "scholarships", "sports scholarship", "campus safety", "anti-ragging",
+    "NAAC accreditation", "clubs and fests", "library", "medical center", "MBA fees",
+]
+
+
+def read_documents(directory):
+    documents = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(KNOWLEDGE_FILE_EXTENSIONS):
+            with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+                documents.append(f.read())
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="Knowledge base directory")
+    parser.add_argument("--copies", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--queries", type=int, default=500, help="Searches per run")
+    args = parser.parse_args()
+
+    documents = read_documents(args.dir)
+    inlined = SYSTEM_PROMPT + "\n".join(documents)
+    print(f"system instruction with knowledge inlined: {len(inlined):>7} chars ~{estimate_tokens(inlined):>6} tokens")
+    print(f"system instruction with knowledge tool:    {len(SYSTEM_PROMPT):>7} chars ~{estimate_tokens(SYSTEM_PROMPT):>6} tokens")
+    print()
+
+    rng = random.Random(42)
+    queries = [rng.choice(QUERIES) for _ in range(args.queries)]
+    base = KnowledgeBase()
+    base.load(args.dir)
+
+    print(f"{'copies':>7} {'passages':>9} {'build ms':>9} {'search p50 ms':>14} {'search p95 ms':>14} {'hit rate':>9}")
+    for copies in args.copies:
+        passages = [
+            Passage(f"{passage.source}#{copy}", passage.title, passage.text)
+            for copy in range(copies)
+            for passage in base.passages
+        ]
+        kb = KnowledgeBase()
+        kb.build(passages)
+
+        timings, hits = [], 0
+        for query in queries:
+            started = time.perf_counter()
+            results = kb.search(query)
+            timings.append((time.perf_counter() - started) * 1000)
+            hits += bool(results)
+        timings.sort()
+
+        print(
+            f"{copies:>7} {len(kb):>9} {kb.last_build_ms:>9.1f} {statistics.median(timings):>14.3f}"
+            f" {timings[int(len(timings) * 0.95) - 1]:>14.3f} {hits / len(queries):>9.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Compare per-session system-instruction assembly: formatting everything on every
+call (the previous behaviour) against the cached PromptAssembler.
+
+Runs at 0, 100 and 10,000 guardrails by default. No external services needed.
+
+    python benchmarks/bench_prompt_assembly.py --sessions 200
+    python benchmarks/bench_prompt_assembly.py --guardrails 0 500 --sessions 1000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from guardrails import GuardrailStore  # noqa: E402
+from prompt_builder import (  # noqa: E402
+    PromptAssembler,
+    format_datetime_block,
+    format_guardrails_block,
+    get_current_datetime_info,
+)
+from system_prompt import SYSTEM_PROMPT  # noqa: E402
+
+
+def make_guardrails(count):
+    return [
+        {
+            "question": f"What is the fee structure for program number {i}?",
+            "answer": f"Program {i} fees are listed on the official website; offer to send the brochure on WhatsApp.",
+        }
+        for i in range(count)
+    ]
+
+
+def legacy_build(guardrails):
+    return SYSTEM_PROMPT + format_datetime_block(get_current_datetime_info()) + format_guardrails_block(guardrails)
+
+
+def measure(fn, sessions):
+    timings = []
+    for _ in range(sessions):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "p50": statistics.median(timings),
+        "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "mean": statistics.mean(timings),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guardrails", type=int, nargs="+", default=[0, 100, 10000])
+    parser.add_argument("--sessions", type=int, default=200, help="Sessions set up per measurement")
+    args = parser.parse_args()
+
+    print(f"{'guardrails':>10} {'mode':>10} {'p50 ms':>10} {'p95 ms':>10} {'mean ms':>10} {'prompt KB':>10}")
+    for count in args.guardrails:
+        guardrails = make_guardrails(count)
+        store = GuardrailStore(guardrails)
+        assembler = PromptAssembler(SYSTEM_PROMPT, lambda: store.snapshot)
+        prompt_kb = len(assembler.build()) / 1024
+
+        for mode, fn in (("legacy", lambda: legacy_build(guardrails)), ("cached", assembler.build)):
+            result = measure(fn, args.sessions)
+            print(f"{count:>10} {mode:>10} {result['p50']:>10.3f} {result['p95']:>10.3f} {result['mean']:>10.3f} {prompt_kb:>10.1f}")
+
+        # Cost paid once per guardrails change
+        def rebuild():
+            store.replace(store.snapshot.items)
+            assembler.build()
+
+        result = measure(rebuild, max(1, args.sessions // 10))
+        print(f"{count:>10} {'rebuild':>10} {result['p50']:>10.3f} {result['p95']:>10.3f} {result['mean']:>10.3f} {prompt_kb:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
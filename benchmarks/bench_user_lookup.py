@@ -0,0 +1,126 @@
+"""
+Compare the legacy sequential user lookup chain against the single-query lookup.
+
+Counts MongoDB round trips (commands sent) and wall-clock latency per lookup.
+Needs the same environment (.env) as server.py, including MONGODB_URI.
+
+    python benchmarks/bench_user_lookup.py --phone 9876543210 --iterations 50
+    python benchmarks/bench_user_lookup.py --email student@example.com
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from pymongo import monitoring
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts commands sent to the server (one per round trip)"""
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name not in ("ping", "hello", "isMaster", "endSessions"):
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+counter = CommandCounter()
+# Must be registered before the shared client is created
+monitoring.register(counter)
+
+import server  # noqa: E402
+
+
+def legacy_get_user_data(phone_number=None, email=None):
+    """The previous fallback chain: up to 4 phone queries, 2 email queries, 6 analytics queries"""
+    from bson import ObjectId
+
+    db = server.get_mongodb_client()["VIT"]
+    users_collection = db["users"]
+    analytics_collection = db["userAnalytics"]
+
+    user = None
+    if phone_number:
+        phone_clean = server.normalize_phone_number(phone_number)
+        if len(phone_clean) == 10:
+            phone_db_format = f"91{phone_clean}"
+            user = users_collection.find_one({"phone_number": phone_db_format})
+            if not user:
+                user = users_collection.find_one({"phone_number": phone_clean})
+            if not user:
+                user = users_collection.find_one({"phone": phone_db_format})
+            if not user:
+                user = users_collection.find_one({"phone": phone_clean})
+    if not user and email:
+        email_clean = email.strip().lower()
+        user = users_collection.find_one({"email": email_clean})
+        if not user:
+            user = users_collection.find_one({"email": {"$regex": f"^{email_clean}$", "$options": "i"}})
+    if not user:
+        return None
+
+    user_id = user.get("_id")
+    analytics = analytics_collection.find_one({"user_id": ObjectId(user_id)})
+    if not analytics:
+        analytics = analytics_collection.find_one({"user_id": str(user_id)})
+    if not analytics:
+        analytics = analytics_collection.find_one({"id": ObjectId(user_id)})
+    if not analytics:
+        analytics = analytics_collection.find_one({"id": str(user_id)})
+    if not analytics:
+        analytics = analytics_collection.find_one({"_id": user_id})
+    if not analytics:
+        analytics = analytics_collection.find_one({"userId": str(user_id)})
+    return user, analytics
+
+
+def measure(name, fn, iterations, **kwargs):
+    # Warm up the connection pool so setup cost is not attributed to either strategy
+    fn(**kwargs)
+    latencies = []
+    counter.count = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(**kwargs)
+        latencies.append((time.perf_counter() - start) * 1000)
+    round_trips = counter.count / iterations
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+    print(
+        f"{name:<14} round trips/lookup: {round_trips:5.1f}   "
+        f"p50: {statistics.median(latencies):7.2f} ms   p95: {p95:7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--phone", help="Phone number to look up")
+    parser.add_argument("--email", help="Email address to look up")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    if not args.phone and not args.email:
+        parser.error("provide --phone and/or --email")
+    if not server.mongo:
+        parser.error("MONGODB_URI must be set")
+
+    server.mongo.start()
+    kwargs = {"phone_number": args.phone, "email": args.email}
+    measure("legacy chain", legacy_get_user_data, args.iterations, **kwargs)
+    measure("single query", server.get_user_data, args.iterations, **kwargs)
+    server.mongo.close()
+
+
+if __name__ == "__main__":
+    main()
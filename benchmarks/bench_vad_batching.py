@@ -0,0 +1,125 @@
+"""
+CPU cost of Silero VAD per call with and without the batched engine (VAD_BATCHING).
+
+Each simulated call is a thread that feeds one 512-sample frame (32 ms at 16 kHz)
+every 32 ms to its analyzer, like a live call's transport does. For --sessions
+concurrent calls, this reports the process CPU time per call per second of
+audio and the per-frame latency, which is where batching's wait shows up. Each
+run uses a fresh process. No external services needed.
+
+    python benchmarks/bench_vad_batching.py
+    python benchmarks/bench_vad_batching.py --sessions 1 10 50 --seconds 10 --max-wait-ms 4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODES = ("shared", "batched")
+FRAME_SECS = 512 / 16000
+
+
+def run_child(mode: str, sessions: int, seconds: float, max_wait_ms: float, timeout_ms: float) -> dict:
+    import numpy as np
+    from loguru import logger
+
+    from shared_vad import BatchedSileroVADAnalyzer, BatchedVADEngine, SharedSileroVADAnalyzer, SileroModelManager
+
+    logger.remove()
+    manager = SileroModelManager()
+    manager.load()
+    engine = None
+    if mode == "batched":
+        engine = BatchedVADEngine(manager, max_wait_ms=max_wait_ms, timeout_ms=timeout_ms)
+        engine.start()
+
+    analyzers = []
+    for _ in range(sessions):
+        analyzer = BatchedSileroVADAnalyzer(engine) if engine else SharedSileroVADAnalyzer(manager)
+        analyzer.set_sample_rate(16000)
+        analyzers.append(analyzer)
+
+    rng = np.random.default_rng(42)
+    buffers = [(rng.standard_normal(512) * 3000).astype(np.int16).tobytes() for _ in range(64)]
+    latencies = [[] for _ in range(sessions)]
+    start_at = time.monotonic() + 0.2
+
+    def call(index: int):
+        analyzer = analyzers[index]
+        # Spread calls over the frame interval, as independent calls would be
+        next_frame = start_at + FRAME_SECS * index / sessions
+        frames = int(seconds / FRAME_SECS)
+        for i in range(frames):
+            delay = next_frame - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            started = time.perf_counter()
+            analyzer.voice_confidence(buffers[(index + i) % len(buffers)])
+            latencies[index].append((time.perf_counter() - started) * 1000)
+            next_frame += FRAME_SECS
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(sessions)]
+    cpu_started, wall_started = time.process_time(), time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cpu = time.process_time() - cpu_started
+    wall = time.monotonic() - wall_started
+
+    all_latencies = sorted(value for values in latencies for value in values)
+    result = {
+        "cpu_ms_per_call_sec": cpu * 1000 / (sessions * seconds),
+        "cpu_share": cpu / wall,
+        "latency_p50_ms": all_latencies[len(all_latencies) // 2],
+        "latency_p99_ms": all_latencies[int(len(all_latencies) * 0.99) - 1],
+        "mean_batch": engine.stats()["mean_batch_size"] if engine else 1.0,
+        "inline_fallbacks": engine.inline_fallbacks if engine else 0,
+    }
+    if engine:
+        engine.stop()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--seconds", type=float, default=5.0, help="Audio per call")
+    parser.add_argument("--max-wait-ms", type=float, default=4.0)
+    parser.add_argument("--timeout-ms", type=float, default=20.0)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_child(args.child, args.sessions[0], args.seconds, args.max_wait_ms, args.timeout_ms)
+        print(json.dumps(result))
+        return
+
+    print(
+        f"{'sessions':>8} {'mode':>8} {'CPU ms/call/s':>14} {'CPU cores':>10} {'frame p50 ms':>13}"
+        f" {'frame p99 ms':>13} {'mean batch':>11} {'inline':>7}"
+    )
+    for sessions in args.sessions:
+        for mode in MODES:
+            output = subprocess.run(
+                [
+                    sys.executable, os.path.abspath(__file__), "--child", mode, "--sessions", str(sessions),
+                    "--seconds", str(args.seconds), "--max-wait-ms", str(args.max_wait_ms), "--timeout-ms", str(args.timeout_ms),
+                ],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{sessions:>8} {mode:>8} {result['cpu_ms_per_call_sec']:>14.2f} {result['cpu_share']:>10.2f}"
+                f" {result['latency_p50_ms']:>13.2f} {result['latency_p99_ms']:>13.2f} {result['mean_batch']:>11.1f}"
+                f" {result['inline_fallbacks']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
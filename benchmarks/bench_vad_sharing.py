@@ -0,0 +1,118 @@
+"""
+Compare per-call Silero VAD loading (SileroVADAnalyzer) with the shared model (SharedSileroVADAnalyzer).
+
+For each mode, a fresh process creates --sessions analyzers the way run_bot does
+and reports the setup time per analyzer, the per-frame inference cost (one
+512-sample frame at 16 kHz, i.e. 32 ms of audio) and the resident memory added.
+No external services needed.
+
+    python benchmarks/bench_vad_sharing.py
+    python benchmarks/bench_vad_sharing.py --sessions 1 10 50 --frames 2000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODES = ("per-call", "shared")
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # Peak instead of current outside Linux (KB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def run_child(mode: str, sessions: int, frames: int) -> dict:
+    import numpy as np
+    from loguru import logger
+    from pipecat.audio.vad.silero import SileroVADAnalyzer
+    from pipecat.audio.vad.vad_analyzer import VADParams
+
+    from shared_vad import SharedSileroVADAnalyzer, SileroModelManager
+
+    logger.remove()
+    params = VADParams(stop_secs=0.3, min_volume=0.3)
+    manager = SileroModelManager()
+    baseline = rss_mb()
+
+    load_ms = 0.0
+    if mode == "shared":
+        started = time.perf_counter()
+        manager.load()
+        load_ms = (time.perf_counter() - started) * 1000
+
+    setup_ms, analyzers = [], []
+    for _ in range(sessions):
+        started = time.perf_counter()
+        if mode == "shared":
+            analyzer = SharedSileroVADAnalyzer(manager, params=params)
+        else:
+            analyzer = SileroVADAnalyzer(params=params)
+        analyzer.set_sample_rate(16000)
+        setup_ms.append((time.perf_counter() - started) * 1000)
+        analyzers.append(analyzer)
+    added_mb = rss_mb() - baseline
+
+    rng = np.random.default_rng(42)
+    buffers = [(rng.standard_normal(512) * 3000).astype(np.int16).tobytes() for _ in range(64)]
+    timings = []
+    for i in range(frames):
+        analyzer = analyzers[i % len(analyzers)]
+        started = time.perf_counter()
+        analyzer.voice_confidence(buffers[i % len(buffers)])
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    setup_ms.sort()
+
+    return {
+        "load_ms": load_ms,
+        "setup_ms_mean": sum(setup_ms) / len(setup_ms),
+        "setup_ms_p95": setup_ms[max(0, int(len(setup_ms) * 0.95) - 1)],
+        "frame_us_p50": timings[len(timings) // 2],
+        "frame_us_p95": timings[int(len(timings) * 0.95) - 1],
+        "added_mb": added_mb,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--frames", type=int, default=1000, help="Frames to run through the analyzers")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.sessions[0], args.frames)))
+        return
+
+    print(
+        f"{'sessions':>8} {'mode':>9} {'model load ms':>14} {'setup ms/call':>14} {'setup p95 ms':>13}"
+        f" {'frame p50 us':>13} {'frame p95 us':>13} {'memory MB':>10}"
+    )
+    for sessions in args.sessions:
+        results = {}
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", mode, "--sessions", str(sessions), "--frames", str(args.frames)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = results[mode] = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{sessions:>8} {mode:>9} {result['load_ms']:>14.1f} {result['setup_ms_mean']:>14.2f} {result['setup_ms_p95']:>13.2f}"
+                f" {result['frame_us_p50']:>13.0f} {result['frame_us_p95']:>13.0f} {result['added_mb']:>10.1f}"
+            )
+        print(f"{'':>8} {'saved':>9} {'':>14} {'':>14} {'':>13} {'':>13} {'':>13} {results['per-call']['added_mb'] - results['shared']['added_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
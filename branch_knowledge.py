@@ -0,0 +1,154 @@
+import difflib
+import json
+import os
+import time
+import unicodedata
+from dataclasses import dataclass
+from threading import Lock
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from loguru import logger
+
+# Words that say nothing about which branch is meant ("B.Tech in Mechanical Engineering")
+FILLER_WORDS = frozenset(
+    "b tech btech be m mtech engg engineering and in of the branch department dept course degree bachelor bachelors".split()
+)
+# Aliases this short ("it", "me", "ec") only match when they are (nearly) the whole input
+SHORT_ALIAS_LENGTH = 2
+MAX_TOKENS_FOR_SHORT_ALIAS = 3
+FUZZY_CUTOFF = 0.8
+
+
+def normalize_branch(text: str) -> str:
+    """Lowercase, '&' -> 'and', punctuation/symbols removed, filler words dropped"""
+    text = (text or "").lower().replace("&", " and ")
+    # Category check (not \\w) so Devanagari/Tamil vowel signs are kept
+    text = "".join(" " if unicodedata.category(char)[0] in "PSZ" else char for char in text)
+    return " ".join(token for token in text.split() if token not in FILLER_WORDS)
+
+
+@dataclass(frozen=True)
+class Branch:
+    name: str
+    career_paths: Tuple[str, ...]
+    alumni: Mapping[str, Any]
+
+
+class BranchIndex:
+    """
+    Immutable lookup table from branch names and aliases to branch knowledge.
+
+    `match()` tries, in order: the whole input as a name/alias, the longest alias
+    found as a word sequence inside the input (e.g. "cse" in "btech cse with ai"),
+    a partial branch name (the old substring match), then fuzzy matching (difflib)
+    for misspellings.
+    """
+
+    def __init__(self, data: Mapping[str, Any]):
+        branches: List[Branch] = []
+        aliases: Dict[str, Branch] = {}
+        for entry in data.get("branches", []):
+            branch = Branch(
+                name=entry["name"],
+                career_paths=tuple(entry.get("career_paths", [])),
+                alumni=MappingProxyType(dict(entry.get("alumni", {}))),
+            )
+            branches.append(branch)
+            for alias in [entry["name"], *entry.get("aliases", [])]:
+                key = normalize_branch(alias)
+                if not key:
+                    continue
+                if key in aliases and aliases[key] is not branch:
+                    logger.warning(f"Branch alias '{alias}' is used by both {aliases[key].name} and {branch.name}")
+                    continue
+                aliases[key] = branch
+        self.branches = tuple(branches)
+        self._aliases = MappingProxyType(aliases)
+        self._max_alias_tokens = max((len(key.split()) for key in aliases), default=0)
+        self._names = {normalize_branch(branch.name): branch for branch in branches}
+        self._fuzzy_keys = [key for key in aliases if len(key) > 3]
+
+    def __len__(self) -> int:
+        return len(self.branches)
+
+    def match(self, branch: str) -> Optional[Branch]:
+        key = normalize_branch(branch)
+        if not key:
+            return None
+
+        exact = self._aliases.get(key)
+        if exact is not None:
+            return exact
+
+        tokens = key.split()
+        for size in range(min(self._max_alias_tokens, len(tokens)), 0, -1):
+            for start in range(len(tokens) - size + 1):
+                phrase = " ".join(tokens[start:start + size])
+                found = self._aliases.get(phrase)
+                if found is None:
+                    continue
+                if len(phrase) <= SHORT_ALIAS_LENGTH and len(tokens) > MAX_TOKENS_FOR_SHORT_ALIAS:
+                    continue
+                return found
+
+        for name, found in self._names.items():
+            if len(key) > 3 and (key in name or name in key):
+                return found
+
+        close = difflib.get_close_matches(key, self._fuzzy_keys, n=1, cutoff=FUZZY_CUTOFF)
+        if not close:
+            # Misspelled word inside a longer input ("mechnical with robotics")
+            for token in tokens:
+                close = difflib.get_close_matches(token, self._fuzzy_keys, n=1, cutoff=FUZZY_CUTOFF) if len(token) > 3 else []
+                if close:
+                    break
+        return self._aliases[close[0]] if close else None
+
+
+class BranchKnowledge:
+    """
+    Branch index loaded from a JSON data file and reloaded when the file changes.
+
+    The file's mtime is checked at most every `check_interval` seconds (one stat
+    call); a reload builds a new BranchIndex and swaps it in, and a broken file
+    keeps the previous index serving.
+    """
+
+    def __init__(self, path: str, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = Lock()
+        self._index = BranchIndex({})
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self.reloads = 0
+        self._reload()
+
+    def _reload(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if mtime == self._mtime:
+                return
+            with open(self.path, "r", encoding="utf-8") as f:
+                index = BranchIndex(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"Error loading branch data from {self.path}: {e}")
+            return
+        self._index, self._mtime = index, mtime
+        self.reloads += 1
+        logger.info(f"Loaded {len(index)} branch(es) from {self.path}")
+
+    @property
+    def index(self) -> BranchIndex:
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval and self._lock.acquire(blocking=False):
+            try:
+                self._checked_at = now
+                self._reload()
+            finally:
+                self._lock.release()
+        return self._index
+
+    def match(self, branch: str) -> Optional[Branch]:
+        return self.index.match(branch)
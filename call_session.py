@@ -0,0 +1,84 @@
+import asyncio
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+def extract_phone_digits(value: Optional[str]) -> str:
+    """Return the digits of a caller ID, or an empty string if it does not look like a phone number"""
+    if not value:
+        return ""
+    digits = "".join(filter(str.isdigit, str(value)))
+    return digits if len(digits) >= 10 else ""
+
+
+class CallSession:
+    """
+    Per-call state shared between run_bot, its event handlers and tool handlers.
+
+    Holds the caller ID (when known) and the user profile lookup started for it, so
+    `check_user_exists` can answer from the prefetched result instead of querying
+    MongoDB mid-conversation.
+    """
+
+    def __init__(self, room_url: str, caller_id: Optional[str] = None):
+        self.session_id = uuid.uuid4().hex
+        self.room_url = room_url
+        self.caller_id = caller_id
+        self._caller_phone = ""
+        self._user_prefetch: Optional[asyncio.Task] = None
+        # (phone_number, email) pairs looked up during the call, invalidated from caches at hang-up
+        self.contact_lookups: List[Tuple[Optional[str], Optional[str]]] = []
+        # Set by run_bot once the pipeline exists; background jobs report back through it
+        self.pipeline_task: Optional[Any] = None
+        self.ended = False
+        # Final results of background deliveries for this call
+        self.delivery_updates: List[Dict[str, Any]] = []
+        # Incrementally written transcript (a TranscriptStream) and whether it was queued for upload
+        self.transcript: Optional[Any] = None
+        self.transcript_queued = False
+
+    def start_user_prefetch(
+        self,
+        caller_id: str,
+        lookup: Callable[..., Awaitable[Optional[dict]]],
+        normalize: Callable[[str], str],
+    ) -> bool:
+        """Start looking up the caller's profile in the background. Returns False if not started."""
+        if self._user_prefetch is not None:
+            return False
+        digits = extract_phone_digits(caller_id)
+        if not digits:
+            return False
+
+        self.caller_id = caller_id
+        self._caller_phone = normalize(digits)
+        self._user_prefetch = asyncio.create_task(lookup(phone_number=digits))
+        logger.info(f"Prefetching user profile for caller {self._caller_phone}")
+        return True
+
+    async def get_prefetched_user(
+        self, phone_number: str, normalize: Callable[[str], str]
+    ) -> Tuple[bool, Optional[dict]]:
+        """
+        Return (True, user_data) when `phone_number` is the caller's number and the
+        prefetch completed, or (False, None) when the caller must do its own lookup.
+        """
+        if self._user_prefetch is None or not phone_number:
+            return False, None
+        if normalize(phone_number) != self._caller_phone:
+            return False, None
+        try:
+            # Usually already finished; otherwise join the lookup in flight instead of starting another
+            return True, await asyncio.shield(self._user_prefetch)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Prefetched user lookup failed, falling back to a direct lookup: {e}")
+            return False, None
+
+    def cancel(self):
+        """Cancel background work owned by this session"""
+        if self._user_prefetch is not None and not self._user_prefetch.done():
+            self._user_prefetch.cancel()
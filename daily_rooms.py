@@ -0,0 +1,169 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from loguru import logger
+
+
+@dataclass(frozen=True)
+class PooledRoom:
+    """A Daily room and owner token created ahead of time"""
+    room_url: str
+    token: str
+    expires_at: int
+    created_at: float
+
+
+class DailyRoomPool:
+    """
+    Background-maintained pool of ready Daily rooms + meeting tokens.
+
+    `acquire()` pops a ready room in O(1) or returns None on a miss, in which case
+    the caller falls back to creating a room on demand. A refill loop keeps the pool
+    at its target size (between min_size and max_size, growing after misses) and
+    discards rooms that are too close to their `exp` to host a full call.
+    """
+
+    def __init__(
+        self,
+        create_room: Callable[[int], Awaitable[Tuple[str, str]]],
+        min_size: int = 2,
+        max_size: int = 10,
+        refill_interval: float = 5.0,
+        refill_batch: int = 2,
+        room_ttl: int = 3600,
+        min_remaining: int = 900,
+    ):
+        """
+        Args:
+            create_room: Coroutine taking the room `exp` (unix seconds) and returning (room_url, token).
+            min_size: Number of ready rooms to keep when idle.
+            max_size: Upper bound on ready rooms, reached only after misses.
+            refill_interval: Seconds between refill/eviction passes.
+            refill_batch: Maximum rooms created per refill pass.
+            room_ttl: Lifetime given to each room, in seconds.
+            min_remaining: Rooms with less lifetime left than this are discarded.
+        """
+        if max_size < min_size:
+            raise ValueError("max_size must be >= min_size")
+        if min_remaining >= room_ttl:
+            raise ValueError("min_remaining must be smaller than room_ttl")
+
+        self._create_room = create_room
+        self.min_size = min_size
+        self.max_size = max_size
+        self.refill_interval = refill_interval
+        self.refill_batch = refill_batch
+        self.room_ttl = room_ttl
+        self.min_remaining = min_remaining
+
+        self._rooms: Deque[PooledRoom] = deque()
+        self._target = min_size
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.created = 0
+        self.evicted = 0
+        self.create_errors = 0
+
+    def _is_usable(self, room: PooledRoom, now: float) -> bool:
+        return room.expires_at - now >= self.min_remaining
+
+    def acquire(self) -> Optional[PooledRoom]:
+        """Take a ready room from the pool, or return None if none is usable"""
+        now = time.time()
+        while self._rooms:
+            # Oldest rooms sit on the left, so expired ones are popped first
+            room = self._rooms.popleft()
+            if self._is_usable(room, now):
+                self.hits += 1
+                self._wakeup.set()
+                return room
+            self.evicted += 1
+
+        self.misses += 1
+        # Grow towards max_size so the next burst is absorbed
+        self._target = min(self.max_size, self._target + 1)
+        self._wakeup.set()
+        return None
+
+    def _evict_expiring(self):
+        now = time.time()
+        while self._rooms and not self._is_usable(self._rooms[0], now):
+            self._rooms.popleft()
+            self.evicted += 1
+
+    async def _create_one(self):
+        expires_at = int(time.time()) + self.room_ttl
+        room_url, token = await self._create_room(expires_at)
+        self._rooms.append(PooledRoom(room_url, token, expires_at, time.time()))
+        self.created += 1
+
+    async def refill_once(self):
+        """Evict rooms near expiry and create up to `refill_batch` new ones"""
+        self._evict_expiring()
+
+        missing = min(self.refill_batch, self._target - len(self._rooms))
+        if missing <= 0:
+            # Idle pass: let the target decay back towards min_size
+            self._target = max(self.min_size, self._target - 1)
+            return
+
+        results = await asyncio.gather(
+            *(self._create_one() for _ in range(missing)), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                self.create_errors += 1
+                logger.error(f"Failed to pre-create Daily room for pool: {result}")
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refill_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error refilling Daily room pool: {e}", exc_info=True)
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.refill_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        """Start the background refill loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Daily room pool started (min={self.min_size}, max={self.max_size})")
+
+    async def stop(self):
+        """Stop the background refill loop. Pooled rooms simply expire on Daily's side."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._rooms),
+            "target_size": self._target,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "created": self.created,
+            "evicted": self.evicted,
+            "create_errors": self.create_errors,
+        }
@@ -0,0 +1,125 @@
+import csv
+import io
+import json
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+# (row number, question, answer)
+Row = Tuple[int, str, str]
+
+
+class ImportErrors(Exception):
+    """Raised when an import file has invalid rows; nothing is applied"""
+
+    def __init__(self, errors: List[Dict[str, object]], error_count: int, total_rows: int):
+        super().__init__(f"{error_count} invalid row(s)")
+        self.errors = errors
+        self.error_count = error_count
+        self.total_rows = total_rows
+
+
+def _validate(row_number: int, record: object) -> Tuple[Optional[Row], Optional[str]]:
+    if not isinstance(record, Mapping):
+        return None, "expected an object with 'question' and 'answer'"
+    question, answer = record.get("question"), record.get("answer")
+    if not isinstance(question, str) or not question.strip():
+        return None, "empty or missing question"
+    if not isinstance(answer, str) or not answer.strip():
+        return None, "empty or missing answer"
+    return (row_number, question.strip(), answer.strip()), None
+
+
+def _ndjson_records(text_lines: Iterable[str]) -> Iterator[Tuple[int, object, Optional[str]]]:
+    for line_number, line in enumerate(text_lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line), None
+        except json.JSONDecodeError as e:
+            yield line_number, None, f"invalid JSON: {e.msg}"
+
+
+def _csv_records(text_lines: Iterable[str]) -> Iterator[Tuple[int, object, Optional[str]]]:
+    reader = csv.DictReader(text_lines)
+    if reader.fieldnames is None:
+        return
+    missing = {"question", "answer"} - {name.strip().lower() for name in reader.fieldnames}
+    if missing:
+        yield 1, None, f"CSV header must include question and answer columns (missing: {', '.join(sorted(missing))})"
+        return
+    for record in reader:
+        # Header is line 1; line_num is where the record ended (quoted fields may span lines)
+        normalized = {(key or "").strip().lower(): value for key, value in record.items()}
+        yield reader.line_num, normalized, None
+
+
+def parse_guardrail_rows(body: BinaryIO, fmt: str, max_errors: int = 100) -> List[Row]:
+    """
+    Parse and validate an import file row by row (the file is read incrementally,
+    never decoded as a whole). Returns the valid rows, or raises ImportErrors with
+    up to `max_errors` per-row errors if any row is invalid.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format '{fmt}' (use one of: {', '.join(IMPORT_FORMATS)})")
+
+    text = io.TextIOWrapper(body, encoding="utf-8-sig", newline="")
+    records = _ndjson_records(text) if fmt == "ndjson" else _csv_records(text)
+
+    rows: List[Row] = []
+    errors: List[Dict[str, object]] = []
+    error_count = 0
+    total = 0
+    try:
+        for row_number, record, error in records:
+            total += 1
+            row = None
+            if error is None:
+                row, error = _validate(row_number, record)
+            if error is not None:
+                error_count += 1
+                if len(errors) < max_errors:
+                    errors.append({"row": row_number, "error": error})
+                continue
+            rows.append(row)
+    except UnicodeDecodeError:
+        errors.append({"row": total + 1, "error": "file is not valid UTF-8"})
+        error_count += 1
+    except csv.Error as e:
+        errors.append({"row": total + 1, "error": f"invalid CSV: {e}"})
+        error_count += 1
+    finally:
+        text.detach()
+
+    if error_count:
+        if error_count > len(errors):
+            errors.append({"row": None, "error": f"... and {error_count - len(errors)} more invalid row(s)"})
+        raise ImportErrors(errors, error_count, total)
+    return rows
+
+
+def iter_export(items: Iterable[Mapping[str, str]], fmt: str, chunk_rows: int = 500) -> Iterator[bytes]:
+    """Serialize guardrails as NDJSON or CSV in chunks of `chunk_rows` rows"""
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}' (use one of: {', '.join(IMPORT_FORMATS)})")
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer is not None:
+        writer.writerow(["id", "question", "answer"])
+
+    pending = 0
+    for item in items:
+        if writer is not None:
+            writer.writerow([item["id"], item["question"], item["answer"]])
+        else:
+            buffer.write(json.dumps({"id": item["id"], "question": item["question"], "answer": item["answer"]}, ensure_ascii=False))
+            buffer.write("\n")
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
@@ -0,0 +1,163 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from loguru import logger
+from pipecat.frames.frames import Frame, TranscriptionFrame
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+
+from background_jobs import percentile
+from prompt_builder import estimate_tokens
+from text_index import BM25Index
+
+
+GUARDRAIL_INJECTION_MODES = ("auto", "prompt", "retrieval")
+
+
+def guardrail_retrieval_enabled(mode: str, guardrail_count: int, prompt_max_entries: int) -> bool:
+    """Whether guardrails are retrieved per turn (True) or put in the system instruction"""
+    if mode == "retrieval":
+        return guardrail_count > 0
+    if mode == "prompt":
+        return False
+    return guardrail_count > prompt_max_entries
+
+
+def format_guardrail_guidance(guardrails: Iterable[Mapping[str, str]]) -> str:
+    """Format retrieved guardrails as a context message for the following turns"""
+    lines = ["[Custom instructions for this question]"]
+    for guardrail in guardrails:
+        lines.append(f"When asked (or similar to): {guardrail['question']}")
+        lines.append(f"You should respond like this: {guardrail['answer']}")
+    return "\n".join(lines)
+
+
+class GuardrailRetriever:
+    """
+    BM25 index over guardrail questions, rebuilt when the guardrails version changes.
+
+    `retrieve()` returns the best-matching guardrails for one user utterance, at
+    most `top_k` and at most `max_tokens` (estimated) of formatted guidance, so
+    per-turn context stays small no matter how many guardrails are stored.
+    """
+
+    def __init__(
+        self,
+        guardrails_snapshot: Callable[[], Any],
+        top_k: int = 3,
+        min_score: float = 0.2,
+        max_tokens: int = 300,
+        latency_window: int = 200,
+    ):
+        # Returns an object with `version` and `items` (e.g. a GuardrailSnapshot)
+        self._guardrails_snapshot = guardrails_snapshot
+        self.top_k = top_k
+        self.min_score = min_score
+        self.max_tokens = max_tokens
+        # (version, index, items) replaced in one assignment, like PromptAssembler's pieces
+        self._index: Tuple[Optional[int], Optional[BM25Index], Tuple[Mapping[str, str], ...]] = (None, None, ())
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+
+        # Metrics
+        self.rebuilds = 0
+        self.last_build_ms = 0.0
+        self.retrievals = 0
+        self.matches = 0
+        self.truncated = 0
+
+    def is_current(self) -> bool:
+        return self._index[0] == self._guardrails_snapshot().version
+
+    def refresh(self) -> BM25Index:
+        """Rebuild the index if the guardrails changed (O(total question length))"""
+        snapshot = self._guardrails_snapshot()
+        version, index, _ = self._index
+        if index is None or version != snapshot.version:
+            started = time.perf_counter()
+            index = BM25Index([item.get("question", "") for item in snapshot.items])
+            self._index = (snapshot.version, index, snapshot.items)
+            self.rebuilds += 1
+            self.last_build_ms = (time.perf_counter() - started) * 1000
+        return index
+
+    def retrieve(self, text: str, exclude_ids: Iterable[str] = ()) -> List[Mapping[str, str]]:
+        """Best matches for `text`, skipping guardrails already given in this call"""
+        started = time.perf_counter()
+        self.refresh()
+        _, index, items = self._index
+        exclude = set(exclude_ids)
+
+        selected: List[Mapping[str, str]] = []
+        budget = self.max_tokens - estimate_tokens(format_guardrail_guidance(()))
+        for doc_id, _score in index.search(text, k=self.top_k + len(exclude), min_score=self.min_score):
+            guardrail = items[doc_id]
+            if guardrail["id"] in exclude:
+                continue
+            cost = estimate_tokens(format_guardrail_guidance((guardrail,)))
+            if cost > budget:
+                self.truncated += 1
+                continue
+            selected.append(guardrail)
+            budget -= cost
+            if len(selected) >= self.top_k:
+                break
+
+        self.retrievals += 1
+        self.matches += len(selected)
+        self._latencies.append(time.perf_counter() - started)
+        return selected
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "indexed": len(self._index[2]),
+            "rebuilds": self.rebuilds,
+            "last_build_ms": round(self.last_build_ms, 1),
+            "retrievals": self.retrievals,
+            "matches": self.matches,
+            "truncated": self.truncated,
+            "latency_p50_ms": round(percentile(self._latencies, 0.5) * 1000, 3),
+            "latency_p95_ms": round(percentile(self._latencies, 0.95) * 1000, 3),
+        }
+
+
+class GuardrailRetrievalProcessor(FrameProcessor):
+    """
+    Pipeline processor that looks up guardrails for each finalized user transcription
+    and hands the matches to `inject` as context.
+
+    Place it directly before the LLM: Gemini Live pushes user transcriptions
+    upstream, so they pass through here as soon as a sentence is recognized.
+    Gemini Live answers from the audio and only sends the transcription once it is
+    already responding, so the guidance reaches the model too late for the answer
+    to that sentence - it applies from the following turn on. Use the "prompt"
+    injection mode when guardrails must apply to the first matching question.
+    Each guardrail is injected at most once per call.
+    """
+
+    def __init__(self, retriever: GuardrailRetriever, inject: Callable[[str], Awaitable[None]], **kwargs):
+        super().__init__(**kwargs)
+        self._retriever = retriever
+        self._inject = inject
+        self._injected_ids: Set[str] = set()
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection):
+        await super().process_frame(frame, direction)
+        await self.push_frame(frame, direction)
+
+        if isinstance(frame, TranscriptionFrame) and frame.text.strip():
+            try:
+                await self._inject_matches(frame.text)
+            except Exception as e:
+                logger.error(f"Error injecting guardrails: {e}")
+
+    async def _inject_matches(self, text: str):
+        if not self._retriever.is_current():
+            # Rebuilding a large index is CPU work - keep it off the event loop
+            await asyncio.to_thread(self._retriever.refresh)
+        guardrails = self._retriever.retrieve(text, exclude_ids=self._injected_ids)
+        if not guardrails:
+            return
+        self._injected_ids.update(guardrail["id"] for guardrail in guardrails)
+        logger.info(f"Injecting {len(guardrails)} guardrail(s) for: {text[:50]}")
+        await self._inject(format_guardrail_guidance(guardrails))
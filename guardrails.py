@@ -0,0 +1,502 @@
+import asyncio
+import os
+import random
+import sqlite3
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from threading import Lock
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from loguru import logger
+
+from summary_cache import normalize_query
+
+Items = Tuple[Mapping[str, str], ...]
+IMPORT_MODES = ("replace", "append", "upsert")
+
+
+class GuardrailConflictError(ValueError):
+    """Raised when a change would give two guardrails the same (normalized) question"""
+
+
+def normalize_question(question: str) -> str:
+    """Key used to match questions: lowercase, punctuation stripped, single spaces"""
+    return normalize_query(question)
+
+
+def new_guardrail_id() -> str:
+    return uuid.uuid4().hex
+
+
+@dataclass(frozen=True)
+class GuardrailSnapshot:
+    """
+    Immutable view of all guardrails at one version, with hash indexes by id and
+    by normalized question (built once per version, so lookups are O(1)).
+    """
+
+    version: int
+    items: Items
+    by_id: Mapping[str, int] = field(init=False, repr=False, compare=False)
+    by_question: Mapping[str, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        by_id: Dict[str, int] = {}
+        by_question: Dict[str, int] = {}
+        for position, item in enumerate(self.items):
+            by_id[item["id"]] = position
+            # The first of any duplicate questions wins, like the old linear scan
+            by_question.setdefault(normalize_question(item.get("question", "")), position)
+        object.__setattr__(self, "by_id", by_id)
+        object.__setattr__(self, "by_question", by_question)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def get(self, guardrail_id: str) -> Optional[Mapping[str, str]]:
+        position = self.by_id.get(guardrail_id)
+        return self.items[position] if position is not None else None
+
+    def find_question(self, question: str) -> Optional[int]:
+        """Position of the guardrail with this exact (normalized) question"""
+        return self.by_question.get(normalize_question(question))
+
+    def to_list(self) -> List[Dict[str, str]]:
+        """Plain dict copies, e.g. for JSON responses"""
+        return [dict(item) for item in self.items]
+
+
+# A mutation maps the current snapshot to (new items, result returned to the caller)
+Mutation = Callable[[GuardrailSnapshot], Tuple[Items, Any]]
+
+
+def _freeze(item: Mapping[str, str]) -> Mapping[str, str]:
+    frozen = {
+        "id": item.get("id") or new_guardrail_id(),
+        "question": item.get("question", ""),
+        "answer": item.get("answer", ""),
+    }
+    return MappingProxyType(frozen)
+
+
+def _without(items: Items, position: int) -> Items:
+    return items[:position] + items[position + 1:]
+
+
+class GuardrailBackend(ABC):
+    """
+    Persistent storage behind a GuardrailStore.
+
+    `apply()` runs a mutation atomically against the persisted state: if another
+    process changed it since `base.version`, the mutation is applied to the stored
+    items instead, so concurrent writers never overwrite each other's changes.
+    """
+
+    # Identifies this storage instance, so versions from a recreated store never look current
+    epoch = 0
+
+    @abstractmethod
+    def load(self) -> Tuple[int, List[Dict[str, str]]]:
+        """(version, items) as persisted"""
+
+    @abstractmethod
+    def apply(self, base: GuardrailSnapshot, mutate: Mutation) -> Tuple[int, Items, Any]:
+        """Run `mutate` atomically on the persisted state; returns (version, items, result)"""
+
+    def has_changed(self) -> bool:
+        """Cheap check for writes made by other processes since the last call"""
+        return False
+
+    def close(self):
+        pass
+
+
+class SQLiteGuardrailBackend(GuardrailBackend):
+    """
+    Guardrails in a local SQLite file (WAL mode), shared by all worker processes
+    on the host. Change detection uses PRAGMA data_version, which only moves when
+    another connection commits, so checking it never touches the table.
+
+    Rows are keyed by guardrail id and ordered by an insertion sequence, so a
+    single-entry change writes a single row.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # isolation_level=None: explicit transactions only
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._migrate()
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._data_version = self._read_data_version()
+
+    def _migrate(self):
+        self._db.execute("CREATE TABLE IF NOT EXISTS guardrails_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._db.execute("INSERT OR IGNORE INTO guardrails_meta (key, value) VALUES ('version', 0)")
+        self._db.execute(
+            "INSERT OR IGNORE INTO guardrails_meta (key, value) VALUES ('epoch', ?)", (random.getrandbits(31),)
+        )
+        self.epoch = self._db.execute("SELECT value FROM guardrails_meta WHERE key = 'epoch'").fetchone()[0]
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(guardrails)").fetchall()]
+        if columns and "id" not in columns:
+            # Positional table from before guardrails had ids: give every row one
+            self._db.execute("ALTER TABLE guardrails RENAME TO guardrails_positional")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS guardrails (id TEXT PRIMARY KEY, seq INTEGER NOT NULL, question TEXT NOT NULL, answer TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS guardrails_seq ON guardrails (seq)")
+        if columns and "id" not in columns:
+            rows = self._db.execute("SELECT position, question, answer FROM guardrails_positional ORDER BY position").fetchall()
+            self._db.executemany(
+                "INSERT INTO guardrails (id, seq, question, answer) VALUES (?, ?, ?, ?)",
+                [(new_guardrail_id(), position, question, answer) for position, question, answer in rows],
+            )
+            self._db.execute("DROP TABLE guardrails_positional")
+            logger.info(f"Migrated {len(rows)} guardrail(s) to id-keyed storage")
+
+    def _read_data_version(self) -> int:
+        return self._db.execute("PRAGMA data_version").fetchone()[0]
+
+    def _read_version(self) -> int:
+        return self._db.execute("SELECT value FROM guardrails_meta WHERE key = 'version'").fetchone()[0]
+
+    def _read_items(self) -> List[Dict[str, str]]:
+        rows = self._db.execute("SELECT id, question, answer FROM guardrails ORDER BY seq").fetchall()
+        return [{"id": guardrail_id, "question": question, "answer": answer} for guardrail_id, question, answer in rows]
+
+    def load(self) -> Tuple[int, List[Dict[str, str]]]:
+        self._db.execute("BEGIN")
+        try:
+            version = self._read_version()
+            # Inside the transaction, so it matches the rows read: a commit by another
+            # process right after ours must still look like a change to has_changed()
+            data_version = self._read_data_version()
+            items = self._read_items()
+        finally:
+            self._db.execute("COMMIT")
+        self._data_version = data_version
+        return version, items
+
+    def _write_changes(self, old: Items, new: Items):
+        old_by_id = {item["id"]: item for item in old}
+        new_ids = {item["id"] for item in new}
+        removed = [guardrail_id for guardrail_id in old_by_id if guardrail_id not in new_ids]
+        if removed:
+            self._db.executemany("DELETE FROM guardrails WHERE id = ?", [(guardrail_id,) for guardrail_id in removed])
+
+        # Mutations only append, edit in place or delete, so new rows go after existing ones
+        next_seq = self._db.execute("SELECT COALESCE(MAX(seq), -1) + 1 FROM guardrails").fetchone()[0]
+        inserts, updates = [], []
+        for item in new:
+            previous = old_by_id.get(item["id"])
+            if previous is None:
+                inserts.append((item["id"], next_seq, item["question"], item["answer"]))
+                next_seq += 1
+            elif previous is not item and dict(previous) != dict(item):
+                updates.append((item["question"], item["answer"], item["id"]))
+        if inserts:
+            self._db.executemany("INSERT INTO guardrails (id, seq, question, answer) VALUES (?, ?, ?, ?)", inserts)
+        if updates:
+            self._db.executemany("UPDATE guardrails SET question = ?, answer = ? WHERE id = ?", updates)
+
+    def apply(self, base: GuardrailSnapshot, mutate: Mutation) -> Tuple[int, Items, Any]:
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            stored_version = self._read_version()
+            if stored_version != base.version:
+                # Another process wrote since our last load - apply on top of its state
+                base = GuardrailSnapshot(stored_version, tuple(_freeze(item) for item in self._read_items()))
+            new_items, result = mutate(base)
+            if new_items is not base.items:
+                self._write_changes(base.items, new_items)
+                stored_version += 1
+                self._db.execute("UPDATE guardrails_meta SET value = ? WHERE key = 'version'", (stored_version,))
+            # Read under the write lock (our own commit does not move it): reading after
+            # COMMIT could swallow another process's write that landed in between
+            data_version = self._read_data_version()
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._data_version = data_version
+        return stored_version, new_items, result
+
+    def has_changed(self) -> bool:
+        data_version = self._read_data_version()
+        if data_version == self._data_version:
+            return False
+        self._data_version = data_version
+        return True
+
+    def close(self):
+        self._db.close()
+
+
+class GuardrailStore:
+    """
+    Guardrails (question-answer pairs) held as copy-on-write snapshots.
+
+    Readers take `store.snapshot` - a single attribute read, no lock - and can
+    iterate it for as long as they like. Writers build a new tuple and swap the
+    reference; a lock serializes writers only, so a large admin upload never
+    blocks session setup. `version` increases on every change, so downstream
+    caches can invalidate by comparing one integer.
+
+    With a backend, every mutation is written through before it is published,
+    and `start_watching()` reloads when another process has written. Every method
+    that takes the write lock may block on SQLite, so async callers run them in a
+    thread (`asyncio.to_thread`) rather than on the event loop.
+    """
+
+    def __init__(self, items: Iterable[Mapping[str, str]] = (), backend: Optional[GuardrailBackend] = None):
+        self._write_lock = Lock()
+        self._snapshot = GuardrailSnapshot(0, tuple(_freeze(item) for item in items))
+        self.backend = backend
+        self._epoch = backend.epoch if backend is not None else random.getrandbits(31)
+        self._watch_task: Optional[asyncio.Task] = None
+        self.reloads = 0
+
+    @property
+    def snapshot(self) -> GuardrailSnapshot:
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def etag(self, snapshot: Optional[GuardrailSnapshot] = None) -> str:
+        """HTTP entity tag for a snapshot (the current one by default)"""
+        snapshot = snapshot or self._snapshot
+        return f'"{self._epoch:x}-{snapshot.version}"'
+
+    def load(self):
+        """Replace the in-memory snapshot with the backend's persisted state"""
+        if self.backend is None:
+            return
+        with self._write_lock:
+            version, items = self.backend.load()
+            self._snapshot = GuardrailSnapshot(version, tuple(_freeze(item) for item in items))
+
+    def _mutate(self, mutate: Mutation) -> Any:
+        with self._write_lock:
+            current = self._snapshot
+            if self.backend is not None:
+                # Write-through: persisted first, then published to readers
+                version, items, result = self.backend.apply(current, mutate)
+            else:
+                items, result = mutate(current)
+                version = current.version + 1 if items is not current.items else current.version
+            if version != current.version:
+                self._snapshot = GuardrailSnapshot(version, items)
+            return result
+
+    def get(self, guardrail_id: str) -> Optional[Dict[str, str]]:
+        item = self._snapshot.get(guardrail_id)
+        return dict(item) if item is not None else None
+
+    def replace(self, items: Iterable[Mapping[str, str]]) -> GuardrailSnapshot:
+        """Replace all guardrails (every entry gets a new id)"""
+        frozen = tuple(_freeze({"question": item.get("question", ""), "answer": item.get("answer", "")}) for item in items)
+        self._mutate(lambda current: (frozen, None))
+        return self._snapshot
+
+    def append(self, question: str, answer: str) -> Dict[str, str]:
+        """Add a guardrail. Raises GuardrailConflictError if the question already exists."""
+        def mutate(current):
+            if current.find_question(question) is not None:
+                raise GuardrailConflictError(f"A guardrail with this question already exists: '{question}'")
+            item = _freeze({"question": question, "answer": answer})
+            return current.items + (item,), dict(item)
+
+        return self._mutate(mutate)
+
+    def upsert(self, question: str, answer: str) -> Tuple[Dict[str, str], bool]:
+        """Set the answer for a question, adding it if new. Returns (guardrail, created)."""
+        def mutate(current):
+            position = current.find_question(question)
+            if position is None:
+                item = _freeze({"question": question, "answer": answer})
+                return current.items + (item,), (dict(item), True)
+            existing = current.items[position]
+            if existing["answer"] == answer:
+                return current.items, (dict(existing), False)
+            item = _freeze({"id": existing["id"], "question": existing["question"], "answer": answer})
+            return current.items[:position] + (item,) + current.items[position + 1:], (dict(item), False)
+
+        return self._mutate(mutate)
+
+    def import_rows(self, rows: Iterable[Tuple[int, str, str]], mode: str = "upsert") -> Dict[str, int]:
+        """
+        Apply (row number, question, answer) rows as one atomic change.
+
+        - replace: the rows become the whole list
+        - append: every row is added; a question that already exists (in the store
+          or earlier in the file) raises GuardrailConflictError and nothing is applied
+        - upsert: existing questions get the new answer, new questions are added
+        """
+        if mode not in IMPORT_MODES:
+            raise ValueError(f"Unsupported import mode '{mode}' (use one of: {', '.join(IMPORT_MODES)})")
+        rows = list(rows)
+
+        def mutate(current):
+            if mode == "replace":
+                items = tuple(_freeze({"question": question, "answer": answer}) for _, question, answer in rows)
+                return items, {"added": len(items), "updated": 0, "unchanged": 0, "removed": len(current.items)}
+
+            items = list(current.items)
+            positions = dict(current.by_question)
+            counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+            conflicts = []
+            for row_number, question, answer in rows:
+                key = normalize_question(question)
+                position = positions.get(key)
+                if position is None:
+                    positions[key] = len(items)
+                    items.append(_freeze({"question": question, "answer": answer}))
+                    counts["added"] += 1
+                elif mode == "append":
+                    conflicts.append(row_number)
+                elif items[position]["answer"] == answer:
+                    counts["unchanged"] += 1
+                else:
+                    existing = items[position]
+                    items[position] = _freeze({"id": existing["id"], "question": existing["question"], "answer": answer})
+                    counts["updated"] += 1
+            if conflicts:
+                shown = ", ".join(str(row_number) for row_number in conflicts[:20])
+                raise GuardrailConflictError(f"{len(conflicts)} row(s) repeat an existing question (rows {shown})")
+            if not counts["added"] and not counts["updated"]:
+                return current.items, counts
+            return tuple(items), counts
+
+        return self._mutate(mutate)
+
+    def update(self, guardrail_id: str, question: Optional[str] = None, answer: Optional[str] = None) -> Optional[Dict[str, str]]:
+        """Change one guardrail's question and/or answer. Returns it, or None if the id is unknown."""
+        def mutate(current):
+            position = current.by_id.get(guardrail_id)
+            if position is None:
+                return current.items, None
+            existing = current.items[position]
+            if question is not None:
+                other = current.find_question(question)
+                if other is not None and other != position:
+                    raise GuardrailConflictError(f"Another guardrail already has this question: '{question}'")
+            item = _freeze({
+                "id": guardrail_id,
+                "question": existing["question"] if question is None else question,
+                "answer": existing["answer"] if answer is None else answer,
+            })
+            if dict(item) == dict(existing):
+                return current.items, dict(existing)
+            return current.items[:position] + (item,) + current.items[position + 1:], dict(item)
+
+        return self._mutate(mutate)
+
+    def remove(self, guardrail_id: str) -> Optional[Dict[str, str]]:
+        """Remove a guardrail by id. Returns it, or None if the id is unknown."""
+        def mutate(current):
+            position = current.by_id.get(guardrail_id)
+            if position is None:
+                return current.items, None
+            return _without(current.items, position), dict(current.items[position])
+
+        return self._mutate(mutate)
+
+    def remove_at(self, index: int) -> Optional[Dict[str, str]]:
+        """Remove the guardrail at `index`. Returns it, or None if the index is out of range."""
+        def mutate(current):
+            if index < 0 or index >= len(current.items):
+                return current.items, None
+            return _without(current.items, index), dict(current.items[index])
+
+        return self._mutate(mutate)
+
+    def remove_by_question(self, question: str) -> Optional[Tuple[int, Dict[str, str]]]:
+        """
+        Remove the guardrail with this question (hash lookup on the normalized text),
+        falling back to the first partial match. Returns (index, guardrail) or None.
+        """
+        wanted = normalize_question(question)
+
+        def mutate(current):
+            position = current.by_question.get(wanted)
+            if position is None and wanted:
+                # Rare path, kept for compatibility with the old partial matching
+                # (by_question is in position order, and its keys are already normalized)
+                position = next(
+                    (pos for key, pos in current.by_question.items() if wanted in key or key in wanted),
+                    None,
+                )
+            if position is None:
+                return current.items, None
+            return _without(current.items, position), (position, dict(current.items[position]))
+
+        return self._mutate(mutate)
+
+    def clear(self) -> int:
+        """Remove all guardrails. Returns how many were removed."""
+        return self._mutate(lambda current: ((), len(current.items)) if current.items else (current.items, 0))
+
+    def _read_changes(self) -> Optional[GuardrailSnapshot]:
+        """A snapshot of the backend's state if another process wrote to it, else None (blocking)"""
+        if self.backend is None:
+            return None
+        with self._write_lock:
+            if not self.backend.has_changed():
+                return None
+            version, items = self.backend.load()
+        return GuardrailSnapshot(version, tuple(_freeze(item) for item in items))
+
+    def _publish_reload(self, snapshot: GuardrailSnapshot) -> bool:
+        # A local write may have published a newer version while the reload ran
+        if snapshot.version <= self._snapshot.version:
+            return False
+        self._snapshot = snapshot
+        self.reloads += 1
+        logger.info(f"Guardrails changed in another process, reloaded version {snapshot.version} ({len(snapshot)} guardrail(s))")
+        return True
+
+    def check_for_changes(self) -> bool:
+        """Reload if another process wrote to the backend. Returns True if reloaded."""
+        snapshot = self._read_changes()
+        return snapshot is not None and self._publish_reload(snapshot)
+
+    async def _watch(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # The check can wait on another process's write lock and the reload is
+                # O(n), so both run in a thread; only the swap happens on the loop
+                snapshot = await asyncio.to_thread(self._read_changes)
+                if snapshot is not None:
+                    self._publish_reload(snapshot)
+            except Exception as e:
+                logger.error(f"Error checking guardrails for changes: {e}")
+
+    def start_watching(self, interval: float = 2.0):
+        """Pick up other workers' writes in the background (never on the request path)"""
+        if self.backend is not None and self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch(interval))
+
+    async def stop_watching(self):
+        if self._watch_task:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+
+    def close(self):
+        if self.backend is not None:
+            self.backend.close()
@@ -0,0 +1,135 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import httpx
+from loguru import logger
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    # httpx only negotiates HTTP/2 when the optional `h2` package is installed
+    HTTP2_AVAILABLE = False
+
+
+@dataclass
+class EndpointConfig:
+    """Connection pool and timeout settings for one outbound host"""
+    name: str
+    base_url: str
+    timeout: float = 30.0
+    connect_timeout: float = 5.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    http2: bool = True
+    headers: Optional[Dict[str, str]] = None
+
+
+class ConnectionStats:
+    """Per-endpoint connection reuse counters"""
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.http2_responses = 0
+        self.errors = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        reused = max(0, self.requests - self.new_connections)
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": reused,
+            "reuse_ratio": round(reused / self.requests, 4) if self.requests else 0.0,
+            "tls_handshakes": self.tls_handshakes,
+            "http2_responses": self.http2_responses,
+            "errors": self.errors,
+        }
+
+
+class _CountingTransport(httpx.AsyncHTTPTransport):
+    """Transport that uses httpcore trace events to count new vs. reused connections"""
+
+    def __init__(self, stats: ConnectionStats, **kwargs):
+        super().__init__(**kwargs)
+        self._stats = stats
+
+    async def _trace(self, event_name: str, info: dict):
+        if event_name == "connection.connect_tcp.complete":
+            self._stats.new_connections += 1
+        elif event_name == "connection.start_tls.complete":
+            self._stats.tls_handshakes += 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._stats.requests += 1
+        request.extensions = {**request.extensions, "trace": self._trace}
+        try:
+            response = await super().handle_async_request(request)
+        except Exception:
+            self._stats.errors += 1
+            raise
+        if response.extensions.get("http_version") == b"HTTP/2":
+            self._stats.http2_responses += 1
+        return response
+
+
+class HttpClients:
+    """
+    App-lifetime registry of pooled `httpx.AsyncClient`s, one per outbound endpoint.
+
+    Each endpoint gets its own connection pool, keep-alive settings and timeouts so a
+    slow dependency cannot exhaust the connections of another. Clients are created on
+    `start()` (FastAPI startup) and closed on `close()` (shutdown); `get()` also creates
+    a client lazily so code running outside the app lifecycle keeps working.
+    """
+
+    def __init__(self, endpoints: List[EndpointConfig]):
+        self._configs = {endpoint.name: endpoint for endpoint in endpoints}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._stats = {name: ConnectionStats() for name in self._configs}
+
+    def _create_client(self, config: EndpointConfig) -> httpx.AsyncClient:
+        http2 = config.http2 and HTTP2_AVAILABLE
+        limits = httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        )
+        transport = _CountingTransport(
+            self._stats[config.name], http2=http2, limits=limits, retries=0
+        )
+        return httpx.AsyncClient(
+            base_url=config.base_url,
+            timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+            headers=config.headers,
+            transport=transport,
+        )
+
+    async def start(self):
+        """Create a client for every configured endpoint"""
+        for name, config in self._configs.items():
+            if name not in self._clients:
+                self._clients[name] = self._create_client(config)
+        logger.info(f"HTTP clients ready: {', '.join(self._configs)} (HTTP/2 {'enabled' if HTTP2_AVAILABLE else 'unavailable'})")
+
+    async def close(self):
+        """Close every client and its pooled connections"""
+        clients, self._clients = self._clients, {}
+        for name, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.error(f"Error closing HTTP client '{name}': {e}")
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Return the pooled client for an endpoint"""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._create_client(self._configs[name])
+            self._clients[name] = client
+        return client
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {name: stats.as_dict() for name, stats in self._stats.items()}
@@ -0,0 +1,126 @@
+import os
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Sequence
+
+from loguru import logger
+
+from background_jobs import percentile
+from text_index import BM25Index
+
+KNOWLEDGE_FILE_EXTENSIONS = (".md", ".txt")
+
+_HEADING = re.compile(r"^(#{1,2})\s+(.*?)\s*$")
+# "## 3. Is transport available?" -> "Is transport available?"
+_NUMBERING = re.compile(r"^\d+[.)]\s*")
+
+
+@dataclass(frozen=True)
+class Passage:
+    source: str
+    title: str
+    text: str
+
+    def as_dict(self) -> Dict[str, str]:
+        return {"title": self.title, "content": self.text, "source": self.source}
+
+
+def split_passages(source: str, markdown: str) -> List[Passage]:
+    """
+    Split a markdown document into one passage per `##` section (the FAQ entries).
+    Text under the `#` heading before the first section becomes its own passage.
+    """
+    passages: List[Passage] = []
+    document_title = os.path.splitext(source)[0]
+    title: Optional[str] = None
+    lines: List[str] = []
+
+    def flush():
+        text = "\n".join(lines).strip()
+        if text:
+            passages.append(Passage(source, title or document_title, text))
+
+    for line in markdown.splitlines():
+        heading = _HEADING.match(line)
+        if heading is None:
+            lines.append(line)
+            continue
+        flush()
+        lines = []
+        if len(heading.group(1)) == 1:
+            document_title, title = heading.group(2), None
+        else:
+            title = _NUMBERING.sub("", heading.group(2))
+    flush()
+    return passages
+
+
+class KnowledgeBase:
+    """
+    In-memory BM25 index over local FAQ/college documents.
+
+    `load()` reads every .md/.txt file in a directory and indexes its sections
+    (title + text); `search()` returns the best-matching passages for a query
+    without leaving the process.
+    """
+
+    def __init__(self, top_k: int = 3, min_score: float = 0.5, latency_window: int = 200):
+        self.top_k = top_k
+        self.min_score = min_score
+        # (passages, index) replaced in one assignment so searches never see a half-built index
+        self._state: tuple = ((), BM25Index([]))
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+
+        # Metrics
+        self.last_build_ms = 0.0
+        self.searches = 0
+        self.empty_results = 0
+
+    def __len__(self) -> int:
+        return len(self._state[0])
+
+    @property
+    def passages(self) -> Sequence[Passage]:
+        return self._state[0]
+
+    def build(self, passages: Sequence[Passage]):
+        started = time.perf_counter()
+        passages = tuple(passages)
+        index = BM25Index([f"{passage.title}\n{passage.text}" for passage in passages])
+        self._state = (passages, index)
+        self.last_build_ms = (time.perf_counter() - started) * 1000
+
+    def load(self, directory: str) -> int:
+        """Index all knowledge files in `directory`; returns the number of passages"""
+        passages: List[Passage] = []
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(KNOWLEDGE_FILE_EXTENSIONS):
+                continue
+            with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+                passages.extend(split_passages(name, f.read()))
+        self.build(passages)
+        logger.info(f"Indexed {len(passages)} knowledge base passage(s) from {directory} in {self.last_build_ms:.1f}ms")
+        return len(passages)
+
+    def search(self, query: str, k: Optional[int] = None) -> List[Passage]:
+        started = time.perf_counter()
+        passages, index = self._state
+        hits = index.search(query, k=k or self.top_k, min_score=self.min_score)
+        results = [passages[doc_id] for doc_id, _score in hits]
+        self.searches += 1
+        if not results:
+            self.empty_results += 1
+        self._latencies.append(time.perf_counter() - started)
+        return results
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "passages": len(self),
+            "last_build_ms": round(self.last_build_ms, 1),
+            "searches": self.searches,
+            "empty_results": self.empty_results,
+            "latency_p50_ms": round(percentile(self._latencies, 0.5) * 1000, 3),
+            "latency_p95_ms": round(percentile(self._latencies, 0.95) * 1000, 3),
+        }
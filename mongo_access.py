@@ -0,0 +1,98 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from loguru import logger
+from pymongo import MongoClient
+from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+
+
+class MongoAccess:
+    """
+    Process-wide MongoDB access layer.
+
+    Holds a single pooled `MongoClient` for the lifetime of the process and runs the
+    (blocking) pymongo calls on a bounded thread pool, so async handlers can await a
+    lookup without stalling the event loop that drives the audio pipelines.
+    """
+
+    def __init__(
+        self,
+        uri: str,
+        max_pool_size: int = 20,
+        max_workers: int = 8,
+        server_selection_timeout_ms: int = 5000,
+    ):
+        self._uri = uri
+        self._max_pool_size = max_pool_size
+        self._max_workers = max_workers
+        self._server_selection_timeout_ms = server_selection_timeout_ms
+        self._client: Optional[MongoClient] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Metrics
+        self.calls = 0
+        self.in_flight = 0
+        self.errors = 0
+
+    def start(self):
+        """Create the pooled client and worker threads (idempotent)"""
+        if self._client is None:
+            # MongoClient connects lazily in the background and is thread-safe
+            self._client = MongoClient(
+                self._uri,
+                maxPoolSize=self._max_pool_size,
+                serverSelectionTimeoutMS=self._server_selection_timeout_ms,
+            )
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="mongo")
+
+    @property
+    def client(self) -> MongoClient:
+        if self._client is None:
+            self.start()
+        return self._client
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking pymongo call on the Mongo thread pool"""
+        if self._executor is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        self.calls += 1
+        self.in_flight += 1
+        try:
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+    async def ping(self) -> bool:
+        """Check connectivity once (at startup), not on every lookup"""
+        try:
+            await self.run(self.client.admin.command, "ping")
+            return True
+        except (ConnectionFailure, ServerSelectionTimeoutError) as e:
+            logger.error(f"Failed to connect to MongoDB: {e}")
+        except Exception as e:
+            logger.error(f"Error connecting to MongoDB: {e}")
+        return False
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "in_flight": self.in_flight,
+            "errors": self.errors,
+            "max_workers": self._max_workers,
+            "max_pool_size": self._max_pool_size,
+        }
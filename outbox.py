@@ -0,0 +1,201 @@
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import time
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from loguru import logger
+
+
+class Outbox:
+    """
+    Durable, append-only outbox backed by a local SQLite file.
+
+    `enqueue()` is a single local insert (WAL mode, synchronous=NORMAL). A background
+    drainer claims due entries in batches, hands each to `sender`, deletes it on
+    success and reschedules it with jittered exponential backoff on failure. Entries
+    survive process restarts, and claims are leased so several processes can drain
+    the same file safely.
+
+    With several processes on one file a statement can wait up to busy_timeout for
+    another's write lock, so every database call runs in a thread (asyncio.to_thread),
+    serialized on this instance's connection by a lock - never on the event loop.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        sender: Callable[[Dict[str, Any]], Awaitable[None]],
+        batch_size: int = 10,
+        poll_interval: float = 2.0,
+        base_backoff: float = 2.0,
+        max_backoff: float = 300.0,
+        max_attempts: int = 50,
+        lease_secs: float = 120.0,
+    ):
+        self._sender = sender
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self.lease_secs = lease_secs
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # isolation_level=None: explicit transactions only, every other statement autocommits
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT,
+                dead INTEGER NOT NULL DEFAULT 0
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS outbox_due ON outbox (dead, next_attempt_at)")
+        # One connection shared by the to_thread() calls: keeps their transactions apart
+        self._db_lock = Lock()
+
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.enqueued = 0
+        self.sent = 0
+        self.failed_attempts = 0
+
+    def _insert(self, payload: str) -> int:
+        now = time.time()
+        with self._db_lock:
+            cursor = self._db.execute(
+                "INSERT INTO outbox (payload, created_at, next_attempt_at) VALUES (?, ?, ?)",
+                (payload, now, now),
+            )
+        return cursor.lastrowid
+
+    async def enqueue(self, payload: Dict[str, Any]) -> int:
+        """Append an entry for delivery. Returns its id."""
+        entry_id = await asyncio.to_thread(self._insert, json.dumps(payload))
+        self.enqueued += 1
+        self._wakeup.set()
+        return entry_id
+
+    def _claim_due(self) -> list:
+        """Lease up to batch_size due entries so no other drainer picks them up meanwhile"""
+        with self._db_lock:
+            now = time.time()
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    "SELECT id, payload, attempts FROM outbox WHERE dead = 0 AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                    (now, self.batch_size),
+                ).fetchall()
+                if rows:
+                    self._db.executemany(
+                        "UPDATE outbox SET next_attempt_at = ? WHERE id = ?",
+                        [(now + self.lease_secs, row[0]) for row in rows],
+                    )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return rows
+
+    def _execute(self, sql: str, params: tuple):
+        with self._db_lock:
+            self._db.execute(sql, params)
+
+    async def _deliver(self, entry_id: int, payload: str, attempts: int):
+        try:
+            await self._sender(json.loads(payload))
+        except asyncio.CancelledError:
+            # Leave the lease to expire so the entry is retried after a restart
+            raise
+        except Exception as e:
+            attempts += 1
+            self.failed_attempts += 1
+            dead = attempts >= self.max_attempts
+            delay = random.uniform(0.5, 1.0) * min(self.max_backoff, self.base_backoff * (2 ** attempts))
+            await asyncio.to_thread(
+                self._execute,
+                "UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ?, dead = ? WHERE id = ?",
+                (attempts, time.time() + delay, str(e)[:500], int(dead), entry_id),
+            )
+            if dead:
+                logger.error(f"Outbox entry {entry_id} gave up after {attempts} attempt(s): {e}")
+            else:
+                logger.warning(f"Outbox entry {entry_id} failed (attempt {attempts}), retrying in {delay:.1f}s: {e}")
+            return
+        await asyncio.to_thread(self._execute, "DELETE FROM outbox WHERE id = ?", (entry_id,))
+        self.sent += 1
+
+    async def drain_once(self) -> int:
+        """Deliver one batch of due entries. Returns the number of entries attempted."""
+        rows = await asyncio.to_thread(self._claim_due)
+        if rows:
+            await asyncio.gather(*(self._deliver(*row) for row in rows))
+        return len(rows)
+
+    async def _run(self):
+        try:
+            backlog = (await asyncio.to_thread(self.stats))["backlog"]
+            logger.info(f"Outbox drainer started ({backlog} entr{'y' if backlog == 1 else 'ies'} pending)")
+        except Exception as e:
+            logger.error(f"Error reading outbox backlog: {e}")
+        while True:
+            try:
+                # Keep draining while full batches are coming back
+                while await self.drain_once() >= self.batch_size:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error draining outbox: {e}", exc_info=True)
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def close(self):
+        with self._db_lock:
+            self._db.close()
+
+    def stats(self) -> Dict[str, float]:
+        """Backlog and delivery counters (blocking; async callers use asyncio.to_thread)"""
+        with self._db_lock:
+            backlog, oldest = self._db.execute(
+                "SELECT COUNT(*), MIN(created_at) FROM outbox WHERE dead = 0"
+            ).fetchone()
+            dead = self._db.execute("SELECT COUNT(*) FROM outbox WHERE dead = 1").fetchone()[0]
+        return {
+            "backlog": backlog,
+            "oldest_entry_age_secs": round(time.time() - oldest, 1) if oldest else 0.0,
+            "dead": dead,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "failed_attempts": self.failed_attempts,
+        }
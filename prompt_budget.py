@@ -0,0 +1,266 @@
+"""
+Token budget report for the system instruction sent to Gemini Live.
+
+    python prompt_budget.py                      # guardrails from GUARDRAILS_DB_PATH, like server.py
+    python prompt_budget.py --mode retrieval --json
+    python prompt_budget.py --guardrails-db ""   # static prompt only
+"""
+import argparse
+import json
+import os
+import re
+import time
+from collections import Counter, defaultdict, deque
+from typing import Any, Deque, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from loguru import logger
+
+from prompt_builder import estimate_tokens, format_guardrail_entry
+from summary_cache import normalize_query
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*$")
+
+
+def _size(text: str) -> Dict[str, int]:
+    return {"chars": len(text), "tokens": estimate_tokens(text)}
+
+
+def split_sections(markdown: str) -> List[Tuple[str, int, str]]:
+    """Split text at markdown headings into (title, level, text); text before the first heading is "(preamble)" """
+    sections: List[Tuple[str, int, str]] = []
+    title, level, lines = "(preamble)", 0, []
+    for line in markdown.splitlines(keepends=True):
+        heading = _HEADING.match(line.rstrip("\n"))
+        if heading is not None:
+            if "".join(lines).strip():
+                sections.append((title, level, "".join(lines)))
+            title, level, lines = heading.group(2).strip("*# "), len(heading.group(1)), []
+        lines.append(line)
+    if "".join(lines).strip():
+        sections.append((title, level, "".join(lines)))
+    return sections
+
+
+def _shingles(text: str, size: int = 2) -> frozenset:
+    words = normalize_query(text).split()
+    if len(words) <= size:
+        return frozenset([" ".join(words)]) if words else frozenset()
+    return frozenset(" ".join(words[i:i + size]) for i in range(len(words) - size + 1))
+
+
+def find_near_duplicates(
+    passages: Sequence[Tuple[str, str]],
+    threshold: float = 0.75,
+    min_tokens: int = 8,
+    max_postings: int = 200,
+) -> List[Dict[str, Any]]:
+    """
+    Pairs of (label, text) passages whose word-bigram sets have Jaccard similarity
+    >= `threshold`. Candidate pairs come from an inverted index over bigrams, so
+    only passages sharing text are compared.
+    """
+    shingles: List[frozenset] = []
+    postings: Dict[str, List[int]] = defaultdict(list)
+    for passage_id, (_, text) in enumerate(passages):
+        grams = _shingles(text) if estimate_tokens(text) >= min_tokens else frozenset()
+        shingles.append(grams)
+        for gram in grams:
+            postings[gram].append(passage_id)
+
+    shared: Counter = Counter()
+    for ids in postings.values():
+        # Bigrams repeated everywhere ("you should") only add noise and pairs
+        if 1 < len(ids) <= max_postings:
+            for i, first in enumerate(ids):
+                for second in ids[i + 1:]:
+                    shared[(first, second)] += 1
+
+    duplicates = []
+    for (first, second), common in shared.items():
+        similarity = common / (len(shingles[first]) + len(shingles[second]) - common)
+        if similarity < threshold:
+            continue
+        text = passages[second][1].strip()
+        duplicates.append({
+            "similarity": round(similarity, 3),
+            "tokens": estimate_tokens(text),
+            "first": passages[first][0],
+            "second": passages[second][0],
+            "excerpt": text[:120],
+        })
+    duplicates.sort(key=lambda duplicate: (-duplicate["tokens"], -duplicate["similarity"]))
+    return duplicates
+
+
+def _lines(label: str, text: str) -> Iterable[Tuple[str, str]]:
+    # The prompt is mostly one rule per line, and rules are what get repeated
+    for line in text.splitlines():
+        if line.strip():
+            yield label, line
+
+
+def analyze_prompt(
+    static_prompt: str,
+    datetime_block: str,
+    guardrails_block: str,
+    guardrails: Sequence[Mapping[str, str]] = (),
+    guardrails_in_prompt: bool = True,
+    max_guardrails: int = 50,
+    duplicate_threshold: float = 0.75,
+    max_duplicates: int = 50,
+) -> Dict[str, Any]:
+    """
+    Size report for an instruction assembled from (static, datetime, guardrails)
+    pieces (PromptAssembler.parts()): estimated tokens per markdown section of the
+    static prompt, the datetime block and each guardrail (largest `max_guardrails`
+    listed), plus near-duplicate passages across all of them.
+    """
+    sections: List[Dict[str, Any]] = []
+    passages: List[Tuple[str, str]] = []
+
+    for title, level, text in split_sections(static_prompt):
+        sections.append({"part": "static", "title": title, "level": level, **_size(text)})
+        passages.extend(_lines(f"static: {title}", text))
+
+    if datetime_block:
+        sections.append({"part": "datetime", "title": "CURRENT DATE AND TIME INFORMATION", "level": 2, **_size(datetime_block)})
+
+    guardrail_sections: List[Dict[str, Any]] = []
+    if guardrails_in_prompt and guardrails_block:
+        entries_chars = 0
+        for idx, guardrail in enumerate(guardrails, 1):
+            entry = format_guardrail_entry(idx, guardrail)
+            if not entry:
+                continue
+            entries_chars += len(entry)
+            label = f"guardrail {guardrail.get('id', idx)}"
+            guardrail_sections.append({"part": "guardrail", "id": guardrail.get("id"), "title": guardrail["question"][:80], "level": 2, **_size(entry)})
+            passages.append((label, f"{guardrail['question']}\n{guardrail['answer']}"))
+        # Header, footer and the "Remember" note around the entries
+        overhead = len(guardrails_block) - entries_chars
+        sections.append({"part": "guardrails", "title": "CUSTOM INSTRUCTIONS AND GUARDRAILS (framing)", "level": 1, "chars": overhead, "tokens": (overhead + 3) // 4})
+    elif guardrails_block:
+        sections.append({"part": "guardrails", "title": "CUSTOM INSTRUCTIONS AND GUARDRAILS (retrieval note)", "level": 1, **_size(guardrails_block)})
+
+    guardrail_sections.sort(key=lambda section: -section["chars"])
+    sections.extend(guardrail_sections[:max_guardrails])
+
+    duplicates = find_near_duplicates(passages, threshold=duplicate_threshold)
+    instruction = static_prompt + datetime_block + guardrails_block
+    return {
+        "guardrails_mode": "prompt" if guardrails_in_prompt else "retrieval",
+        "total": _size(instruction),
+        "parts": {
+            "static": _size(static_prompt),
+            "datetime": _size(datetime_block),
+            "guardrails": {**_size(guardrails_block), "count": len(guardrails)},
+        },
+        "sections": sections,
+        "guardrail_sections_omitted": max(0, len(guardrail_sections) - max_guardrails),
+        "duplicates": duplicates[:max_duplicates],
+        "duplicate_count": len(duplicates),
+        "duplicate_tokens": sum(duplicate["tokens"] for duplicate in duplicates),
+    }
+
+
+class PromptSizeHistory:
+    """
+    Sizes of the instructions sessions actually started with, over time.
+
+    A sample is kept when the size moves by at least `change_ratio` or every
+    `sample_interval` seconds, so a steady prompt costs one sample per interval
+    and every jump (a big guardrail upload, a prompt edit) is recorded. Sizes over
+    `token_budget` are logged as warnings.
+    """
+
+    def __init__(self, max_samples: int = 288, sample_interval: float = 300, change_ratio: float = 0.01, token_budget: int = 0):
+        self.sample_interval = sample_interval
+        self.change_ratio = change_ratio
+        self.token_budget = token_budget
+        self._samples: Deque[Tuple[float, int, str]] = deque(maxlen=max_samples)
+        self.recorded = 0
+        self.over_budget = 0
+        self.max_tokens = 0
+
+    def record(self, instruction: str, guardrails_mode: str):
+        tokens = estimate_tokens(instruction)
+        now = time.time()
+        self.recorded += 1
+        self.max_tokens = max(self.max_tokens, tokens)
+        if self.token_budget and tokens > self.token_budget:
+            self.over_budget += 1
+            logger.warning(f"System instruction is ~{tokens} tokens, over the budget of {self.token_budget}")
+
+        if self._samples:
+            last_time, last_tokens, last_mode = self._samples[-1]
+            changed = abs(tokens - last_tokens) >= last_tokens * self.change_ratio or guardrails_mode != last_mode
+            if not changed and now - last_time < self.sample_interval:
+                return
+        self._samples.append((now, tokens, guardrails_mode))
+
+    def stats(self) -> Dict[str, Any]:
+        samples = list(self._samples)
+        return {
+            "current_tokens": samples[-1][1] if samples else 0,
+            "max_tokens": self.max_tokens,
+            "token_budget": self.token_budget,
+            "recorded": self.recorded,
+            "over_budget": self.over_budget,
+            "samples": [{"time": round(ts), "tokens": tokens, "guardrails_mode": mode} for ts, tokens, mode in samples],
+        }
+
+
+def _print_report(report: Mapping[str, Any]):
+    total = report["total"]
+    print(f"System instruction: {total['chars']} chars, ~{total['tokens']} tokens (guardrails: {report['guardrails_mode']})")
+    for name, size in report["parts"].items():
+        print(f"  {name:<11} ~{size['tokens']:>6} tokens")
+    print()
+    print(f"{'tokens':>7} {'share':>6}  section")
+    for section in report["sections"]:
+        indent = "  " * max(0, section["level"] - 1)
+        share = section["tokens"] / total["tokens"] if total["tokens"] else 0
+        print(f"{section['tokens']:>7} {share:>6.1%}  {indent}[{section['part']}] {section['title']}")
+    if report["guardrail_sections_omitted"]:
+        print(f"{'':>15}... {report['guardrail_sections_omitted']} smaller guardrail(s) not listed")
+    print()
+    print(f"Near-duplicate passages: {report['duplicate_count']} (~{report['duplicate_tokens']} tokens)")
+    for duplicate in report["duplicates"]:
+        print(f"  ~{duplicate['tokens']} tokens, {duplicate['similarity']:.0%} similar: {duplicate['first']} <-> {duplicate['second']}")
+        print(f"    {duplicate['excerpt']!r}")
+
+
+def main():
+    from guardrail_retrieval import GUARDRAIL_INJECTION_MODES, guardrail_retrieval_enabled
+    from guardrails import GuardrailStore, SQLiteGuardrailBackend
+    from prompt_builder import PromptAssembler
+    from system_prompt import SYSTEM_PROMPT
+
+    state_dir = os.getenv("STATE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "state"))
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guardrails-db", default=os.getenv("GUARDRAILS_DB_PATH", os.path.join(state_dir, "guardrails.sqlite3")),
+                        help="Guardrails SQLite file (empty for none)")
+    parser.add_argument("--mode", choices=GUARDRAIL_INJECTION_MODES, default=os.getenv("GUARDRAIL_INJECTION_MODE", "prompt").lower())
+    parser.add_argument("--prompt-max-entries", type=int, default=int(os.getenv("GUARDRAIL_PROMPT_MAX_ENTRIES", "50")))
+    parser.add_argument("--threshold", type=float, default=0.75, help="Near-duplicate similarity threshold")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    backend = SQLiteGuardrailBackend(args.guardrails_db) if args.guardrails_db and os.path.exists(args.guardrails_db) else None
+    store = GuardrailStore(backend=backend)
+    store.load()
+    snapshot = store.snapshot
+    in_prompt = not guardrail_retrieval_enabled(args.mode, len(snapshot), args.prompt_max_entries)
+    assembler = PromptAssembler(SYSTEM_PROMPT, lambda: store.snapshot)
+
+    report = analyze_prompt(*assembler.parts(include_guardrails=in_prompt), guardrails=snapshot.items,
+                            guardrails_in_prompt=in_prompt, duplicate_threshold=args.threshold)
+    store.close()
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
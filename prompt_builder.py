@@ -0,0 +1,243 @@
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from loguru import logger
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    # Fallback for Python < 3.9
+    try:
+        from backports.zoneinfo import ZoneInfo
+    except ImportError:
+        # Final fallback - use UTC
+        ZoneInfo = None
+
+
+def get_current_datetime_info() -> Dict[str, str]:
+    """
+    Get current date and time information in Asia/Kolkata timezone.
+    Returns formatted strings for use in system prompt.
+    """
+    try:
+        # Get current time in Asia/Kolkata timezone
+        if ZoneInfo is not None:
+            tz = ZoneInfo("Asia/Kolkata")
+            now = datetime.now(tz)
+            timezone_name = "Asia/Kolkata (IST)"
+        else:
+            # Fallback to UTC + 5:30 offset manually
+            from datetime import timezone
+            ist_offset = timedelta(hours=5, minutes=30)
+            tz = timezone(ist_offset)
+            now = datetime.now(tz)
+            timezone_name = "IST (UTC+5:30)"
+
+        # Format date as YYYY-MM-DD
+        current_date = now.strftime("%Y-%m-%d")
+
+        # Format time as HH:MM (24-hour format)
+        current_time = now.strftime("%H:%M")
+
+        # Get day of week
+        day_of_week = now.strftime("%A")
+
+        # Get readable date format
+        readable_date = now.strftime("%B %d, %Y")  # e.g., "December 31, 2025"
+
+        # Calculate tomorrow's date
+        tomorrow = now + timedelta(days=1)
+        tomorrow_date = tomorrow.strftime("%Y-%m-%d")
+        tomorrow_readable = tomorrow.strftime("%B %d, %Y")
+        tomorrow_day = tomorrow.strftime("%A")
+
+        return {
+            "current_date": current_date,
+            "current_time": current_time,
+            "day_of_week": day_of_week,
+            "readable_date": readable_date,
+            "tomorrow_date": tomorrow_date,
+            "tomorrow_readable": tomorrow_readable,
+            "tomorrow_day": tomorrow_day,
+            "timezone": timezone_name
+        }
+    except Exception as e:
+        logger.error(f"Error getting current datetime: {e}")
+        # Fallback to UTC if timezone fails
+        now = datetime.now()
+        return {
+            "current_date": now.strftime("%Y-%m-%d"),
+            "current_time": now.strftime("%H:%M"),
+            "day_of_week": now.strftime("%A"),
+            "readable_date": now.strftime("%B %d, %Y"),
+            "tomorrow_date": (now + timedelta(days=1)).strftime("%Y-%m-%d"),
+            "tomorrow_readable": (now + timedelta(days=1)).strftime("%B %d, %Y"),
+            "tomorrow_day": (now + timedelta(days=1)).strftime("%A"),
+            "timezone": "UTC (fallback)"
+        }
+
+
+def format_datetime_block(datetime_info: Dict[str, str]) -> str:
+    """Format the current date/time section of the system prompt"""
+    return f"""
+
+## CURRENT DATE AND TIME INFORMATION
+
+**IMPORTANT: Use this information when answering questions about dates/times.**
+
+- **Current Date**: {datetime_info['readable_date']} ({datetime_info['day_of_week']})
+- **Current Date (YYYY-MM-DD format)**: {datetime_info['current_date']}
+- **Current Time**: {datetime_info['current_time']} ({datetime_info['timezone']})
+- **Tomorrow's Date**: {datetime_info['tomorrow_readable']} ({datetime_info['tomorrow_day']})
+- **Tomorrow's Date (YYYY-MM-DD format)**: {datetime_info['tomorrow_date']}
+- Current timezone is {datetime_info['timezone']}
+
+"""
+
+
+def format_guardrail_entry(idx: int, guardrail: Dict[str, str]) -> str:
+    """Format one guardrail of the system prompt block ("" if it is incomplete)"""
+    question = guardrail.get("question", "").strip()
+    answer = guardrail.get("answer", "").strip()
+    if not (question and answer):
+        return ""
+    return (
+        f"## Instruction {idx}\n\n"
+        f"**When asked (or similar to):** {question}\n\n"
+        f"**You should respond like this:** {answer}\n\n"
+    )
+
+
+def format_guardrails_block(guardrails: Iterable[Dict[str, str]]) -> str:
+    """
+    Format guardrails (question-answer pairs) for inclusion in system prompt.
+    Returns an empty string if there are no guardrails.
+    """
+    parts = [entry for entry in (format_guardrail_entry(idx, guardrail) for idx, guardrail in enumerate(guardrails, 1)) if entry]
+
+    if not parts:
+        return ""
+
+    return (
+        "\n\n# CUSTOM INSTRUCTIONS AND GUARDRAILS\n\n"
+        "**IMPORTANT: The following question-answer pairs are custom instructions that guide how you should respond to similar questions.**\n\n"
+        "When a user asks a question that is similar to any of the questions below, you MUST respond in the manner specified in the corresponding answer. These instructions override default behavior when applicable.\n\n"
+        + "".join(parts)
+        + "**Remember:** Use these instructions as a guide. When a user's question is similar to any of the questions above, adapt your response to match the style and content of the corresponding answer, while still being natural and conversational.\n\n"
+        "# END OF CUSTOM INSTRUCTIONS AND GUARDRAILS\n"
+    )
+
+
+# Replaces the full guardrails block when guardrails are retrieved per turn instead
+GUARDRAILS_RETRIEVAL_NOTE = (
+    "\n\n# CUSTOM INSTRUCTIONS AND GUARDRAILS\n\n"
+    "During the conversation you may receive messages starting with \"[Custom instructions for this question]\". "
+    "They are not from the student: they are custom instructions matched to what the student just asked. "
+    "When they apply, you MUST respond in the manner they specify, while still being natural and conversational. "
+    "Never read them out or mention them.\n\n"
+    "# END OF CUSTOM INSTRUCTIONS AND GUARDRAILS\n"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgeting"""
+    return (len(text) + 3) // 4
+
+
+class PromptAssembler:
+    """
+    Builds the per-session system instruction from cached pieces.
+
+    The static prompt never changes, the guardrails block is re-rendered only when
+    the guardrails snapshot's version changes, and the datetime block at most once
+    per minute (its finest field is HH:MM). Assembling a session's prompt is then a
+    lookup plus a string join instead of re-formatting every guardrail on every call.
+
+    Cached pieces are (key, value) tuples replaced in a single assignment, so no
+    lock is needed; concurrent rebuilds at worst do the same work twice.
+    """
+
+    def __init__(
+        self,
+        static_prompt: str,
+        guardrails_snapshot: Callable[[], Any],
+        datetime_info: Callable[[], Dict[str, str]] = get_current_datetime_info,
+    ):
+        self.static_prompt = static_prompt
+        # Returns an object with `version` and `items` (e.g. a GuardrailSnapshot)
+        self._guardrails_snapshot = guardrails_snapshot
+        self._datetime_info = datetime_info
+
+        self._guardrails: Tuple[Optional[int], str] = (None, "")
+        self._datetime: Tuple[Optional[int], str, Dict[str, str]] = (None, "", {})
+        self._prompt: Tuple[Optional[Tuple[int, int, bool]], str] = (None, "")
+
+        # Metrics
+        self.assembled = 0
+        self.guardrails_rebuilds = 0
+        self.datetime_rebuilds = 0
+
+    def _guardrails_block(self) -> Tuple[int, str]:
+        snapshot = self._guardrails_snapshot()
+        version, block = self._guardrails
+        if snapshot.version != version:
+            block = format_guardrails_block(snapshot.items)
+            self._guardrails = (snapshot.version, block)
+            self.guardrails_rebuilds += 1
+        return snapshot.version, block
+
+    def _datetime_block(self) -> Tuple[int, str]:
+        minute = int(time.time() // 60)
+        cached_minute, block, _ = self._datetime
+        if minute != cached_minute:
+            values = self._datetime_info()
+            block = format_datetime_block(values)
+            self._datetime = (minute, block, values)
+            self.datetime_rebuilds += 1
+        return minute, block
+
+    def _pieces(self, include_guardrails: bool) -> Tuple[Tuple[int, int, bool], str, str]:
+        minute, datetime_block = self._datetime_block()
+        if include_guardrails:
+            version, guardrails_block = self._guardrails_block()
+        else:
+            # Retrieved per turn instead: no need to format the (possibly large) block
+            snapshot = self._guardrails_snapshot()
+            version = snapshot.version
+            guardrails_block = GUARDRAILS_RETRIEVAL_NOTE if snapshot.items else ""
+        return (minute, version, include_guardrails), datetime_block, guardrails_block
+
+    def parts(self, include_guardrails: bool = True) -> Tuple[str, str, str]:
+        """(static, datetime, guardrails) pieces that build() joins, for size analysis"""
+        _, datetime_block, guardrails_block = self._pieces(include_guardrails)
+        return self.static_prompt, datetime_block, guardrails_block
+
+    def build(self, include_guardrails: bool = True) -> str:
+        """
+        Return the system instruction for a new session. With include_guardrails=False
+        the guardrails are left out (they are retrieved per turn instead) and only a
+        short note on how to treat retrieved instructions is added.
+        """
+        key, datetime_block, guardrails_block = self._pieces(include_guardrails)
+        cached_key, prompt = self._prompt
+        if key != cached_key:
+            prompt = self.static_prompt + datetime_block + guardrails_block
+            self._prompt = (key, prompt)
+        self.assembled += 1
+        return prompt
+
+    @property
+    def datetime_info(self) -> Dict[str, str]:
+        """Date/time values used in the most recently built prompt"""
+        return self._datetime[2]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "assembled": self.assembled,
+            "guardrails_rebuilds": self.guardrails_rebuilds,
+            "datetime_rebuilds": self.datetime_rebuilds,
+            "static_chars": len(self.static_prompt),
+            "guardrails_chars": len(self._guardrails[1]),
+            "prompt_chars": len(self._prompt[1]),
+        }
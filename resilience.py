@@ -0,0 +1,242 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import httpx
+from loguru import logger
+
+from background_jobs import percentile
+
+T = TypeVar("T")
+
+# Failures where the request never reached the server, so a retry cannot duplicate side effects
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+# Failures that may be transient but where the server could already have acted
+TRANSIENT_ERRORS = CONNECT_ERRORS + (httpx.ReadTimeout, httpx.RemoteProtocolError, httpx.ReadError)
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the dependency while its circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open circuit breaker.
+
+    Opens after `failure_threshold` consecutive failures, fails fast for
+    `reset_timeout` seconds, then lets a single trial call through (half-open).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def release_trial(self):
+        """Give back the half-open trial slot without an outcome (the trial call was cancelled)"""
+        self._trial_in_flight = False
+
+    def record_success(self):
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self._consecutive_failures += 1
+        was_trial = self._trial_in_flight
+        self._trial_in_flight = False
+        if was_trial or self._consecutive_failures >= self.failure_threshold:
+            if self._state != self.OPEN or was_trial:
+                self.times_opened += 1
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+
+
+class ResilientEndpoint:
+    """
+    Resilience policy for calls to one dependency.
+
+    - latency-aware timeout: p99 of recent successful calls x `timeout_multiplier`,
+      clamped to [min_timeout, max_timeout]
+    - retries with full-jitter exponential backoff: always for connect-phase failures,
+      and for transient errors / retryable status codes only when `idempotent=True`
+    - optional hedging (idempotent calls only): a second attempt is started when the
+      first has not finished after the observed p95
+    - a circuit breaker that fails fast while the dependency is unhealthy
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_attempts: int = 3,
+        base_backoff: float = 0.2,
+        max_backoff: float = 2.0,
+        min_timeout: float = 5.0,
+        max_timeout: float = 30.0,
+        timeout_multiplier: float = 2.0,
+        hedge: bool = False,
+        hedge_min_delay: float = 0.5,
+        breaker: Optional[CircuitBreaker] = None,
+        latency_window: int = 200,
+    ):
+        self.name = name
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.breaker = breaker or CircuitBreaker()
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+
+        # Metrics
+        self.calls = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failures = 0
+
+    def current_timeout(self) -> float:
+        """Timeout for the next attempt, derived from recent latencies"""
+        if len(self._latencies) < 10:
+            return self.max_timeout
+        adaptive = percentile(self._latencies, 0.99) * self.timeout_multiplier
+        return max(self.min_timeout, min(self.max_timeout, adaptive))
+
+    def _hedge_delay(self) -> float:
+        return max(self.hedge_min_delay, percentile(self._latencies, 0.95))
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * (2 ** attempt)))
+
+    def _is_retryable(self, error: Exception, idempotent: bool) -> bool:
+        if isinstance(error, CONNECT_ERRORS):
+            return True
+        if not idempotent:
+            return False
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in RETRYABLE_STATUS_CODES
+        return isinstance(error, TRANSIENT_ERRORS)
+
+    async def _attempt(self, call: Callable[[float], Awaitable[T]], timeout: float) -> T:
+        started = time.monotonic()
+        result = await call(timeout)
+        self._latencies.append(time.monotonic() - started)
+        return result
+
+    async def _hedged_attempt(self, call: Callable[[float], Awaitable[T]], timeout: float) -> T:
+        primary = asyncio.create_task(self._attempt(call, timeout))
+        done, _ = await asyncio.wait({primary}, timeout=self._hedge_delay())
+        if done:
+            return primary.result()
+
+        self.hedges += 1
+        secondary = asyncio.create_task(self._attempt(call, timeout))
+        pending = {primary, secondary}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is secondary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, call: Callable[[float], Awaitable[T]], idempotent: bool = False) -> T:
+        """
+        Run `call(timeout)` under this policy. `call` must raise on failure (e.g. via
+        `response.raise_for_status()`) so that failures are counted and retried.
+        """
+        is_trial = self.breaker.state == CircuitBreaker.HALF_OPEN
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open)")
+
+        self.calls += 1
+        try:
+            return await self._call_with_retries(call, idempotent)
+        finally:
+            if is_trial:
+                # Cancelled mid-trial (barge-in, hang-up): neither a success nor a failure,
+                # but the next call must be allowed to try again
+                self.breaker.release_trial()
+
+    async def _call_with_retries(self, call: Callable[[float], Awaitable[T]], idempotent: bool) -> T:
+        attempt = 0
+        while True:
+            timeout = self.current_timeout()
+            try:
+                if self.hedge and idempotent and len(self._latencies) >= 10:
+                    result = await self._hedged_attempt(call, timeout)
+                else:
+                    result = await self._attempt(call, timeout)
+                self.breaker.record_success()
+                return result
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                attempt += 1
+                # 4xx responses mean the dependency is healthy but rejected this request
+                is_client_error = isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500
+                if attempt < self.max_attempts and self._is_retryable(e, idempotent):
+                    self.retries += 1
+                    delay = self._backoff(attempt)
+                    logger.warning(f"{self.name} call failed ({type(e).__name__}), retry {attempt} in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                self.failures += 1
+                if is_client_error:
+                    self.breaker.record_success()
+                else:
+                    self.breaker.record_failure()
+                raise
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "circuit_state": self.breaker.state,
+            "circuit_times_opened": self.breaker.times_opened,
+            "circuit_rejected": self.breaker.rejected,
+            "calls": self.calls,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failures": self.failures,
+            "latency_p50_ms": round(percentile(self._latencies, 0.5) * 1000, 1),
+            "latency_p95_ms": round(percentile(self._latencies, 0.95) * 1000, 1),
+            "current_timeout_secs": round(self.current_timeout(), 2),
+        }
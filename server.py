@@ -1,47 +1,56 @@
 import os
 import sys
 import asyncio
-import aiohttp
 import httpx
 import time
 import json
 import atexit
-from datetime import datetime, timedelta
-from threading import Lock
-from typing import List, Dict, Optional
+import tempfile
+from typing import List, Dict, Optional, Set
 from pydantic import BaseModel
-try:
-    from zoneinfo import ZoneInfo
-except ImportError:
-    # Fallback for Python < 3.9
-    try:
-        from backports.zoneinfo import ZoneInfo
-    except ImportError:
-        # Final fallback - use UTC
-        ZoneInfo = None
 
 from dotenv import load_dotenv
 from system_prompt import SYSTEM_PROMPT
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from prompt_builder import PromptAssembler
+from prompt_budget import PromptSizeHistory, analyze_prompt
+from guardrails import GuardrailConflictError, GuardrailStore, SQLiteGuardrailBackend
+from guardrail_retrieval import GuardrailRetrievalProcessor, GuardrailRetriever, guardrail_retrieval_enabled
+from guardrail_io import IMPORT_FORMATS, ImportErrors, iter_export, parse_guardrail_rows
+from call_session import CallSession
+from session_registry import SessionCapacityError, SessionRecord, SessionRegistry
+from session_workers import SessionWorkerPool
+from shared_vad import BatchedSileroVADAnalyzer, BatchedVADEngine, SharedSileroVADAnalyzer, SileroModelManager
+from background_jobs import BackgroundJobQueue
+from daily_rooms import DailyRoomPool, PooledRoom
+from outbox import Outbox
+from resilience import CircuitBreaker, CircuitOpenError, ResilientEndpoint
+from summary_cache import SummaryCache, load_warmup_queries
+from transcript_stream import TranscriptStream, format_transcript
+from ttl_cache import TTLCache
+from branch_knowledge import BranchKnowledge
+from knowledge_base import KnowledgeBase
+from http_clients import EndpointConfig, HttpClients
+from mongo_access import MongoAccess
+from warm_bots import WarmBot, WarmBotPool
 
 # Load environment variables from .env file
 load_dotenv()
 
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Request, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pyngrok import ngrok
 
-from pipecat.frames.frames import EndFrame, LLMRunFrame
+from pipecat.frames.frames import EndFrame, LLMMessagesAppendFrame, LLMRunFrame
 from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.runner import PipelineRunner
 from pipecat.pipeline.task import PipelineParams, PipelineTask
 from pipecat.processors.aggregators.llm_context import LLMContext
 from pipecat.processors.aggregators.llm_response_universal import LLMContextAggregatorPair
+from pipecat.processors.transcript_processor import TranscriptProcessor
 from pipecat.services.google.gemini_live.llm_vertex import GeminiLiveVertexLLMService
+from google.genai.types import Content, Part
 from pipecat.transports.services.daily import DailyParams, DailyTransport
-from pipecat.audio.vad.silero import SileroVADAnalyzer
 from pipecat.audio.vad.vad_analyzer import VADParams
 from pipecat.adapters.schemas.function_schema import FunctionSchema
 from pipecat.adapters.schemas.tools_schema import ToolsSchema
@@ -56,10 +65,6 @@ logger.add(sys.stderr, level="DEBUG")
 # Global variable to store the ngrok tunnel
 ngrok_tunnel = None
 
-# Global storage for guardrails (question-answer pairs)
-guardrails_storage: List[Dict[str, str]] = []
-guardrails_lock = Lock()
-
 # FastAPI app
 app = FastAPI()
 
@@ -88,6 +93,192 @@ if not GOOGLE_VERTEX_CREDENTIALS:
 if not MONGODB_URI:
     logger.warning("MONGODB_URI not set - user lookup functionality will be disabled")
 
+# Daily room pool configuration (set DAILY_ROOM_POOL_MIN_SIZE=0 and MAX_SIZE=0 to disable)
+DAILY_ROOM_EXPIRY_SECS = int(os.getenv("DAILY_ROOM_EXPIRY_SECS", "3600"))
+DAILY_ROOM_POOL_MIN_SIZE = int(os.getenv("DAILY_ROOM_POOL_MIN_SIZE", "2"))
+DAILY_ROOM_POOL_MAX_SIZE = int(os.getenv("DAILY_ROOM_POOL_MAX_SIZE", "10"))
+DAILY_ROOM_POOL_REFILL_INTERVAL_SECS = float(os.getenv("DAILY_ROOM_POOL_REFILL_INTERVAL_SECS", "5"))
+DAILY_ROOM_POOL_REFILL_BATCH = int(os.getenv("DAILY_ROOM_POOL_REFILL_BATCH", "2"))
+# Pooled rooms with less lifetime left than this are discarded instead of handed out
+DAILY_ROOM_POOL_MIN_REMAINING_SECS = int(os.getenv("DAILY_ROOM_POOL_MIN_REMAINING_SECS", "900"))
+
+# Warm bot pool: bots already in a room with their Gemini Live session open, handed to
+# callers at /start (0 = disabled; in-process mode only). Keep the idle timeout below the
+# pipeline's 300s idle timeout and the Live session's lifetime
+WARM_BOT_POOL_SIZE = int(os.getenv("WARM_BOT_POOL_SIZE", "0"))
+WARM_BOT_IDLE_TIMEOUT_SECS = float(os.getenv("WARM_BOT_IDLE_TIMEOUT_SECS", "240"))
+WARM_BOT_WARMUP_TIMEOUT_SECS = float(os.getenv("WARM_BOT_WARMUP_TIMEOUT_SECS", "20"))
+
+# Opt-in: verify/create the indexes used by user lookups on startup
+MONGODB_ENSURE_INDEXES = os.getenv("MONGODB_ENSURE_INDEXES", "false").lower() in ("1", "true", "yes")
+
+# Process-wide MongoDB client; blocking calls run on a bounded thread pool
+mongo = MongoAccess(
+    MONGODB_URI,
+    max_pool_size=int(os.getenv("MONGODB_MAX_POOL_SIZE", "20")),
+    max_workers=int(os.getenv("MONGODB_MAX_WORKERS", "8")),
+) if MONGODB_URI else None
+
+# Cache of user profile lookups, keyed by normalized phone and lowercased email.
+# Negative results (user not found) expire sooner since new users are created after their first call.
+user_cache = TTLCache(
+    max_size=int(os.getenv("USER_CACHE_MAX_SIZE", "10000")),
+    ttl=float(os.getenv("USER_CACHE_TTL_SECS", "86400")),
+    negative_ttl=float(os.getenv("USER_CACHE_NEGATIVE_TTL_SECS", "300")),
+)
+
+# Resilience policies (retries, hedging, circuit breaker) for the Cloud Run processors
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT_SECS = float(os.getenv("CIRCUIT_RESET_TIMEOUT_SECS", "30"))
+preprocessor_endpoint = ResilientEndpoint(
+    "preprocessor",
+    max_attempts=int(os.getenv("PREPROCESSOR_MAX_ATTEMPTS", "3")),
+    min_timeout=float(os.getenv("PREPROCESSOR_MIN_TIMEOUT_SECS", "10")),
+    max_timeout=float(os.getenv("HTTP_PREPROCESSOR_TIMEOUT_SECS", "30")),
+    hedge=os.getenv("PREPROCESSOR_HEDGE", "true").lower() in ("1", "true", "yes"),
+    breaker=CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT_SECS),
+)
+postprocessor_endpoint = ResilientEndpoint(
+    "postprocessor",
+    max_attempts=int(os.getenv("POSTPROCESSOR_MAX_ATTEMPTS", "3")),
+    min_timeout=float(os.getenv("POSTPROCESSOR_MIN_TIMEOUT_SECS", "10")),
+    max_timeout=float(os.getenv("HTTP_POSTPROCESSOR_TIMEOUT_SECS", "30")),
+    breaker=CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT_SECS),
+)
+
+# "background": get_detailed_information answers immediately and delivery runs on a job queue.
+# "sync": the tool waits for the preprocessor before answering (previous behaviour).
+DETAILED_INFO_DELIVERY_MODE = os.getenv("DETAILED_INFO_DELIVERY_MODE", "background").lower()
+detailed_info_jobs = BackgroundJobQueue(
+    "detailed-info",
+    concurrency=int(os.getenv("DETAILED_INFO_JOB_CONCURRENCY", "8")),
+    max_queue_size=int(os.getenv("DETAILED_INFO_JOB_QUEUE_SIZE", "200")),
+)
+
+# Directory for runtime state files (caches, queues); not part of the source tree
+STATE_DIR = os.getenv("STATE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "state"))
+
+# Cache of preprocessor summaries by normalized query (memory + SQLite file; empty path = memory only)
+SUMMARY_CACHE_DB_PATH = os.getenv("SUMMARY_CACHE_DB_PATH", os.path.join(STATE_DIR, "summary_cache.sqlite3"))
+# Optional file of common queries (one per line) to pre-generate summaries for at startup
+SUMMARY_CACHE_WARMUP_FILE = os.getenv("SUMMARY_CACHE_WARMUP_FILE", "")
+summary_cache = SummaryCache(
+    max_size=int(os.getenv("SUMMARY_CACHE_MAX_SIZE", "500")),
+    ttl=float(os.getenv("SUMMARY_CACHE_TTL_SECS", "86400")),
+    db_path=SUMMARY_CACHE_DB_PATH or None,
+)
+
+# Global storage for guardrails (question-answer pairs), as copy-on-write snapshots.
+# "sqlite" persists them in a file shared by all workers on the host; "memory" keeps the old behaviour.
+GUARDRAILS_BACKEND = os.getenv("GUARDRAILS_BACKEND", "sqlite").lower()
+GUARDRAILS_DB_PATH = os.getenv("GUARDRAILS_DB_PATH", os.path.join(STATE_DIR, "guardrails.sqlite3"))
+# Largest request body accepted by POST /guardrails/import
+GUARDRAILS_IMPORT_MAX_BYTES = int(os.getenv("GUARDRAILS_IMPORT_MAX_BYTES", str(50 * 1024 * 1024)))
+# How often each worker checks whether another worker changed the guardrails
+GUARDRAILS_WATCH_INTERVAL_SECS = float(os.getenv("GUARDRAILS_WATCH_INTERVAL_SECS", "2"))
+guardrails_store = GuardrailStore(
+    backend=SQLiteGuardrailBackend(GUARDRAILS_DB_PATH) if GUARDRAILS_BACKEND == "sqlite" else None
+)
+
+# Per-session system instruction assembled from cached static, datetime and guardrails pieces
+prompt_assembler = PromptAssembler(SYSTEM_PROMPT, lambda: guardrails_store.snapshot)
+# Sizes of the instructions sessions start with (in /metrics); larger ones log a warning
+prompt_size_history = PromptSizeHistory(token_budget=int(os.getenv("PROMPT_TOKEN_BUDGET", "12000")))
+
+# How guardrails reach the model: "prompt" puts every pair in the system instruction,
+# "retrieval" injects only the pairs matching each user sentence, and "auto" switches
+# to retrieval once there are more than GUARDRAIL_PROMPT_MAX_ENTRIES guardrails.
+# Retrieved guardrails arrive after Gemini Live has started answering the sentence
+# that matched them, so they only shape the following turns - hence "prompt" by default
+GUARDRAIL_INJECTION_MODE = os.getenv("GUARDRAIL_INJECTION_MODE", "prompt").lower()
+GUARDRAIL_PROMPT_MAX_ENTRIES = int(os.getenv("GUARDRAIL_PROMPT_MAX_ENTRIES", "50"))
+guardrail_retriever = GuardrailRetriever(
+    lambda: guardrails_store.snapshot,
+    top_k=int(os.getenv("GUARDRAIL_RETRIEVAL_TOP_K", "3")),
+    min_score=float(os.getenv("GUARDRAIL_RETRIEVAL_MIN_SCORE", "0.2")),
+    max_tokens=int(os.getenv("GUARDRAIL_RETRIEVAL_MAX_TOKENS", "300")),
+)
+
+
+def use_guardrail_retrieval(guardrail_count: int) -> bool:
+    return guardrail_retrieval_enabled(GUARDRAIL_INJECTION_MODE, guardrail_count, GUARDRAIL_PROMPT_MAX_ENTRIES)
+
+# Branch career paths and alumni data for get_career_paths/get_alumni_info.
+# Edit the file to update it; changes are picked up within BRANCH_DATA_CHECK_INTERVAL_SECS.
+BRANCH_DATA_PATH = os.getenv("BRANCH_DATA_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "branches.json"))
+branch_knowledge = BranchKnowledge(
+    BRANCH_DATA_PATH,
+    check_interval=float(os.getenv("BRANCH_DATA_CHECK_INTERVAL_SECS", "5")),
+)
+
+# FAQ/college documents (.md/.txt) served by the search_knowledge_base tool, indexed at startup
+KNOWLEDGE_BASE_DIR = os.getenv("KNOWLEDGE_BASE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "knowledge"))
+knowledge_base = KnowledgeBase(
+    top_k=int(os.getenv("KNOWLEDGE_BASE_TOP_K", "3")),
+    min_score=float(os.getenv("KNOWLEDGE_BASE_MIN_SCORE", "0.5")),
+)
+
+# Running bots in this process. /start answers 503 + Retry-After once MAX_CONCURRENT_SESSIONS
+# calls are running (0 = no limit), or first waits up to SESSION_QUEUE_TIMEOUT_SECS for a slot
+session_registry = SessionRegistry(
+    max_sessions=int(os.getenv("MAX_CONCURRENT_SESSIONS", "20")),
+    queue_timeout=float(os.getenv("SESSION_QUEUE_TIMEOUT_SECS", "0")),
+    max_waiters=int(os.getenv("SESSION_QUEUE_MAX_WAITERS", "10")),
+    retry_after=int(os.getenv("SESSION_RETRY_AFTER_SECS", "5")),
+)
+
+# Multi-process mode: with SESSION_WORKERS > 0 this process only serves the API and runs
+# each call in one of that many worker processes (MAX_CONCURRENT_SESSIONS is then per worker)
+SESSION_WORKERS = int(os.getenv("SESSION_WORKERS", "0"))
+session_worker_pool: Optional[SessionWorkerPool] = None
+
+# Silero VAD model loaded once per process at startup; each call gets its own stream state
+silero_vad = SileroModelManager()
+
+# Optionally run the VAD frames of all calls in a process as one batched inference. Trades
+# up to VAD_BATCH_MAX_WAIT_MS of latency per frame for less CPU at high concurrency; a frame
+# not batched within VAD_BATCH_TIMEOUT_MS runs on its own
+VAD_BATCHING = os.getenv("VAD_BATCHING", "false").lower() == "true"
+vad_batcher = BatchedVADEngine(
+    silero_vad,
+    max_wait_ms=float(os.getenv("VAD_BATCH_MAX_WAIT_MS", "4")),
+    max_batch=int(os.getenv("VAD_BATCH_MAX_SIZE", "64")),
+    timeout_ms=float(os.getenv("VAD_BATCH_TIMEOUT_MS", "20")),
+)
+
+# Pool of pre-created Daily rooms, started on FastAPI startup
+daily_room_pool: Optional[DailyRoomPool] = None
+
+# Pool of pre-joined bots, started on FastAPI startup
+warm_bot_pool: Optional[WarmBotPool] = None
+
+# Outbound endpoints
+PREPROCESSOR_BASE_URL = os.getenv("PREPROCESSOR_BASE_URL", "https://vitpreprocessor-739298578243.us-central1.run.app")
+POSTPROCESSOR_BASE_URL = os.getenv("POSTPROCESSOR_BASE_URL", "https://vitpostprocessor-739298578243.us-central1.run.app")
+
+# Shared, app-lifetime HTTP clients (one connection pool per endpoint)
+http_clients = HttpClients([
+    EndpointConfig(
+        name="daily",
+        base_url="https://api.daily.co/v1",
+        timeout=float(os.getenv("HTTP_DAILY_TIMEOUT_SECS", "10")),
+        max_connections=int(os.getenv("HTTP_DAILY_MAX_CONNECTIONS", "20")),
+        headers={"Authorization": f"Bearer {DAILY_API_KEY}"},
+    ),
+    EndpointConfig(
+        name="preprocessor",
+        base_url=PREPROCESSOR_BASE_URL,
+        timeout=float(os.getenv("HTTP_PREPROCESSOR_TIMEOUT_SECS", "30")),
+        max_connections=int(os.getenv("HTTP_PREPROCESSOR_MAX_CONNECTIONS", "50")),
+    ),
+    EndpointConfig(
+        name="postprocessor",
+        base_url=POSTPROCESSOR_BASE_URL,
+        timeout=float(os.getenv("HTTP_POSTPROCESSOR_TIMEOUT_SECS", "30")),
+        max_connections=int(os.getenv("HTTP_POSTPROCESSOR_MAX_CONNECTIONS", "20")),
+    ),
+])
+
 
 def start_ngrok_tunnel(port=8000):
     """Start ngrok tunnel and return the public URL."""
@@ -209,156 +400,65 @@ def fix_credentials():
     return json.dumps(creds_dict)
 
 
-def format_guardrails_for_prompt() -> str:
-    """
-    Format stored guardrails (question-answer pairs) for inclusion in system prompt.
-    Returns an empty string if no guardrails are stored.
-    """
-    with guardrails_lock:
-        if not guardrails_storage:
-            return ""
-        
-        guardrails_text = "\n\n# CUSTOM INSTRUCTIONS AND GUARDRAILS\n\n"
-        guardrails_text += "**IMPORTANT: The following question-answer pairs are custom instructions that guide how you should respond to similar questions.**\n\n"
-        guardrails_text += "When a user asks a question that is similar to any of the questions below, you MUST respond in the manner specified in the corresponding answer. These instructions override default behavior when applicable.\n\n"
+def build_preprocessor_payload(query: str, phone_number: str = None, email: str = None) -> dict:
+    """Build the preprocessor request payload - only include provided fields"""
+    request_payload = {"query": query}
+    
+    if phone_number:
+        # Extract exactly 10 digits from the phone number
+        # Remove all non-digit characters first
+        digits_only = ''.join(filter(str.isdigit, phone_number))
         
-        for idx, guardrail in enumerate(guardrails_storage, 1):
-            question = guardrail.get("question", "").strip()
-            answer = guardrail.get("answer", "").strip()
-            
-            if question and answer:
-                guardrails_text += f"## Instruction {idx}\n\n"
-                guardrails_text += f"**When asked (or similar to):** {question}\n\n"
-                guardrails_text += f"**You should respond like this:** {answer}\n\n"
+        # If the number starts with "91" and has more than 10 digits, remove the "91" prefix
+        # to get the actual 10-digit phone number
+        if digits_only.startswith("91") and len(digits_only) > 10:
+            # Remove the "91" prefix to get the 10-digit number
+            phone_number_clean = digits_only[2:]  # Remove first 2 digits (91)
+        elif len(digits_only) > 10:
+            # If it's longer than 10 digits but doesn't start with 91, take last 10 digits
+            phone_number_clean = digits_only[-10:]
+        elif len(digits_only) < 10:
+            # If less than 10 digits, pad with zeros (shouldn't happen if agent confirmed)
+            phone_number_clean = digits_only.zfill(10)
+        else:
+            # Exactly 10 digits
+            phone_number_clean = digits_only
         
-        guardrails_text += "**Remember:** Use these instructions as a guide. When a user's question is similar to any of the questions above, adapt your response to match the style and content of the corresponding answer, while still being natural and conversational.\n\n"
-        guardrails_text += "# END OF CUSTOM INSTRUCTIONS AND GUARDRAILS\n"
+        # Ensure we have exactly 10 digits
+        if len(phone_number_clean) != 10:
+            raise ValueError(f"Phone number must be exactly 10 digits, got {len(phone_number_clean)} digits")
         
-        return guardrails_text
+        # Add "91" prefix before sending to API
+        phone_number_with_prefix = f"91{phone_number_clean}"
+        request_payload["number"] = phone_number_with_prefix
+        logger.info(f"Phone number provided: {phone_number_with_prefix} (10 digits: {phone_number_clean})")
+    
+    if email:
+        request_payload["email"] = email
+        logger.info(f"Email provided: {email}")
+    
+    return request_payload
 
 
-def get_current_datetime_info():
-    """
-    Get current date and time information in Asia/Kolkata timezone.
-    Returns formatted strings for use in system prompt.
-    """
-    try:
-        # Get current time in Asia/Kolkata timezone
-        if ZoneInfo is not None:
-            tz = ZoneInfo("Asia/Kolkata")
-            now = datetime.now(tz)
-            timezone_name = "Asia/Kolkata (IST)"
-        else:
-            # Fallback to UTC + 5:30 offset manually
-            from datetime import timezone
-            ist_offset = timedelta(hours=5, minutes=30)
-            tz = timezone(ist_offset)
-            now = datetime.now(tz)
-            timezone_name = "IST (UTC+5:30)"
-        
-        # Format date as YYYY-MM-DD
-        current_date = now.strftime("%Y-%m-%d")
-        
-        # Format time as HH:MM (24-hour format)
-        current_time = now.strftime("%H:%M")
-        
-        # Get day of week
-        day_of_week = now.strftime("%A")
-        
-        # Get readable date format
-        readable_date = now.strftime("%B %d, %Y")  # e.g., "December 31, 2025"
-        
-        # Calculate tomorrow's date (timedelta is already imported at top of file)
-        tomorrow = now + timedelta(days=1)
-        tomorrow_date = tomorrow.strftime("%Y-%m-%d")
-        tomorrow_readable = tomorrow.strftime("%B %d, %Y")
-        tomorrow_day = tomorrow.strftime("%A")
-        
-        return {
-            "current_date": current_date,
-            "current_time": current_time,
-            "day_of_week": day_of_week,
-            "readable_date": readable_date,
-            "tomorrow_date": tomorrow_date,
-            "tomorrow_readable": tomorrow_readable,
-            "tomorrow_day": tomorrow_day,
-            "timezone": timezone_name
-        }
-    except Exception as e:
-        logger.error(f"Error getting current datetime: {e}")
-        # Fallback to UTC if timezone fails
-        now = datetime.now()
-        return {
-            "current_date": now.strftime("%Y-%m-%d"),
-            "current_time": now.strftime("%H:%M"),
-            "day_of_week": now.strftime("%A"),
-            "readable_date": now.strftime("%B %d, %Y"),
-            "tomorrow_date": (now + timedelta(days=1)).strftime("%Y-%m-%d"),
-            "tomorrow_readable": (now + timedelta(days=1)).strftime("%B %d, %Y"),
-            "tomorrow_day": (now + timedelta(days=1)).strftime("%A"),
-            "timezone": "UTC (fallback)"
-        }
+def _preprocessor_error_result(error_message: str) -> dict:
+    return {
+        "summary": f"I'm having trouble processing your request right now. Please try again in a moment.",
+        "whatsapp_sent": False,
+        "email_sent": False,
+        "status": "error",
+        "error": error_message
+    }
 
 
-async def fetch_detailed_information(params: FunctionCallParams):
-    """Fetch detailed information from the preprocessor API for queries outside the system prompt"""
+async def query_preprocessor(request_payload: dict) -> dict:
+    """Call the preprocessor API and turn its response into a get_detailed_information tool result"""
     try:
-        query = params.arguments["query"]
-        phone_number = params.arguments.get("phone_number")
-        email = params.arguments.get("email")
+        logger.info(f"Calling preprocessor API with query: {request_payload.get('query')}, payload: {list(request_payload.keys())}")
         
-        # Validate that at least one contact method is provided
-        if not phone_number and not email:
-            await params.result_callback({
-                "summary": "I need either your phone number or email address to send you the information. Could you please provide one of them?",
-                "whatsapp_sent": False,
-                "email_sent": False
-            })
-            return
-        
-        # Prepare request payload - only include provided fields
-        request_payload = {"query": query}
+        client = http_clients.get("preprocessor")
         
-        if phone_number:
-            # Extract exactly 10 digits from the phone number
-            # Remove all non-digit characters first
-            digits_only = ''.join(filter(str.isdigit, phone_number))
-            
-            # If the number starts with "91" and has more than 10 digits, remove the "91" prefix
-            # to get the actual 10-digit phone number
-            if digits_only.startswith("91") and len(digits_only) > 10:
-                # Remove the "91" prefix to get the 10-digit number
-                phone_number_clean = digits_only[2:]  # Remove first 2 digits (91)
-            elif len(digits_only) > 10:
-                # If it's longer than 10 digits but doesn't start with 91, take last 10 digits
-                phone_number_clean = digits_only[-10:]
-            elif len(digits_only) < 10:
-                # If less than 10 digits, pad with zeros (shouldn't happen if agent confirmed)
-                phone_number_clean = digits_only.zfill(10)
-            else:
-                # Exactly 10 digits
-                phone_number_clean = digits_only
-            
-            # Ensure we have exactly 10 digits
-            if len(phone_number_clean) != 10:
-                raise ValueError(f"Phone number must be exactly 10 digits, got {len(phone_number_clean)} digits")
-            
-            # Add "91" prefix before sending to API
-            phone_number_with_prefix = f"91{phone_number_clean}"
-            request_payload["number"] = phone_number_with_prefix
-            logger.info(f"Phone number provided: {phone_number_with_prefix} (10 digits: {phone_number_clean})")
-        
-        if email:
-            request_payload["email"] = email
-            logger.info(f"Email provided: {email}")
-        
-        logger.info(f"Calling preprocessor API with query: {query}, payload: {list(request_payload.keys())}")
-        
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                "https://vitpreprocessor-739298578243.us-central1.run.app/query",
-                json=request_payload
-            )
+        async def send(timeout: float):
+            response = await client.post("/query", json=request_payload, timeout=timeout)
             
             # Log response details for debugging
             logger.info(f"Preprocessor API response status: {response.status_code}")
@@ -373,52 +473,52 @@ async def fetch_detailed_information(params: FunctionCallParams):
                     logger.error(f"Preprocessor API error response (non-JSON): {error_text}")
             
             response.raise_for_status()
-            data = response.json()
+            return response
+        
+        # Without contact details nothing is delivered, so the request can safely be retried/hedged
+        idempotent = "number" not in request_payload and "email" not in request_payload
+        response = await preprocessor_endpoint.call(send, idempotent=idempotent)
+        data = response.json()
+        
+        # Return the summary from the API response
+        if data.get("status") == "success":
+            summary = data.get("summary", "")
+            whatsapp_status = data.get("whatsapp_status", {})
+            email_status = data.get("email_status", {})
+            whatsapp_sent = whatsapp_status.get("status") == "success"
+            email_sent = email_status.get("status") == "success"
             
-            # Return the summary from the API response
-            if data.get("status") == "success":
-                summary = data.get("summary", "")
-                whatsapp_status = data.get("whatsapp_status", {})
-                email_status = data.get("email_status", {})
-                whatsapp_sent = whatsapp_status.get("status") == "success"
-                email_sent = email_status.get("status") == "success"
-                
-                logger.info(f"Preprocessor API returned success. Summary length: {len(summary)}")
-                logger.info(f"Delivery status - WhatsApp: {whatsapp_status.get('status')}, Email: {email_status.get('status')}")
-                
-                # Build a clear status message for the agent
-                delivery_info = []
-                if whatsapp_sent:
-                    delivery_info.append("WhatsApp")
-                if email_sent:
-                    delivery_info.append("email")
-                
-                if delivery_info:
-                    delivery_message = f"Information has been successfully sent via {', '.join(delivery_info)}."
-                else:
-                    # Check if there were skipped statuses
-                    if whatsapp_status.get("status") == "skipped" and email_status.get("status") == "skipped":
-                        delivery_message = "I processed your request, but no contact method was available to send the information. Please provide your phone number or email."
-                    else:
-                        delivery_message = "I've processed your request. The information is being prepared and sent."
-                
-                await params.result_callback({
-                    "summary": f"{summary}\n\n{delivery_message}",
-                    "whatsapp_sent": whatsapp_sent,
-                    "email_sent": email_sent,
-                    "status": "success"
-                })
+            logger.info(f"Preprocessor API returned success. Summary length: {len(summary)}")
+            await summary_cache.set(request_payload.get("query", ""), summary)
+            logger.info(f"Delivery status - WhatsApp: {whatsapp_status.get('status')}, Email: {email_status.get('status')}")
+            
+            # Build a clear status message for the agent
+            delivery_info = []
+            if whatsapp_sent:
+                delivery_info.append("WhatsApp")
+            if email_sent:
+                delivery_info.append("email")
+            
+            if delivery_info:
+                delivery_message = f"Information has been successfully sent via {', '.join(delivery_info)}."
             else:
-                # Only return error if status is explicitly not success
-                error_message = data.get("error", "Unable to process request at this moment")
-                logger.warning(f"Preprocessor API returned non-success status: {data.get('status')}, error: {error_message}")
-                await params.result_callback({
-                    "summary": f"I'm having trouble processing your request right now. Please try again in a moment.",
-                    "whatsapp_sent": False,
-                    "email_sent": False,
-                    "status": "error",
-                    "error": error_message
-                })
+                # Check if there were skipped statuses
+                if whatsapp_status.get("status") == "skipped" and email_status.get("status") == "skipped":
+                    delivery_message = "I processed your request, but no contact method was available to send the information. Please provide your phone number or email."
+                else:
+                    delivery_message = "I've processed your request. The information is being prepared and sent."
+            
+            return {
+                "summary": f"{summary}\n\n{delivery_message}",
+                "whatsapp_sent": whatsapp_sent,
+                "email_sent": email_sent,
+                "status": "success"
+            }
+        else:
+            # Only return error if status is explicitly not success
+            error_message = data.get("error", "Unable to process request at this moment")
+            logger.warning(f"Preprocessor API returned non-success status: {data.get('status')}, error: {error_message}")
+            return _preprocessor_error_result(error_message)
     except httpx.HTTPStatusError as e:
         # HTTP error from the API
         error_message = f"Server returned status {e.response.status_code}"
@@ -435,130 +535,190 @@ async def fetch_detailed_information(params: FunctionCallParams):
             except:
                 logger.error(f"HTTP error fetching detailed information: {error_message}", exc_info=True)
         
-        await params.result_callback({
-            "summary": f"I'm having trouble processing your request right now. Please try again in a moment.",
-            "whatsapp_sent": False,
-            "email_sent": False,
-            "status": "error",
-            "error": error_message
-        })
+        return _preprocessor_error_result(error_message)
     except httpx.TimeoutException as e:
         # Timeout error
-        error_message = "The request took too long to process"
         logger.error(f"Timeout error fetching detailed information: {e}", exc_info=True)
-        await params.result_callback({
-            "summary": f"I'm having trouble processing your request right now. Please try again in a moment.",
-            "whatsapp_sent": False,
-            "email_sent": False,
-            "status": "error",
-            "error": error_message
+        return _preprocessor_error_result("The request took too long to process")
+    except CircuitOpenError as e:
+        # Fail fast while the preprocessor is unhealthy
+        logger.warning(f"Skipping preprocessor call: {e}")
+        return _preprocessor_error_result(str(e))
+    except Exception as e:
+        # Other exceptions - only report if it's a real error
+        logger.error(f"Error fetching detailed information: {e}", exc_info=True)
+        return _preprocessor_error_result(str(e))
+
+
+async def send_to_postprocessor(payload: dict):
+    """Upload one conversation to the postprocessor (called by the transcript outbox drainer)"""
+    # Streamed transcripts are queued by spool file path and only rendered at upload time
+    transcript_path = payload.get("transcript_path")
+    if transcript_path:
+        if not os.path.exists(transcript_path):
+            logger.warning(f"Transcript spool file {transcript_path} no longer exists, dropping upload")
+            return
+        payload = {"conversation": format_transcript(transcript_path)}
+        logger.info(f"Sending conversation history to postprocessor (length: {len(payload['conversation'])} chars)...")
+    
+    client = http_clients.get("postprocessor")
+    
+    async def send(timeout: float):
+        response = await client.post("/process", json=payload, timeout=timeout)
+        if response.status_code != 200:
+            logger.warning(f"Postprocessor returned status {response.status_code}: {response.text}")
+        response.raise_for_status()
+        return response
+    
+    await postprocessor_endpoint.call(send)
+    logger.info("Conversation history sent to postprocessor successfully")
+    if transcript_path:
+        os.remove(transcript_path)
+
+
+# Per-call transcript spool files, written incrementally during the call
+TRANSCRIPT_SPOOL_DIR = os.getenv("TRANSCRIPT_SPOOL_DIR", os.path.join(STATE_DIR, "transcripts"))
+TRANSCRIPT_FLUSH_TURNS = int(os.getenv("TRANSCRIPT_FLUSH_TURNS", "10"))
+TRANSCRIPT_FLUSH_INTERVAL_SECS = float(os.getenv("TRANSCRIPT_FLUSH_INTERVAL_SECS", "5"))
+
+# Durable outbox for end-of-call transcript uploads (survives restarts, drained in the background)
+transcript_outbox = Outbox(
+    os.getenv("TRANSCRIPT_OUTBOX_PATH", os.path.join(STATE_DIR, "transcript_outbox.sqlite3")),
+    send_to_postprocessor,
+    batch_size=int(os.getenv("TRANSCRIPT_OUTBOX_BATCH_SIZE", "10")),
+)
+
+
+async def queue_session_transcript(session: CallSession) -> bool:
+    """Flush a call's streamed transcript and queue it for upload. Returns False if nothing was streamed."""
+    if session.transcript is None:
+        return False
+    if session.transcript_queued:
+        return True
+    session.transcript.close()
+    if not session.transcript.turns:
+        session.transcript.discard()
+        return False
+    # Marked before the insert awaits: hangup and pipeline teardown both get here
+    session.transcript_queued = True
+    try:
+        entry_id = await transcript_outbox.enqueue({"transcript_path": session.transcript.path})
+    except BaseException:
+        session.transcript_queued = False
+        raise
+    logger.info(f"Streamed transcript ({session.transcript.turns} turns) queued for postprocessor (outbox entry {entry_id})")
+    return True
+
+
+async def report_delivery_status(session: Optional[CallSession], query: str, result: dict):
+    """Push the final delivery status of a background request into the call's context"""
+    status = result.get("status")
+    channels = [name for name, sent in (("WhatsApp", result.get("whatsapp_sent")), ("email", result.get("email_sent"))) if sent]
+    note = (
+        f"[Delivery update] The requested information ({query}) was sent via {' and '.join(channels)}."
+        if status == "success" and channels
+        else f"[Delivery update] The requested information ({query}) finished processing with status: {status}."
+    )
+    logger.info(f"Background delivery finished for '{query}': {status}")
+    
+    if not session or session.ended or session.transcript_queued:
+        # Call is over: its transcript may already be queued, uploaded or deleted
+        return
+    session.delivery_updates.append({"query": query, **result})
+    if session.transcript:
+        session.transcript.add("note", note)
+    if session.pipeline_task:
+        try:
+            # Context only (no new LLM turn) - it is picked up by the transcript sent to the postprocessor
+            await session.pipeline_task.queue_frame(
+                LLMMessagesAppendFrame(messages=[{"role": "user", "content": note}], run_llm=False)
+            )
+        except Exception as e:
+            logger.warning(f"Could not add delivery status to session context: {e}")
+
+
+async def deliver_detailed_information(request_payload: dict, session: Optional[CallSession] = None):
+    """Background job: run the preprocessor request and report the outcome to the session"""
+    result = await query_preprocessor(request_payload)
+    await report_delivery_status(session, request_payload.get("query", ""), result)
+
+
+async def warm_summary_cache(queries: List[str]):
+    """Pre-generate summaries for common queries (no contact details, so nothing is delivered)"""
+    queued = 0
+    for query in queries:
+        if not await summary_cache.contains(query) and detailed_info_jobs.submit(query_preprocessor, {"query": query}):
+            queued += 1
+    logger.info(f"Queued {queued} summary cache warm-up request(s) ({len(queries) - queued} already cached or skipped)")
+
+
+async def fetch_detailed_information(params: FunctionCallParams, session: Optional[CallSession] = None):
+    """Fetch detailed information from the preprocessor API for queries outside the system prompt"""
+    try:
+        query = params.arguments["query"]
+        phone_number = params.arguments.get("phone_number")
+        email = params.arguments.get("email")
+        
+        # Validate that at least one contact method is provided
+        if not phone_number and not email:
+            await params.result_callback({
+                "summary": "I need either your phone number or email address to send you the information. Could you please provide one of them?",
+                "whatsapp_sent": False,
+                "email_sent": False
+            })
+            return
+        
+        request_payload = build_preprocessor_payload(query, phone_number, email)
+        
+        # A cached summary is spoken right away; delivery to this student still goes
+        # through the preprocessor, off the conversational path
+        cached_summary = await summary_cache.get(query)
+        if cached_summary:
+            logger.info(f"Serving cached summary for query: {query}")
+            await params.result_callback({
+                "summary": f"{cached_summary}\n\nThe information is being sent now.",
+                "whatsapp_requested": "number" in request_payload,
+                "email_requested": "email" in request_payload,
+                "status": "accepted"
+            })
+            if not detailed_info_jobs.submit(deliver_detailed_information, request_payload, session):
+                await deliver_detailed_information(request_payload, session)
+            return
+        
+        # In background mode the tool answers immediately and the request runs on the job queue
+        if DETAILED_INFO_DELIVERY_MODE == "background":
+            if detailed_info_jobs.submit(deliver_detailed_information, request_payload, session):
+                await params.result_callback({
+                    "summary": "The request has been accepted and the information is being sent now. It will arrive on the student's WhatsApp and/or email shortly.",
+                    "whatsapp_requested": "number" in request_payload,
+                    "email_requested": "email" in request_payload,
+                    "status": "accepted"
                 })
+                return
+            logger.warning("Detailed information job queue is full, delivering inline")
+        
+        await params.result_callback(await query_preprocessor(request_payload))
     except Exception as e:
         # Other exceptions - only report if it's a real error
-        error_message = str(e)
         logger.error(f"Error fetching detailed information: {e}", exc_info=True)
-        await params.result_callback({
-            "summary": f"I'm having trouble processing your request right now. Please try again in a moment.",
-            "whatsapp_sent": False,
-            "email_sent": False,
-            "status": "error",
-            "error": error_message
-        })
+        await params.result_callback(_preprocessor_error_result(str(e)))
 
 
 async def get_career_paths(params: FunctionCallParams):
     """Get career paths for a specific branch - internal tool"""
     try:
         branch = params.arguments["branch"]
-        branch_lower = branch.lower()
         
         logger.info(f"Getting career paths for branch: {branch}")
         
-        # Career paths database
-        career_paths_db = {
-            "mechanical engineering": {
-                "career_paths": [
-                    "Design Engineer - Design and develop mechanical systems and components",
-                    "Manufacturing Engineer - Optimize production processes and quality control",
-                    "Automotive Engineer - Work in automobile design, R&D, and manufacturing",
-                    "Aerospace Engineer - Design aircraft, spacecraft, and related systems",
-                    "Energy Engineer - Work in renewable energy, power plants, and energy systems",
-                    "Project Manager - Lead engineering projects and teams",
-                    "Research & Development Engineer - Innovate new products and technologies",
-                    "Quality Control Engineer - Ensure product quality and standards",
-                    "Maintenance Engineer - Maintain and optimize industrial equipment",
-                    "Consultant - Provide expert advice to organizations"
-                ]
-            },
-            "computer science and engineering": {
-                "career_paths": [
-                    "Software Developer - Build applications and software systems",
-                    "Data Scientist - Analyze data and build predictive models",
-                    "Machine Learning Engineer - Develop AI and ML solutions",
-                    "Full Stack Developer - Work on both frontend and backend systems",
-                    "DevOps Engineer - Manage infrastructure and deployment pipelines",
-                    "Cybersecurity Analyst - Protect systems from threats and vulnerabilities",
-                    "Cloud Architect - Design and manage cloud infrastructure",
-                    "Mobile App Developer - Create iOS and Android applications",
-                    "Game Developer - Develop video games and interactive experiences",
-                    "Technical Lead - Lead development teams and projects"
-                ]
-            },
-            "electronics and communication engineering": {
-                "career_paths": [
-                    "Embedded Systems Engineer - Design microcontroller-based systems",
-                    "VLSI Design Engineer - Design integrated circuits and chips",
-                    "Telecommunications Engineer - Work on network infrastructure and communication systems",
-                    "RF Engineer - Design radio frequency and wireless systems",
-                    "Signal Processing Engineer - Process and analyze signals",
-                    "IoT Engineer - Develop Internet of Things solutions",
-                    "Hardware Engineer - Design electronic hardware and circuits",
-                    "Network Engineer - Design and maintain computer networks",
-                    "Research Engineer - Innovate in electronics and communications",
-                    "Technical Consultant - Provide expertise to organizations"
-                ]
-            },
-            "electrical and electronics engineering": {
-                "career_paths": [
-                    "Power Systems Engineer - Design and maintain electrical power systems",
-                    "Control Systems Engineer - Design automation and control systems",
-                    "Renewable Energy Engineer - Work on solar, wind, and other renewable energy projects",
-                    "Electrical Design Engineer - Design electrical systems for buildings and industries",
-                    "Instrumentation Engineer - Design measurement and control instruments",
-                    "Project Engineer - Manage electrical engineering projects",
-                    "Maintenance Engineer - Maintain electrical equipment and systems",
-                    "Research Engineer - Innovate in electrical and electronics technologies",
-                    "Consultant - Provide electrical engineering expertise",
-                    "Entrepreneur - Start your own electrical engineering business"
-                ]
-            },
-            "information technology": {
-                "career_paths": [
-                    "Software Engineer - Develop software applications and systems",
-                    "Network Administrator - Manage and maintain IT networks",
-                    "Database Administrator - Manage databases and data systems",
-                    "IT Consultant - Provide technology solutions to businesses",
-                    "System Administrator - Manage IT infrastructure and servers",
-                    "Web Developer - Build websites and web applications",
-                    "IT Project Manager - Lead technology projects",
-                    "Business Analyst - Bridge business needs and technology solutions",
-                    "Cloud Solutions Architect - Design cloud-based solutions",
-                    "IT Security Specialist - Protect IT systems and data"
-                ]
-            }
-        }
-        
-        # Find matching branch (case-insensitive)
-        result = None
-        for key, value in career_paths_db.items():
-            if key in branch_lower or branch_lower in key:
-                result = value
-                break
+        # Matches names, abbreviations (CSE, ECE, mech) and Hindi/Tamil spellings
+        result = branch_knowledge.match(branch)
         
         if result:
             await params.result_callback({
                 "branch": branch,
-                "career_paths": result["career_paths"]
+                "matched_branch": result.name,
+                "career_paths": list(result.career_paths)
             })
         else:
             # Default response if branch not found
@@ -579,138 +739,21 @@ async def get_alumni_info(params: FunctionCallParams):
     """Get alumni placement information for a specific branch - internal tool"""
     try:
         branch = params.arguments["branch"]
-        branch_lower = branch.lower()
         
         logger.info(f"Getting alumni info for branch: {branch}")
         
-        # Alumni information database
-        alumni_db = {
-            "mechanical engineering": {
-                "placement_stats": {
-                    "average_package": "₹6.2 LPA",
-                    "highest_package": "₹18 LPA",
-                    "placement_rate": "92%"
-                },
-                "top_recruiters": [
-                    "Tata Motors", "Mahindra & Mahindra", "L&T", "Caterpillar", "Bosch", "Siemens", "ABB", "Maruti Suzuki"
-                ],
-                "alumni_highlights": [
-                    "Many alumni work in leading automotive companies like Tata Motors and Mahindra",
-                    "Strong presence in manufacturing and industrial sectors",
-                    "Several alumni have started their own engineering consultancies",
-                    "Alumni network actively supports current students through mentorship programs"
-                ],
-                "external_programs": [
-                    "Industry partnerships with major automotive manufacturers for internships",
-                    "Collaborative projects with L&T and Siemens",
-                    "Guest lectures from industry experts",
-                    "Annual industry-academia meet for networking opportunities"
-                ]
-            },
-            "computer science and engineering": {
-                "placement_stats": {
-                    "average_package": "₹8.5 LPA",
-                    "highest_package": "₹28 LPA",
-                    "placement_rate": "95%"
-                },
-                "top_recruiters": [
-                    "Amazon", "Microsoft", "Google", "TCS", "Infosys", "Wipro", "Cognizant", "Accenture", "HCL", "Capgemini"
-                ],
-                "alumni_highlights": [
-                    "Alumni working at top tech companies including FAANG",
-                    "Strong representation in product-based companies",
-                    "Many alumni have founded successful startups",
-                    "Active alumni network providing referrals and mentorship"
-                ],
-                "external_programs": [
-                    "Coding bootcamps with industry partners",
-                    "Hackathons sponsored by major tech companies",
-                    "Summer internship programs with Google, Microsoft, and Amazon",
-                    "Industry mentorship program connecting students with alumni"
-                ]
-            },
-            "electronics and communication engineering": {
-                "placement_stats": {
-                    "average_package": "₹7.1 LPA",
-                    "highest_package": "₹22 LPA",
-                    "placement_rate": "91%"
-                },
-                "top_recruiters": [
-                    "Qualcomm", "Intel", "Samsung", "Nokia", "Ericsson", "Huawei", "MediaTek", "Broadcom", "Texas Instruments"
-                ],
-                "alumni_highlights": [
-                    "Alumni working in semiconductor and telecommunications industries",
-                    "Strong presence in R&D departments of major tech companies",
-                    "Several alumni have contributed to 5G and IoT innovations",
-                    "Active alumni network in embedded systems and VLSI domains"
-                ],
-                "external_programs": [
-                    "Industry-sponsored research projects with Qualcomm and Intel",
-                    "Internship opportunities with leading semiconductor companies",
-                    "Technical workshops on latest communication technologies",
-                    "Alumni-led mentorship programs for ECE students"
-                ]
-            },
-            "electrical and electronics engineering": {
-                "placement_stats": {
-                    "average_package": "₹6.8 LPA",
-                    "highest_package": "₹20 LPA",
-                    "placement_rate": "90%"
-                },
-                "top_recruiters": [
-                    "ABB", "Siemens", "Schneider Electric", "BHEL", "L&T Power", "Adani Power", "Tata Power", "Reliance Energy"
-                ],
-                "alumni_highlights": [
-                    "Alumni working in power generation and distribution companies",
-                    "Strong presence in renewable energy sector",
-                    "Several alumni have excelled in automation and control systems",
-                    "Active alumni network supporting power sector projects"
-                ],
-                "external_programs": [
-                    "Industry partnerships with power companies for field training",
-                    "Collaborative projects with ABB and Siemens on smart grid technologies",
-                    "Renewable energy workshops and seminars",
-                    "Alumni networking events in power and energy sector"
-                ]
-            },
-            "information technology": {
-                "placement_stats": {
-                    "average_package": "₹7.8 LPA",
-                    "highest_package": "₹25 LPA",
-                    "placement_rate": "93%"
-                },
-                "top_recruiters": [
-                    "TCS", "Infosys", "Wipro", "Cognizant", "Accenture", "HCL", "Capgemini", "Tech Mahindra", "IBM", "Dell"
-                ],
-                "alumni_highlights": [
-                    "Alumni working across various IT services and consulting companies",
-                    "Strong representation in digital transformation projects",
-                    "Many alumni have progressed to leadership roles",
-                    "Active alumni network providing career guidance"
-                ],
-                "external_programs": [
-                    "Industry-academia partnerships for curriculum development",
-                    "Internship programs with major IT service providers",
-                    "Technical certification programs in collaboration with industry",
-                    "Alumni-led career development workshops"
-                ]
-            }
-        }
-        
-        # Find matching branch (case-insensitive)
-        result = None
-        for key, value in alumni_db.items():
-            if key in branch_lower or branch_lower in key:
-                result = value
-                break
+        # Same shared index as get_career_paths
+        result = branch_knowledge.match(branch)
         
         if result:
+            alumni = result.alumni
             await params.result_callback({
                 "branch": branch,
-                "placement_stats": result["placement_stats"],
-                "top_recruiters": result["top_recruiters"],
-                "alumni_highlights": result["alumni_highlights"],
-                "external_programs": result["external_programs"]
+                "matched_branch": result.name,
+                "placement_stats": dict(alumni.get("placement_stats", {})),
+                "top_recruiters": list(alumni.get("top_recruiters", [])),
+                "alumni_highlights": list(alumni.get("alumni_highlights", [])),
+                "external_programs": list(alumni.get("external_programs", []))
             })
         else:
             # Default response if branch not found
@@ -733,6 +776,36 @@ async def get_alumni_info(params: FunctionCallParams):
         })
 
 
+async def search_knowledge_base(params: FunctionCallParams):
+    """Search the local FAQ/college knowledge base - internal tool"""
+    try:
+        query = params.arguments["query"]
+        
+        logger.info(f"Searching knowledge base for: {query}")
+        
+        passages = knowledge_base.search(query)
+        
+        if passages:
+            await params.result_callback({
+                "query": query,
+                "results": [passage.as_dict() for passage in passages]
+            })
+        else:
+            await params.result_callback({
+                "query": query,
+                "results": [],
+                "message": "No matching information found. Offer to send the brochure or suggest contacting the admissions office."
+            })
+            
+    except Exception as e:
+        logger.error(f"Error searching knowledge base: {e}", exc_info=True)
+        await params.result_callback({
+            "query": params.arguments.get("query", ""),
+            "results": [],
+            "message": "I apologize, but I'm having trouble looking that up right now. Please try again."
+        })
+
+
 def normalize_phone_number(phone_number: str) -> str:
     """Normalize phone number to 10 digits"""
     # Remove all non-digit characters
@@ -755,20 +828,35 @@ def normalize_phone_number(phone_number: str) -> str:
 
 
 def get_mongodb_client():
-    """Get MongoDB client connection"""
-    if not MONGODB_URI:
-        return None
-    try:
-        client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
-        # Test the connection
-        client.admin.command('ping')
-        return client
-    except (ConnectionFailure, ServerSelectionTimeoutError) as e:
-        logger.error(f"Failed to connect to MongoDB: {e}")
-        return None
-    except Exception as e:
-        logger.error(f"Error connecting to MongoDB: {e}")
+    """Get the shared MongoDB client"""
+    if not mongo:
         return None
+    return mongo.client
+
+
+# Case-insensitive string matching (used for email); indexes on `users` share it so they can serve the query
+USER_LOOKUP_COLLATION = {"locale": "en", "strength": 2}
+
+# Only the fields get_user_data actually returns
+USER_PROJECTION = {"name": 1, "email": 1, "phone_number": 1, "phone": 1}
+ANALYTICS_PROJECTION = {
+    "user_id": 1, "id": 1, "userId": 1,
+    "course_interest": 1, "course interest": 1,
+    "city": 1,
+    "budget": 1,
+    "hostel_needed": 1, "hostel needed": 1,
+    "intent_level": 1, "intent level": 1,
+}
+
+
+def _first_match(documents: list, clauses: List[Dict]) -> Optional[Dict]:
+    """Return the document matching the earliest clause, preserving the old fallback order"""
+    for clause in clauses:
+        (field, value), = clause.items()
+        for document in documents:
+            if document.get(field) == value:
+                return document
+    return None
 
 
 def get_user_data(phone_number: str = None, email: str = None):
@@ -791,81 +879,60 @@ def get_user_data(phone_number: str = None, email: str = None):
         users_collection = db["users"]
         analytics_collection = db["userAnalytics"]
         
+        # Match every phone format with one $or query, in the order they used to be tried
+        # DB stores phone as "91" + 10 digits (e.g., "918438232949") in field "phone_number";
+        # the 10-digit format and the "phone" field are kept for backward compatibility
         user = None
-        
-        # Try to find user by phone number first (if provided)
         if phone_number:
             # Normalize phone number to 10 digits
             phone_clean = normalize_phone_number(phone_number)
-            
             if len(phone_clean) == 10:
-                # Convert to DB format: "91" + 10 digits (e.g., "918438232949")
                 phone_db_format = f"91{phone_clean}"
-                
-                # Find user by phone number - check both formats (DB format and 10-digit format)
-                # DB stores as "91" + 10 digits (e.g., "918438232949") in field "phone_number"
-                user = users_collection.find_one({"phone_number": phone_db_format})
-                
-                # If not found, also try 10-digit format (for backward compatibility)
-                if not user:
-                    user = users_collection.find_one({"phone_number": phone_clean})
-                
-                # Also try with "phone" field (for backward compatibility)
-                if not user:
-                    user = users_collection.find_one({"phone": phone_db_format})
-                if not user:
-                    user = users_collection.find_one({"phone": phone_clean})
+                phone_clauses = [
+                    {"phone_number": phone_db_format},
+                    {"phone_number": phone_clean},
+                    {"phone": phone_db_format},
+                    {"phone": phone_clean},
+                ]
+                # Exact match, so the plain phone indexes apply; _first_match picks by clause order
+                candidates = list(users_collection.find({"$or": phone_clauses}, USER_PROJECTION))
+                user = _first_match(candidates, phone_clauses)
         
-        # If not found by phone, try email (if provided)
-        if not user and email:
-            # Normalize email (lowercase, trim)
-            email_clean = email.strip().lower()
-            user = users_collection.find_one({"email": email_clean})
-            
-            # Also try case-insensitive search
-            if not user:
-                user = users_collection.find_one({"email": {"$regex": f"^{email_clean}$", "$options": "i"}})
+        email_clean = email.strip().lower() if email else ""
+        if not user and email_clean:
+            # Only the email is matched case-insensitively, through the collation instead of a $regex scan
+            user = users_collection.find_one({"email": email_clean}, USER_PROJECTION, collation=USER_LOOKUP_COLLATION)
         
         if not user:
             lookup_info = f"phone: {phone_number}" if phone_number else f"email: {email}"
             logger.info(f"User not found in database for {lookup_info}")
-            client.close()
             return None
         
         # Get user ID
         user_id = user.get("_id")
         
-        # Find analytics for this user - check "user_id" field (ObjectId) first, then other formats
+        # Find analytics for this user with one $or query over every known shape -
+        # "user_id" field (ObjectId) first, then the other formats
         analytics = None
         if user_id:
-            try:
-                from bson import ObjectId
-                # Primary: user_id field with ObjectId (as per DB structure)
-                analytics = analytics_collection.find_one({"user_id": ObjectId(user_id)})
-                
-                # Fallback: user_id as string
-                if not analytics:
-                    analytics = analytics_collection.find_one({"user_id": str(user_id)})
-                
-                # Fallback: id field with ObjectId
-                if not analytics:
-                    analytics = analytics_collection.find_one({"id": ObjectId(user_id)})
-                
-                # Fallback: id field as string
-                if not analytics:
-                    analytics = analytics_collection.find_one({"id": str(user_id)})
-                
-                # Fallback: _id field directly
-                if not analytics:
-                    analytics = analytics_collection.find_one({"_id": user_id})
-                
-                # Fallback: userId field
-                if not analytics:
-                    analytics = analytics_collection.find_one({"userId": str(user_id)})
-            except Exception as e:
-                logger.warning(f"Error querying analytics with ObjectId: {e}")
-                # Try string format
-                analytics = analytics_collection.find_one({"user_id": str(user_id)})
+            from bson import ObjectId
+            
+            user_id_str = str(user_id)
+            object_id = ObjectId(user_id_str) if ObjectId.is_valid(user_id_str) else None
+            analytics_clauses = []
+            if object_id is not None:
+                analytics_clauses.append({"user_id": object_id})
+            analytics_clauses.append({"user_id": user_id_str})
+            if object_id is not None:
+                analytics_clauses.append({"id": object_id})
+            analytics_clauses += [
+                {"id": user_id_str},
+                {"_id": user_id},
+                {"userId": user_id_str},
+            ]
+            
+            candidates = list(analytics_collection.find({"$or": analytics_clauses}, ANALYTICS_PROJECTION))
+            analytics = _first_match(candidates, analytics_clauses)
         
         # Prepare user data
         # Get phone from either "phone_number" or "phone" field
@@ -887,7 +954,6 @@ def get_user_data(phone_number: str = None, email: str = None):
             } if analytics else {}
         }
         
-        client.close()
         lookup_method = f"phone: {user_phone}" if user_phone else f"email: {user_data['user_profile']['email']}"
         logger.info(f"Found existing user: {user_data['user_profile']['name']} ({lookup_method})")
         return user_data
@@ -897,7 +963,89 @@ def get_user_data(phone_number: str = None, email: str = None):
         return None
 
 
-async def check_user_exists(params: FunctionCallParams):
+# Indexes the user lookup queries rely on: (collection, field, options)
+USER_LOOKUP_INDEXES = [
+    ("users", "phone_number", {}),
+    ("users", "phone", {}),
+    ("users", "email", {"collation": USER_LOOKUP_COLLATION}),
+    ("userAnalytics", "user_id", {}),
+    ("userAnalytics", "id", {}),
+    ("userAnalytics", "userId", {}),
+]
+
+
+def ensure_user_indexes():
+    """Verify that the indexes used by get_user_data exist, creating any that are missing"""
+    client = get_mongodb_client()
+    if not client:
+        return
+    db = client["VIT"]
+    for collection_name, field, options in USER_LOOKUP_INDEXES:
+        collection = db[collection_name]
+        existing = collection.index_information()
+        name = f"lookup_{field}"
+        already_indexed = any(
+            info.get("key") == [(field, 1)] and info.get("collation", {}).get("strength") == options.get("collation", {}).get("strength")
+            for info in existing.values()
+        )
+        if already_indexed:
+            logger.debug(f"Index on {collection_name}.{field} already present")
+            continue
+        collection.create_index(field, name=name, **options)
+        logger.info(f"Created index {name} on {collection_name}.{field}")
+
+
+def _user_cache_keys(phone_number: str = None, email: str = None) -> tuple:
+    """Cache keys for a lookup: (phone key or None, email key or None)"""
+    phone_key = f"phone:{normalize_phone_number(phone_number)}" if phone_number else None
+    email_key = f"email:{email.strip().lower()}" if email and email.strip() else None
+    return phone_key, email_key
+
+
+async def lookup_user(phone_number: str = None, email: str = None):
+    """
+    Look up a user through the profile cache, running get_user_data on the Mongo
+    thread pool on a miss so the event loop never blocks.
+    """
+    if not mongo:
+        logger.warning("MongoDB URI not configured, skipping user lookup")
+        return None
+    
+    phone_key, email_key = _user_cache_keys(phone_number, email)
+    
+    # get_user_data prefers a phone match over an email match, so only trust a cached
+    # email result once the phone is known (from the cache) not to match anyone
+    phone_hit, phone_value = user_cache.get(phone_key) if phone_key else (True, None)
+    if phone_hit and phone_value is not None:
+        return phone_value
+    if phone_hit:
+        email_hit, email_value = user_cache.get(email_key) if email_key else (True, None)
+        if email_hit:
+            return email_value
+    
+    user_data = await mongo.run(get_user_data, phone_number=phone_number, email=email)
+    
+    if user_data:
+        # Cache under the user's own contact details, not the query, so an email match
+        # is never served for an unrelated phone number
+        profile = user_data.get("user_profile", {})
+        own_phone_key, own_email_key = _user_cache_keys(profile.get("phone"), profile.get("email"))
+        for key in (own_phone_key, own_email_key):
+            if key:
+                user_cache.set(key, user_data)
+    else:
+        for key in (phone_key, email_key):
+            if key:
+                user_cache.set(key, None)
+    return user_data
+
+
+def invalidate_user_cache(phone_number: str = None, email: str = None) -> int:
+    """Drop cached lookups for a phone number and/or email. Returns the number of entries removed."""
+    return sum(1 for key in _user_cache_keys(phone_number, email) if key and user_cache.invalidate(key))
+
+
+async def check_user_exists(params: FunctionCallParams, session: Optional[CallSession] = None):
     """Check if user exists in database and retrieve their profile and analytics by phone number or email"""
     try:
         phone_number = params.arguments.get("phone_number")
@@ -913,9 +1061,17 @@ async def check_user_exists(params: FunctionCallParams):
         
         lookup_info = f"phone: {phone_number}" if phone_number else f"email: {email}"
         logger.info(f"Checking user existence for {lookup_info}")
+        if session:
+            session.contact_lookups.append((phone_number, email))
         
-        # Get user data from MongoDB
-        user_data = get_user_data(phone_number=phone_number, email=email)
+        # Answer from the caller-ID prefetch when the number matches, otherwise query MongoDB
+        prefetched, user_data = (False, None)
+        if session and phone_number:
+            prefetched, user_data = await session.get_prefetched_user(phone_number, normalize_phone_number)
+        if prefetched:
+            logger.info(f"Answered user check from caller-ID prefetch for {lookup_info}")
+        if not prefetched or (not user_data and email):
+            user_data = await lookup_user(phone_number=phone_number, email=email)
         
         if user_data and user_data.get("exists"):
             # User exists - return their data
@@ -941,77 +1097,120 @@ async def check_user_exists(params: FunctionCallParams):
         })
 
 
-async def create_daily_room() -> tuple[str, str]:
+async def create_daily_room(exp: Optional[int] = None) -> tuple[str, str]:
     """Create a Daily room and return the URL and token"""
-    async with aiohttp.ClientSession() as session:
-        # Create room
-        async with session.post(
-            "https://api.daily.co/v1/rooms",
-            headers={
-                "Authorization": f"Bearer {DAILY_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "properties": {
-                    "exp": int(time.time()) + 3600,  # 1 hour from now
-                    "enable_chat": False,
-                    "enable_emoji_reactions": False,
-                }
-            },
-        ) as response:
-            if response.status != 200:
-                error_text = await response.text()
-                logger.error(f"Failed to create room: {response.status} - {error_text}")
-                raise Exception(f"Failed to create Daily room: {response.status}")
-            
-            room_data = await response.json()
-            logger.debug(f"Room data: {room_data}")
-            
-            room_url = room_data.get("url")
-            room_name = room_data.get("name")
-            
-            if not room_url or not room_name:
-                logger.error(f"Missing url or name in room response: {room_data}")
-                raise Exception("Invalid room data from Daily API")
-
-        # Create token
-        async with session.post(
-            "https://api.daily.co/v1/meeting-tokens",
-            headers={
-                "Authorization": f"Bearer {DAILY_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "properties": {
-                    "room_name": room_name,
-                    "is_owner": True,
-                }
-            },
-        ) as response:
-            if response.status != 200:
-                error_text = await response.text()
-                logger.error(f"Failed to create token: {response.status} - {error_text}")
-                raise Exception(f"Failed to create Daily token: {response.status}")
-            
-            token_data = await response.json()
-            logger.debug(f"Token data: {token_data}")
-            token = token_data.get("token")
-            
-            if not token:
-                logger.error(f"Missing token in response: {token_data}")
-                raise Exception("Invalid token data from Daily API")
+    if exp is None:
+        exp = int(time.time()) + DAILY_ROOM_EXPIRY_SECS
+    client = http_clients.get("daily")
+
+    # Create room
+    response = await client.post(
+        "/rooms",
+        json={
+            "properties": {
+                "exp": exp,  # 1 hour from now by default
+                "enable_chat": False,
+                "enable_emoji_reactions": False,
+            }
+        },
+    )
+    if response.status_code != 200:
+        logger.error(f"Failed to create room: {response.status_code} - {response.text}")
+        raise Exception(f"Failed to create Daily room: {response.status_code}")
+    
+    room_data = response.json()
+    logger.debug(f"Room data: {room_data}")
+    
+    room_url = room_data.get("url")
+    room_name = room_data.get("name")
+    
+    if not room_url or not room_name:
+        logger.error(f"Missing url or name in room response: {room_data}")
+        raise Exception("Invalid room data from Daily API")
+
+    # Create token
+    response = await client.post(
+        "/meeting-tokens",
+        json={
+            "properties": {
+                "room_name": room_name,
+                "is_owner": True,
+            }
+        },
+    )
+    if response.status_code != 200:
+        logger.error(f"Failed to create token: {response.status_code} - {response.text}")
+        raise Exception(f"Failed to create Daily token: {response.status_code}")
+    
+    token_data = response.json()
+    logger.debug(f"Token data: {token_data}")
+    token = token_data.get("token")
+    
+    if not token:
+        logger.error(f"Missing token in response: {token_data}")
+        raise Exception("Invalid token data from Daily API")
 
     logger.info(f"Successfully created room: {room_url}")
     return room_url, token
 
 
-async def run_bot(room_url: str, token: str):
-    """Run the voice bot in the Daily room"""
+async def acquire_warm_bot_room() -> PooledRoom:
+    """A room for a new warm bot: from the room pool, or created on a miss"""
+    room = daily_room_pool.acquire() if daily_room_pool else None
+    if room is None:
+        expires_at = int(time.time()) + DAILY_ROOM_EXPIRY_SECS
+        room_url, token = await create_daily_room(expires_at)
+        room = PooledRoom(room_url, token, expires_at, time.time())
+    return room
+
+
+class VertexLiveLLMService(GeminiLiveVertexLLMService):
+    """Gemini Live (Vertex AI) service that can add context mid-call without starting a model turn"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Set once the Live session is open (system instruction and tools sent)
+        self.connected = asyncio.Event()
+
+    async def _handle_session_ready(self, session):
+        await super()._handle_session_ready(session)
+        self.connected.set()
+
+    async def add_context(self, text: str):
+        # LLMMessagesAppendFrame would send turn_complete=True and make the model answer the note itself
+        if self._disconnecting or not self._session:
+            return
+        try:
+            await self._session.send_client_content(
+                turns=[Content(role="user", parts=[Part(text=text)])], turn_complete=False
+            )
+        except Exception as e:
+            await self._handle_send_error(e)
+
+
+async def run_bot(
+    room_url: str,
+    token: str,
+    caller_id: Optional[str] = None,
+    record: Optional[SessionRecord] = None,
+    warm_bot: Optional[WarmBot] = None,
+):
+    """Run the voice bot in the Daily room (as a warm bot waiting for a call if `warm_bot` is given)"""
     transport = None
+    running = None
+    session = CallSession(room_url)
     try:
         logger.info(f"Starting bot for room: {room_url}")
         
+        # Look up the caller's profile concurrently with pipeline startup
+        if caller_id and mongo:
+            session.start_user_prefetch(caller_id, lookup_user, normalize_phone_number)
+        
         # Initialize transport with Silero VAD
+        vad_params = VADParams(
+            stop_secs=0.3,
+            min_volume=0.3,
+        )
         transport = DailyTransport(
             room_url,
             token,
@@ -1020,11 +1219,10 @@ async def run_bot(room_url: str, token: str):
                 audio_in_enabled=True,
                 audio_out_enabled=True,
                 video_out_enabled=False,
-                vad_analyzer=SileroVADAnalyzer(
-                    params=VADParams(
-                        stop_secs=0.3,
-                        min_volume=0.3,
-                    )
+                vad_analyzer=(
+                    BatchedSileroVADAnalyzer(vad_batcher, params=vad_params)
+                    if VAD_BATCHING
+                    else SharedSileroVADAnalyzer(silero_vad, params=vad_params)
                 ),
                 transcription_enabled=True,
             ),
@@ -1044,36 +1242,17 @@ async def run_bot(room_url: str, token: str):
         temperature = float(os.getenv("LLM_TEMPERATURE", "0.3"))
         logger.info(f"Using LLM temperature: {temperature}")
 
-        # Get current date and time information
-        datetime_info = get_current_datetime_info()
+        # Static prompt + current date/time + guardrails, from cached pieces
+        guardrail_retrieval = use_guardrail_retrieval(len(guardrails_store.snapshot))
+        system_instruction = prompt_assembler.build(include_guardrails=not guardrail_retrieval)
+        prompt_size_history.record(system_instruction, "retrieval" if guardrail_retrieval else "prompt")
+        datetime_info = prompt_assembler.datetime_info
         logger.info(f"Current date/time context: {datetime_info['current_date']} {datetime_info['current_time']} ({datetime_info['timezone']})")
-        
-        # Inject current date/time into system prompt
-        datetime_context = f"""
-
-## CURRENT DATE AND TIME INFORMATION
-
-**IMPORTANT: Use this information when answering questions about dates/times.**
-
-- **Current Date**: {datetime_info['readable_date']} ({datetime_info['day_of_week']})
-- **Current Date (YYYY-MM-DD format)**: {datetime_info['current_date']}
-- **Current Time**: {datetime_info['current_time']} ({datetime_info['timezone']})
-- **Tomorrow's Date**: {datetime_info['tomorrow_readable']} ({datetime_info['tomorrow_day']})
-- **Tomorrow's Date (YYYY-MM-DD format)**: {datetime_info['tomorrow_date']}
-- Current timezone is {datetime_info['timezone']}
-
-"""
-        
-        # Get guardrails and format them for the prompt
-        guardrails_context = format_guardrails_for_prompt()
-        
-        # Combine system prompt with datetime context and guardrails
-        system_instruction = SYSTEM_PROMPT + datetime_context + guardrails_context
 
         # Define the detailed information tool
         detailed_info_function = FunctionSchema(
             name="get_detailed_information",
-            description="Send course-specific brochures and detailed information to the student via WhatsApp and/or email. IMPORTANT: This tool processes requests in the background. The tool will return a status indicating success or error. Only report errors to the student if the tool explicitly returns an error status. The tool automatically sends WhatsApp message (if phone number provided) and/or email (if email provided) to the student. At least one of phone_number or email must be provided. The tool response will indicate what was successfully sent (WhatsApp, email, or both).",
+            description="Send course-specific brochures and detailed information to the student via WhatsApp and/or email. IMPORTANT: This tool processes requests in the background. The tool will return a status indicating success or error. Only report errors to the student if the tool explicitly returns an error status. The tool automatically sends WhatsApp message (if phone number provided) and/or email (if email provided) to the student. At least one of phone_number or email must be provided. The tool response will indicate what was successfully sent (WhatsApp, email, or both). A status of 'accepted' means the information is being sent in the background - confirm to the student that it is on its way.",
             properties={
                 "query": {
                     "type": "string",
@@ -1098,7 +1277,7 @@ async def run_bot(room_url: str, token: str):
             properties={
                 "branch": {
                     "type": "string",
-                    "description": "The exact branch name (e.g., 'Computer Science and Engineering', 'Mechanical Engineering', 'Electronics and Communication Engineering', 'Electrical and Electronics Engineering', 'Information Technology')",
+                    "description": "The branch name (e.g., 'Computer Science and Engineering', 'Mechanical Engineering', 'Electronics and Communication Engineering', 'Electrical and Electronics Engineering', 'Information Technology'). Abbreviations like CSE, ECE, EEE, IT or mech are understood.",
                 },
             },
             required=["branch"],
@@ -1111,12 +1290,25 @@ async def run_bot(room_url: str, token: str):
             properties={
                 "branch": {
                     "type": "string",
-                    "description": "The exact branch name (e.g., 'Computer Science and Engineering', 'Mechanical Engineering', 'Electronics and Communication Engineering', 'Electrical and Electronics Engineering', 'Information Technology')",
+                    "description": "The branch name (e.g., 'Computer Science and Engineering', 'Mechanical Engineering', 'Electronics and Communication Engineering', 'Electrical and Electronics Engineering', 'Information Technology'). Abbreviations like CSE, ECE, EEE, IT or mech are understood.",
                 },
             },
             required=["branch"],
         )
 
+        # Define the knowledge base tool
+        knowledge_base_function = FunctionSchema(
+            name="search_knowledge_base",
+            description="Search the VIT college knowledge base for answers to common questions: fee structure, hostel facilities and fees, transport, placements, scholarships, campus safety, accreditation, extracurricular activities and campus facilities. Use this tool whenever the student asks about any of these topics instead of answering from memory. This is an internal tool that returns the most relevant passages instantly.",
+            properties={
+                "query": {
+                    "type": "string",
+                    "description": "Short English keywords for what the student asked (e.g., 'hostel fees', 'scholarships', 'placement packages', 'campus safety')",
+                },
+            },
+            required=["query"],
+        )
+
         # Define the user check tool
         check_user_function = FunctionSchema(
             name="check_user_exists",
@@ -1134,10 +1326,10 @@ async def run_bot(room_url: str, token: str):
             required=[],
         )
 
-        tools = ToolsSchema(standard_tools=[detailed_info_function, career_paths_function, alumni_info_function, check_user_function])
+        tools = ToolsSchema(standard_tools=[detailed_info_function, career_paths_function, alumni_info_function, knowledge_base_function, check_user_function])
 
         # Initialize Vertex AI LLM Service with tools
-        llm = GeminiLiveVertexLLMService(
+        llm = VertexLiveLLMService(
             credentials=fix_credentials(),
             project_id=project_id,
             location=location,
@@ -1149,10 +1341,19 @@ async def run_bot(room_url: str, token: str):
         )
 
         # Register the functions
-        llm.register_function("get_detailed_information", fetch_detailed_information)
+
+        async def fetch_detailed_information_for_session(params: FunctionCallParams):
+            await fetch_detailed_information(params, session)
+
+        llm.register_function("get_detailed_information", fetch_detailed_information_for_session)
         llm.register_function("get_career_paths", get_career_paths)
         llm.register_function("get_alumni_info", get_alumni_info)
-        llm.register_function("check_user_exists", check_user_exists)
+        llm.register_function("search_knowledge_base", search_knowledge_base)
+
+        async def check_user_exists_for_session(params: FunctionCallParams):
+            await check_user_exists(params, session)
+
+        llm.register_function("check_user_exists", check_user_exists_for_session)
 
         # Create context with initial greeting and user information collection
         context = LLMContext(
@@ -1167,16 +1368,35 @@ async def run_bot(room_url: str, token: str):
         # Use context aggregator for proper conversation flow
         context_aggregator = LLMContextAggregatorPair(context)
 
-        # Build pipeline with context aggregator
-        pipeline = Pipeline(
-            [
-                transport.input(),
-                context_aggregator.user(),
-                llm,
-                transport.output(),
-                context_aggregator.assistant(),
-            ]
+        # Stream finalized user/assistant turns to a per-call spool file as they happen
+        transcript = TranscriptProcessor()
+        session.transcript = TranscriptStream(
+            os.path.join(TRANSCRIPT_SPOOL_DIR, f"{session.session_id}.jsonl"),
+            flush_turns=TRANSCRIPT_FLUSH_TURNS,
+            flush_interval=TRANSCRIPT_FLUSH_INTERVAL_SECS,
         )
+
+        @transcript.event_handler("on_transcript_update")
+        async def on_transcript_update(processor, frame):
+            for message in frame.messages:
+                session.transcript.add(message.role, message.content, message.timestamp)
+
+        # Build pipeline with context aggregator
+        processors = [
+            transport.input(),
+            context_aggregator.user(),
+            transcript.user(),  # Gemini Live pushes user transcriptions upstream from the LLM
+        ]
+        if guardrail_retrieval:
+            # Guardrails matching each user sentence are added to the live session's context
+            processors.append(GuardrailRetrievalProcessor(guardrail_retriever, llm.add_context))
+        processors += [
+            llm,
+            transport.output(),
+            transcript.assistant(),
+            context_aggregator.assistant(),
+        ]
+        pipeline = Pipeline(processors)
         
         # Store user_id for conversation history
         user_id_for_history = None
@@ -1192,10 +1412,20 @@ async def run_bot(room_url: str, token: str):
             ),
         )
 
+        # Lets background jobs (e.g. brochure delivery) report back into this call
+        session.pipeline_task = task
+
         # Set up event handlers
         @transport.event_handler("on_first_participant_joined")
         async def on_first_participant_joined(transport, participant):
             logger.info(f"First participant joined: {participant}")
+            if record:
+                record.state = "active"
+            # Dial-in participants carry the caller's number as their user name
+            if mongo:
+                session.start_user_prefetch(
+                    (participant.get("info") or {}).get("userName", ""), lookup_user, normalize_phone_number
+                )
             # Start capturing transcription for the participant
             await transport.capture_participant_transcription(participant["id"])
             
@@ -1211,60 +1441,63 @@ async def run_bot(room_url: str, token: str):
         @transport.event_handler("on_participant_left")
         async def on_participant_left(transport, participant, reason):
             logger.info(f"Participant left: {participant}, reason: {reason}")
+            if record:
+                record.state = "ending"
             
-            # Get conversation history from context
+            # Flush the streamed transcript's final delta and queue it for the postprocessor
             try:
-                conversation_history = []
+                if not await queue_session_transcript(session):
+                    # Nothing was streamed - rebuild the conversation history from the context
+                    conversation_history = []
                 
-                # Access context messages from the aggregator
-                # Try multiple ways to access the messages
-                context_messages = []
-                if hasattr(context_aggregator, 'context') and hasattr(context_aggregator.context, 'messages'):
-                    context_messages = context_aggregator.context.messages
-                elif hasattr(context_aggregator, '_context') and hasattr(context_aggregator._context, 'messages'):
-                    context_messages = context_aggregator._context.messages
-                elif hasattr(context, 'messages'):
-                    context_messages = context.messages
-                else:
-                    # Try to get from aggregator's user/assistant processors
-                    try:
-                        if hasattr(context_aggregator, 'user') and hasattr(context_aggregator.user, '_context'):
-                            context_messages = context_aggregator.user._context.messages if hasattr(context_aggregator.user._context, 'messages') else []
-                    except:
-                        pass
+                    # Access context messages from the aggregator
+                    # Try multiple ways to access the messages
+                    context_messages = []
+                    if hasattr(context_aggregator, 'context') and hasattr(context_aggregator.context, 'messages'):
+                        context_messages = context_aggregator.context.messages
+                    elif hasattr(context_aggregator, '_context') and hasattr(context_aggregator._context, 'messages'):
+                        context_messages = context_aggregator._context.messages
+                    elif hasattr(context, 'messages'):
+                        context_messages = context.messages
+                    else:
+                        # Try to get from aggregator's user/assistant processors
+                        try:
+                            if hasattr(context_aggregator, 'user') and hasattr(context_aggregator.user, '_context'):
+                                context_messages = context_aggregator.user._context.messages if hasattr(context_aggregator.user._context, 'messages') else []
+                        except:
+                            pass
                 
-                # Build conversation history string
-                for msg in context_messages:
-                    role = msg.get("role", "unknown")
-                    content = msg.get("content", "")
-                    # Skip system messages and empty content
-                    if content and role in ["user", "assistant"]:
-                        speaker = "User" if role == "user" else "Natalie (Agent)"
-                        conversation_history.append(f"{speaker}: {content}")
+                    # Build conversation history string
+                    for msg in context_messages:
+                        role = msg.get("role", "unknown")
+                        content = msg.get("content", "")
+                        # Skip system messages and empty content
+                        if content and role in ["user", "assistant"]:
+                            speaker = "User" if role == "user" else "Natalie (Agent)"
+                            conversation_history.append(f"{speaker}: {content}")
                 
-                conversation_text = "\n".join(conversation_history)
+                    conversation_text = "\n".join(conversation_history)
                 
-                if conversation_text.strip():
-                    logger.info(f"Sending conversation history to postprocessor (length: {len(conversation_text)} chars, {len(conversation_history)} messages)...")
-                    # Send to postprocessor
-                    try:
-                        async with httpx.AsyncClient(timeout=30.0) as client:
-                            response = await client.post(
-                                "https://vitpostprocessor-739298578243.us-central1.run.app/process",
-                                json={"conversation": conversation_text}
-                            )
-                            if response.status_code == 200:
-                                logger.info("Conversation history sent to postprocessor successfully")
-                            else:
-                                logger.warning(f"Postprocessor returned status {response.status_code}: {response.text}")
-                    except Exception as e:
-                        logger.error(f"Error sending conversation history to postprocessor: {e}", exc_info=True)
-                else:
-                    logger.warning("No conversation history to send - context messages not accessible")
+                    if conversation_text.strip():
+                        logger.info(f"Sending conversation history to postprocessor (length: {len(conversation_text)} chars, {len(conversation_history)} messages)...")
+                        # Hand off to the durable outbox; the drainer uploads it with retries
+                        try:
+                            entry_id = await transcript_outbox.enqueue({"conversation": conversation_text})
+                            logger.info(f"Conversation history queued for postprocessor (outbox entry {entry_id})")
+                        except Exception as e:
+                            logger.error(f"Error queueing conversation history for postprocessor: {e}", exc_info=True)
+                    else:
+                        logger.warning("No conversation history to send - context messages not accessible")
                     
             except Exception as e:
                 logger.error(f"Error processing conversation history: {e}", exc_info=True)
             
+            # The postprocessor updates this student's profile from the call, so drop cached lookups
+            for phone_number, email in session.contact_lookups:
+                invalidate_user_cache(phone_number, email)
+            if session.caller_id:
+                invalidate_user_cache(phone_number=session.caller_id)
+            
             await task.queue_frame(EndFrame())
 
         @transport.event_handler("on_participant_joined")
@@ -1273,9 +1506,35 @@ async def run_bot(room_url: str, token: str):
             # Capture transcription for any new participant
             await transport.capture_participant_transcription(participant["id"])
 
+        session.transcript.start()
+        if record:
+            record.state = "waiting"
+
         logger.info("Starting pipeline runner")
         runner = PipelineRunner()
-        await runner.run(task)
+        if warm_bot:
+            # Join the room and open the Live session now; /start binds the call later
+            pipeline_started = asyncio.Event()
+
+            @task.event_handler("on_pipeline_started")
+            async def on_pipeline_started(task, frame):
+                pipeline_started.set()
+
+            running = asyncio.create_task(runner.run(task))
+            binding = await warm_bot.wait_for_call(running, pipeline_started, llm.connected)
+            if binding is None:
+                logger.info(f"Warm bot leaving unused room: {room_url}")
+                await task.cancel()
+                await running
+                return
+            caller_id, record = binding
+            record.state = "waiting"
+            if caller_id and mongo:
+                session.start_user_prefetch(caller_id, lookup_user, normalize_phone_number)
+            logger.info(f"Warm bot in {room_url} bound to session {record.session_id}")
+            await running
+        else:
+            await runner.run(task)
         
         logger.info("Pipeline runner completed")
 
@@ -1283,6 +1542,17 @@ async def run_bot(room_url: str, token: str):
         logger.error(f"Error running bot: {e}", exc_info=True)
         raise
     finally:
+        if running and not running.done():
+            # Cancelled while waiting for a call
+            running.cancel()
+            await asyncio.wait({running}, timeout=5)
+        session.ended = True
+        session.cancel()
+        # Calls that end without on_participant_left still get their transcript uploaded
+        try:
+            await queue_session_transcript(session)
+        except Exception as e:
+            logger.error(f"Error queueing transcript: {e}")
         if transport:
             try:
                 logger.info("Cleaning up transport")
@@ -1294,15 +1564,68 @@ async def run_bot(room_url: str, token: str):
 @app.post("/start")
 async def start_session(request: Request):
     """Create a Daily room, start the bot, and return connection details"""
+    # Claim a session slot before creating a room this process may not be able to serve
     try:
+        record = await session_registry.admit()
+    except SessionCapacityError as e:
+        logger.warning(f"Rejecting new session: {len(session_registry)} running (max {session_registry.max_sessions})")
+        return JSONResponse(
+            status_code=503,
+            content={"error": "All agents are busy, please try again shortly", "retry_after": e.retry_after},
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    # Reserve the worker before any await, so concurrent requests cannot oversubscribe it
+    worker = session_worker_pool.reserve(record) if session_worker_pool else None
+    if session_worker_pool and worker is None:
+        session_registry.discard(record)
+        logger.warning("Rejecting new session: no session worker ready")
+        return JSONResponse(
+            status_code=503,
+            content={"error": "All agents are busy, please try again shortly", "retry_after": session_registry.retry_after},
+            headers={"Retry-After": str(session_registry.retry_after)},
+        )
+
+    try:
+        # Caller ID from the telephony webhook, if provided, lets the bot prefetch the user profile
+        caller_id = None
+        try:
+            body = await request.json()
+            if isinstance(body, dict):
+                caller_id = body.get("caller_id") or body.get("From") or body.get("from")
+        except Exception:
+            pass
+
+        # Hand the call to a bot already waiting in its room, if one is ready
+        warm_bot = warm_bot_pool.acquire() if warm_bot_pool else None
+        if warm_bot:
+            warm_bot.bind(caller_id, record)
+            session_registry.launch(record, warm_bot.room.room_url, warm_bot.task)
+            logger.info(f"Using warm bot in room: {warm_bot.room.room_url}")
+            return JSONResponse(
+                content={
+                    "room_url": warm_bot.room.room_url,
+                    "token": warm_bot.room.token,
+                }
+            )
+
         logger.info("Creating Daily room and starting bot...")
         
-        # Create room and token
-        room_url, token = await create_daily_room()
-        logger.info(f"Created room: {room_url}")
+        # Take a pre-created room from the pool, creating one on demand on a miss
+        pooled_room = daily_room_pool.acquire() if daily_room_pool else None
+        if pooled_room:
+            room_url, token = pooled_room.room_url, pooled_room.token
+            logger.info(f"Using pooled room: {room_url}")
+        else:
+            room_url, token = await create_daily_room()
+            logger.info(f"Created room: {room_url}")
 
-        # Start bot in background
-        asyncio.create_task(run_bot(room_url, token))
+        # Start bot in background; the registry keeps the task and frees the slot when it ends
+        if session_worker_pool:
+            bot = session_worker_pool.run_session(worker, record, room_url, token, caller_id=caller_id)
+        else:
+            bot = run_bot(room_url, token, caller_id=caller_id, record=record)
+        session_registry.launch(record, room_url, bot)
 
         # Return connection details
         return JSONResponse(
@@ -1312,7 +1635,14 @@ async def start_session(request: Request):
             }
         )
 
-    except Exception as e:
+    except (Exception, asyncio.CancelledError) as e:
+        if record.task is None:
+            if worker is not None:
+                session_worker_pool.release(worker, record)
+            session_registry.discard(record)
+        if isinstance(e, asyncio.CancelledError):
+            # Client went away while the room was being created
+            raise
         logger.error(f"Error starting session: {e}")
         return JSONResponse(
             status_code=500,
@@ -1349,7 +1679,8 @@ async def upload_guardrails(request: GuardrailsRequest):
         ]
     }
     
-    These question-answer pairs will be included in the system prompt for all future conversations.
+    These question-answer pairs will be used in all future conversations: included in the system
+    prompt, or retrieved per user question once there are many of them (see GUARDRAIL_INJECTION_MODE).
     When a user asks a question similar to any uploaded question, the agent will respond in the manner specified.
     """
     try:
@@ -1378,10 +1709,9 @@ async def upload_guardrails(request: GuardrailsRequest):
                 "answer": answer
             })
         
-        # Store guardrails (replace existing ones)
-        with guardrails_lock:
-            guardrails_storage.clear()
-            guardrails_storage.extend(validated_guardrails)
+        # Store guardrails (replace existing ones). Store writes take its write lock and
+        # may wait on SQLite, so like the import they run in a thread, never on the loop
+        await asyncio.to_thread(guardrails_store.replace, validated_guardrails)
         
         logger.info(f"Successfully uploaded {len(validated_guardrails)} guardrail(s)")
         
@@ -1400,30 +1730,139 @@ async def upload_guardrails(request: GuardrailsRequest):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match header covers `etag`"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
 @app.get("/guardrails")
-async def get_guardrails():
+async def get_guardrails(request: Request, offset: int = 0, limit: Optional[int] = None):
     """
     Get all currently stored guardrails (question-answer pairs).
-    Returns guardrails with their indices for easy deletion.
+    Returns guardrails with their stable ids (and current indices, for the legacy delete route).
+    
+    Pass `offset`/`limit` to page through large lists. Responses carry an ETag:
+    send it back in If-None-Match to get a 304 when nothing has changed.
     """
-    with guardrails_lock:
-        # Include index with each guardrail for easier deletion
-        guardrails_with_index = [
-            {
-                "index": idx,
-                "question": guardrail.get("question", ""),
-                "answer": guardrail.get("answer", "")
-            }
-            for idx, guardrail in enumerate(guardrails_storage)
-        ]
+    snapshot = guardrails_store.snapshot
+    etag = guardrails_store.etag(snapshot)
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    if offset < 0 or (limit is not None and limit < 1):
+        raise HTTPException(status_code=400, detail="offset must be >= 0 and limit >= 1")
+    
+    end = len(snapshot) if limit is None else min(len(snapshot), offset + limit)
+    # Include index with each guardrail for easier deletion
+    guardrails_with_index = [
+        {
+            "index": idx,
+            "id": snapshot.items[idx]["id"],
+            "question": snapshot.items[idx].get("question", ""),
+            "answer": snapshot.items[idx].get("answer", "")
+        }
+        for idx in range(offset, end)
+    ]
+    
+    content = {
+        "status": "success",
+        "guardrails": guardrails_with_index,
+        "count": len(snapshot),
+        "version": snapshot.version
+    }
+    if limit is not None:
+        content["offset"] = offset
+        content["next_offset"] = end if end < len(snapshot) else None
+    
+    return JSONResponse(content=content, headers={"ETag": etag})
+
+
+@app.get("/guardrails/export")
+async def export_guardrails(request: Request, fmt: str = Query("ndjson", alias="format")):
+    """
+    Stream all guardrails as NDJSON (default) or CSV (`?format=csv`) without
+    building the whole response in memory. Supports If-None-Match like GET /guardrails.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(IMPORT_FORMATS)}")
+    snapshot = guardrails_store.snapshot
+    etag = guardrails_store.etag(snapshot)
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    return StreamingResponse(
+        iter_export(snapshot.items, fmt),
+        media_type="text/csv" if fmt == "csv" else "application/x-ndjson",
+        headers={"ETag": etag, "Content-Disposition": f'attachment; filename="guardrails.{fmt}"'},
+    )
+
+
+@app.post("/guardrails/import")
+async def import_guardrails(
+    request: Request,
+    fmt: Optional[str] = Query(None, alias="format"),
+    mode: str = "upsert",
+):
+    """
+    Bulk import guardrails from an NDJSON or CSV request body (not a JSON array).
+    
+    - NDJSON: one {"question": ..., "answer": ...} object per line
+    - CSV: a header row with question and answer columns
+    
+    The format defaults from the Content-Type (text/csv means CSV). `mode` is
+    replace, append or upsert (default). Rows are validated one by one; if any row
+    is invalid the response lists the per-row errors and nothing is applied.
+    Otherwise all rows are applied in a single transaction.
+    """
+    if fmt is None:
+        fmt = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(IMPORT_FORMATS)}")
+    
+    # Spool the body as it arrives: small uploads stay in memory, large ones go to disk
+    body = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    try:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > GUARDRAILS_IMPORT_MAX_BYTES:
+                raise HTTPException(status_code=413, detail=f"Import is larger than {GUARDRAILS_IMPORT_MAX_BYTES} bytes")
+            body.write(chunk)
+        body.seek(0)
         
+        # Parsing and applying are CPU-bound for large files - keep them off the event loop
+        rows = await asyncio.to_thread(parse_guardrail_rows, body, fmt)
+        counts = await asyncio.to_thread(guardrails_store.import_rows, rows, mode)
+    except ImportErrors as e:
         return JSONResponse(
+            status_code=400,
             content={
-                "status": "success",
-                "guardrails": guardrails_with_index,
-                "count": len(guardrails_storage)
+                "status": "error",
+                "message": f"Import rejected: {e.error_count} of {e.total_rows} row(s) are invalid; nothing was applied",
+                "errors": e.errors
             }
         )
+    except GuardrailConflictError as e:
+        raise HTTPException(status_code=409, detail=f"{e}; nothing was applied")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        body.close()
+    
+    logger.info(f"Imported {len(rows)} guardrail row(s) ({mode}): {counts}")
+    
+    return JSONResponse(
+        content={
+            "status": "success",
+            "rows": len(rows),
+            **counts,
+            "count": len(guardrails_store.snapshot),
+            "version": guardrails_store.version
+        }
+    )
 
 
 @app.delete("/guardrails/{index}")
@@ -1432,17 +1871,18 @@ async def delete_guardrail_by_index(index: int):
     Delete a specific guardrail by its index (0-based).
     
     Use GET /guardrails first to see the list of guardrails and their indices.
+    Indices shift after every delete - prefer DELETE /guardrails/by-id/{guardrail_id}.
     """
     try:
-        with guardrails_lock:
-            if index < 0 or index >= len(guardrails_storage):
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Guardrail at index {index} not found. There are {len(guardrails_storage)} guardrail(s) (indices 0-{len(guardrails_storage)-1 if guardrails_storage else 0})."
-                )
-            
-            deleted_guardrail = guardrails_storage.pop(index)
-            logger.info(f"Deleted guardrail at index {index}: {deleted_guardrail.get('question', '')[:50]}...")
+        deleted_guardrail = await asyncio.to_thread(guardrails_store.remove_at, index)
+        if deleted_guardrail is None:
+            count = len(guardrails_store.snapshot)
+            raise HTTPException(
+                status_code=404,
+                detail=f"Guardrail at index {index} not found. There are {count} guardrail(s) (indices 0-{count-1 if count else 0})."
+            )
+        
+        logger.info(f"Deleted guardrail at index {index}: {deleted_guardrail.get('question', '')[:50]}...")
         
         return JSONResponse(
             content={
@@ -1467,6 +1907,7 @@ class DeleteGuardrailRequest(BaseModel):
 async def delete_guardrail_by_question(request: DeleteGuardrailRequest):
     """
     Delete a guardrail by matching the question text (case-insensitive, partial match supported).
+    Exact matches are a hash lookup; partial matching is only tried when there is none.
     
     Request body:
     {
@@ -1480,33 +1921,15 @@ async def delete_guardrail_by_question(request: DeleteGuardrailRequest):
         if not question_to_delete:
             raise HTTPException(status_code=400, detail="Question cannot be empty")
         
-        with guardrails_lock:
-            deleted_index = None
-            deleted_guardrail = None
-            
-            # Find the guardrail by matching question (case-insensitive)
-            for idx, guardrail in enumerate(guardrails_storage):
-                if guardrail.get("question", "").strip().lower() == question_to_delete.lower():
-                    deleted_index = idx
-                    deleted_guardrail = guardrails_storage.pop(idx)
-                    break
-            
-            if deleted_index is None:
-                # Try partial match if exact match not found
-                for idx, guardrail in enumerate(guardrails_storage):
-                    guardrail_question = guardrail.get("question", "").strip().lower()
-                    if question_to_delete.lower() in guardrail_question or guardrail_question in question_to_delete.lower():
-                        deleted_index = idx
-                        deleted_guardrail = guardrails_storage.pop(idx)
-                        break
-            
-            if deleted_index is None:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"No guardrail found matching question: '{request.question}'. Use GET /guardrails to see all available guardrails."
-                )
-            
-            logger.info(f"Deleted guardrail at index {deleted_index} matching question: {question_to_delete[:50]}...")
+        removed = await asyncio.to_thread(guardrails_store.remove_by_question, question_to_delete)
+        if removed is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No guardrail found matching question: '{request.question}'. Use GET /guardrails to see all available guardrails."
+            )
+        
+        deleted_index, deleted_guardrail = removed
+        logger.info(f"Deleted guardrail at index {deleted_index} matching question: {question_to_delete[:50]}...")
         
         return JSONResponse(
             content={
@@ -1524,14 +1947,137 @@ async def delete_guardrail_by_question(request: DeleteGuardrailRequest):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+class GuardrailUpdateRequest(BaseModel):
+    question: Optional[str] = None
+    answer: Optional[str] = None
+
+
+def _validated_guardrail_text(value: Optional[str], field: str) -> Optional[str]:
+    if value is None:
+        return None
+    value = value.strip()
+    if not value:
+        raise HTTPException(status_code=400, detail=f"Guardrail {field} cannot be empty")
+    return value
+
+
+@app.post("/guardrails")
+async def append_guardrail(request: GuardrailItem):
+    """
+    Add one guardrail without replacing the others.
+    
+    Returns 409 if a guardrail with the same question (ignoring case and punctuation) exists;
+    use PATCH /guardrails to overwrite its answer instead.
+    """
+    question = _validated_guardrail_text(request.question, "question")
+    answer = _validated_guardrail_text(request.answer, "answer")
+    try:
+        guardrail = await asyncio.to_thread(guardrails_store.append, question, answer)
+    except GuardrailConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    logger.info(f"Added guardrail {guardrail['id']}: {question[:50]}...")
+    
+    return JSONResponse(
+        status_code=201,
+        content={
+            "status": "success",
+            "guardrail": guardrail,
+            "version": guardrails_store.version
+        }
+    )
+
+
+@app.patch("/guardrails")
+async def upsert_guardrail(request: GuardrailItem):
+    """
+    Set the answer for a question: updates the guardrail with that question
+    (ignoring case and punctuation) or adds it if there is none.
+    """
+    question = _validated_guardrail_text(request.question, "question")
+    answer = _validated_guardrail_text(request.answer, "answer")
+    guardrail, created = await asyncio.to_thread(guardrails_store.upsert, question, answer)
+    
+    logger.info(f"{'Added' if created else 'Updated'} guardrail {guardrail['id']}: {question[:50]}...")
+    
+    return JSONResponse(
+        status_code=201 if created else 200,
+        content={
+            "status": "success",
+            "created": created,
+            "guardrail": guardrail,
+            "version": guardrails_store.version
+        }
+    )
+
+
+@app.get("/guardrails/by-id/{guardrail_id}")
+async def get_guardrail_by_id(guardrail_id: str):
+    """Get one guardrail by its id"""
+    guardrail = guardrails_store.get(guardrail_id)
+    if guardrail is None:
+        raise HTTPException(status_code=404, detail=f"Guardrail {guardrail_id} not found")
+    
+    return JSONResponse(content={"status": "success", "guardrail": guardrail})
+
+
+@app.patch("/guardrails/by-id/{guardrail_id}")
+async def update_guardrail_by_id(guardrail_id: str, request: GuardrailUpdateRequest):
+    """
+    Change the question and/or answer of one guardrail.
+    
+    Request body (either field may be omitted):
+    {
+        "question": "What is your refund policy?",
+        "answer": "We offer a full refund within 30 days of enrollment..."
+    }
+    """
+    question = _validated_guardrail_text(request.question, "question")
+    answer = _validated_guardrail_text(request.answer, "answer")
+    if question is None and answer is None:
+        raise HTTPException(status_code=400, detail="Provide a question and/or an answer to update")
+    try:
+        guardrail = await asyncio.to_thread(guardrails_store.update, guardrail_id, question=question, answer=answer)
+    except GuardrailConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if guardrail is None:
+        raise HTTPException(status_code=404, detail=f"Guardrail {guardrail_id} not found")
+    
+    logger.info(f"Updated guardrail {guardrail_id}")
+    
+    return JSONResponse(
+        content={
+            "status": "success",
+            "guardrail": guardrail,
+            "version": guardrails_store.version
+        }
+    )
+
+
+@app.delete("/guardrails/by-id/{guardrail_id}")
+async def delete_guardrail_by_id(guardrail_id: str):
+    """Delete one guardrail by its id"""
+    deleted_guardrail = await asyncio.to_thread(guardrails_store.remove, guardrail_id)
+    if deleted_guardrail is None:
+        raise HTTPException(status_code=404, detail=f"Guardrail {guardrail_id} not found")
+    
+    logger.info(f"Deleted guardrail {guardrail_id}: {deleted_guardrail.get('question', '')[:50]}...")
+    
+    return JSONResponse(
+        content={
+            "status": "success",
+            "message": f"Successfully deleted guardrail {guardrail_id}",
+            "deleted_guardrail": deleted_guardrail
+        }
+    )
+
+
 @app.delete("/guardrails")
 async def clear_guardrails():
     """
     Clear all stored guardrails.
     """
-    with guardrails_lock:
-        count = len(guardrails_storage)
-        guardrails_storage.clear()
+    count = await asyncio.to_thread(guardrails_store.clear)
     
     logger.info(f"Cleared {count} guardrail(s)")
     
@@ -1546,7 +2092,243 @@ async def clear_guardrails():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "ok"}
+    dependencies = {
+        "preprocessor": preprocessor_endpoint.breaker.state,
+        "postprocessor": postprocessor_endpoint.breaker.state,
+    }
+    # Still serving calls while a dependency's circuit is open, just without that feature
+    status = "ok" if all(state == CircuitBreaker.CLOSED for state in dependencies.values()) else "degraded"
+    sessions = session_registry.capacity()
+    if session_worker_pool:
+        workers_ready = session_worker_pool.stats()["ready"]
+        sessions["workers_ready"] = workers_ready
+        sessions["accepting"] = sessions["accepting"] and session_worker_pool.has_capacity()
+        if workers_ready < SESSION_WORKERS:
+            status = "degraded"
+    if warm_bot_pool:
+        sessions["warm_bots_ready"] = warm_bot_pool.stats()["ready"]
+    return {"status": status, "dependencies": dependencies, "sessions": sessions}
+
+
+@app.get("/sessions")
+async def list_sessions():
+    """Bots running in this process, oldest first"""
+    return {**session_registry.capacity(), "sessions": session_registry.sessions()}
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Runtime metrics for monitoring"""
+    return {
+        "sessions": session_registry.stats(),
+        "silero_vad": silero_vad.stats(),
+        "vad_batching": vad_batcher.stats() if VAD_BATCHING else None,
+        "session_workers": session_worker_pool.stats() if session_worker_pool else None,
+        "daily_room_pool": daily_room_pool.stats() if daily_room_pool else None,
+        "warm_bot_pool": warm_bot_pool.stats() if warm_bot_pool else None,
+        "http_clients": http_clients.stats(),
+        "mongo": mongo.stats() if mongo else None,
+        "user_cache": user_cache.stats(),
+        "detailed_info_jobs": detailed_info_jobs.stats(),
+        "summary_cache": await asyncio.to_thread(summary_cache.stats),
+        "preprocessor": preprocessor_endpoint.stats(),
+        "postprocessor": postprocessor_endpoint.stats(),
+        "transcript_outbox": await asyncio.to_thread(transcript_outbox.stats),
+        "prompt_assembler": prompt_assembler.stats(),
+        "prompt_size": prompt_size_history.stats(),
+        "guardrails": {
+            "count": len(guardrails_store.snapshot),
+            "version": guardrails_store.version,
+            "reloads": guardrails_store.reloads,
+            "injection": "retrieval" if use_guardrail_retrieval(len(guardrails_store.snapshot)) else "prompt",
+        },
+        "guardrail_retrieval": guardrail_retriever.stats(),
+        "branch_knowledge": {
+            "branches": len(branch_knowledge.index),
+            "reloads": branch_knowledge.reloads,
+        },
+        "knowledge_base": knowledge_base.stats(),
+    }
+
+
+@app.get("/prompt/budget")
+async def get_prompt_budget(threshold: float = Query(0.75, ge=0.1, le=1.0), max_guardrails: int = Query(50, ge=0)):
+    """Estimated token counts of the system instruction a new session would get, by section"""
+    snapshot = guardrails_store.snapshot
+    in_prompt = not use_guardrail_retrieval(len(snapshot))
+    parts = prompt_assembler.parts(include_guardrails=in_prompt)
+    # Near-duplicate detection is CPU work proportional to the guardrail count
+    return await asyncio.to_thread(
+        analyze_prompt,
+        *parts,
+        guardrails=snapshot.items,
+        guardrails_in_prompt=in_prompt,
+        max_guardrails=max_guardrails,
+        duplicate_threshold=threshold,
+    )
+
+
+@app.delete("/cache/summaries")
+async def clear_summary_cache(query: Optional[str] = None):
+    """
+    Invalidate cached preprocessor summaries.
+    
+    Pass a `query` parameter to drop one query, or nothing to clear the whole cache.
+    """
+    removed = await summary_cache.invalidate(query)
+    
+    logger.info(f"Invalidated {removed} cached summary(ies)")
+    
+    return JSONResponse(
+        content={
+            "status": "success",
+            "message": f"Invalidated {removed} cached summary(ies)",
+            "count": removed
+        }
+    )
+
+
+@app.delete("/cache/users")
+async def clear_user_cache(phone_number: Optional[str] = None, email: Optional[str] = None):
+    """
+    Invalidate cached user lookups.
+    
+    Pass `phone_number` and/or `email` query parameters to drop specific entries,
+    or neither to clear the whole cache.
+    """
+    if phone_number or email:
+        removed = invalidate_user_cache(phone_number=phone_number, email=email)
+    else:
+        removed = user_cache.clear()
+    
+    logger.info(f"Invalidated {removed} cached user lookup(s)")
+    
+    return JSONResponse(
+        content={
+            "status": "success",
+            "message": f"Invalidated {removed} cached user lookup(s)",
+            "count": removed
+        }
+    )
+
+
+# Fire-and-forget startup tasks, referenced here so they are not garbage-collected mid-run
+startup_tasks: Set[asyncio.Task] = set()
+
+
+def _startup_task_done(task: asyncio.Task):
+    startup_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Startup task {task.get_name()} failed: {task.exception()}")
+
+
+async def start_services(session_worker: bool = False):
+    """Start the subsystems shared by the API and calls (also run by each session worker)"""
+    await http_clients.start()
+    if not SESSION_WORKERS or session_worker:
+        await asyncio.to_thread(silero_vad.load)
+        if VAD_BATCHING:
+            vad_batcher.start()
+    await asyncio.to_thread(guardrails_store.load)
+    guardrails_store.start_watching(GUARDRAILS_WATCH_INTERVAL_SECS)
+    logger.info(f"Loaded {len(guardrails_store.snapshot)} guardrail(s) (version {guardrails_store.version}, backend: {GUARDRAILS_BACKEND})")
+    if use_guardrail_retrieval(len(guardrails_store.snapshot)):
+        await asyncio.to_thread(guardrail_retriever.refresh)
+    try:
+        knowledge_base.load(KNOWLEDGE_BASE_DIR)
+    except OSError as e:
+        logger.error(f"Error loading knowledge base from {KNOWLEDGE_BASE_DIR}: {e}")
+    detailed_info_jobs.start()
+    transcript_outbox.start()
+    if SUMMARY_CACHE_WARMUP_FILE and not session_worker:
+        try:
+            await warm_summary_cache(load_warmup_queries(SUMMARY_CACHE_WARMUP_FILE))
+        except Exception as e:
+            logger.error(f"Error warming summary cache from {SUMMARY_CACHE_WARMUP_FILE}: {e}")
+    if mongo:
+        mongo.start()
+        # Verify connectivity once in the background instead of pinging per lookup
+        ping = asyncio.create_task(mongo.ping(), name="mongodb-ping")
+        startup_tasks.add(ping)
+        ping.add_done_callback(_startup_task_done)
+        if MONGODB_ENSURE_INDEXES and not session_worker:
+            try:
+                await mongo.run(ensure_user_indexes)
+            except Exception as e:
+                logger.error(f"Error ensuring MongoDB indexes: {e}", exc_info=True)
+
+
+async def stop_services():
+    """Stop what start_services started"""
+    for task in list(startup_tasks):
+        task.cancel()
+    # Let in-flight deliveries finish before their HTTP client is closed
+    await detailed_info_jobs.stop()
+    await transcript_outbox.stop()
+    transcript_outbox.close()
+    summary_cache.close()
+    await guardrails_store.stop_watching()
+    guardrails_store.close()
+    await http_clients.close()
+    vad_batcher.stop()
+    if mongo:
+        mongo.close()
+
+
+@app.on_event("startup")
+async def on_startup():
+    """Start background subsystems"""
+    global daily_room_pool, session_worker_pool, warm_bot_pool
+    await start_services()
+    if SESSION_WORKERS > 0:
+        session_worker_pool = SessionWorkerPool(
+            SESSION_WORKERS,
+            app_module=__name__ if __name__ != "__main__" else os.path.splitext(os.path.basename(__file__))[0],
+            max_sessions_per_worker=session_registry.max_sessions,
+            heartbeat_timeout=float(os.getenv("SESSION_WORKER_HEARTBEAT_TIMEOUT_SECS", "15")),
+        )
+        session_worker_pool.start()
+        if session_registry.max_sessions > 0:
+            session_registry.max_sessions *= SESSION_WORKERS
+    if DAILY_ROOM_POOL_MAX_SIZE > 0:
+        daily_room_pool = DailyRoomPool(
+            create_daily_room,
+            min_size=DAILY_ROOM_POOL_MIN_SIZE,
+            max_size=DAILY_ROOM_POOL_MAX_SIZE,
+            refill_interval=DAILY_ROOM_POOL_REFILL_INTERVAL_SECS,
+            refill_batch=DAILY_ROOM_POOL_REFILL_BATCH,
+            room_ttl=DAILY_ROOM_EXPIRY_SECS,
+            min_remaining=DAILY_ROOM_POOL_MIN_REMAINING_SECS,
+        )
+        daily_room_pool.start()
+    if WARM_BOT_POOL_SIZE > 0:
+        if session_worker_pool:
+            logger.warning("WARM_BOT_POOL_SIZE is ignored when SESSION_WORKERS > 0")
+        else:
+            warm_bot_pool = WarmBotPool(
+                lambda bot: run_bot(bot.room.room_url, bot.room.token, warm_bot=bot),
+                acquire_warm_bot_room,
+                size=WARM_BOT_POOL_SIZE,
+                idle_timeout=WARM_BOT_IDLE_TIMEOUT_SECS,
+                warmup_timeout=WARM_BOT_WARMUP_TIMEOUT_SECS,
+                min_room_remaining=DAILY_ROOM_POOL_MIN_REMAINING_SECS,
+                version=lambda: guardrails_store.version,
+            )
+            warm_bot_pool.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Stop background subsystems"""
+    # Running calls first, so their transcripts reach the outbox before it stops
+    if session_worker_pool:
+        await session_worker_pool.stop()
+    await session_registry.shutdown()
+    if warm_bot_pool:
+        await warm_bot_pool.stop()
+    if daily_room_pool:
+        await daily_room_pool.stop()
+    await stop_services()
 
 
 if __name__ == "__main__":
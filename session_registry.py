@@ -0,0 +1,184 @@
+import asyncio
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Deque, Dict, List, Optional
+
+from loguru import logger
+
+
+class SessionCapacityError(Exception):
+    """Raised when no session slot is free (and none freed up within the queue timeout)"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"At capacity, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+@dataclass
+class SessionRecord:
+    session_id: str
+    room_url: Optional[str] = None
+    # starting -> waiting (bot in the room, no caller yet) -> active -> ending
+    state: str = "starting"
+    started_at: float = field(default_factory=time.time)
+    task: Optional[asyncio.Task] = None
+    # Worker process running the call (multi-process mode only)
+    worker: Optional[int] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "room_url": self.room_url,
+            "state": self.state,
+            "worker": self.worker,
+            "started_at": round(self.started_at, 3),
+            "age_secs": round(time.time() - self.started_at, 1),
+        }
+
+
+class SessionRegistry:
+    """
+    Tracks every running bot task and caps how many run at once in this process.
+
+    `admit()` takes a slot before any work is done for a new call (so a full
+    process never creates a room it cannot serve) and `launch()` starts the bot
+    task holding that slot. The slot is freed when the task finishes - or by
+    `discard()` if the call never got started. When full, `admit()` either fails
+    fast or waits up to `queue_timeout` seconds behind at most `max_waiters` other
+    callers; a freed slot is handed to the oldest waiter.
+
+    `max_sessions` <= 0 means unlimited (tracking only).
+    """
+
+    def __init__(self, max_sessions: int = 0, queue_timeout: float = 0.0, max_waiters: int = 10, retry_after: int = 5):
+        self.max_sessions = max_sessions
+        self.queue_timeout = queue_timeout
+        self.max_waiters = max_waiters
+        self.retry_after = retry_after
+        self._sessions: Dict[str, SessionRecord] = {}
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Slots freed and handed to a woken waiter that has not registered yet
+        self._handoffs = 0
+
+        # Metrics
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    @property
+    def available(self) -> Optional[int]:
+        if self.max_sessions <= 0:
+            return None
+        return max(0, self.max_sessions - len(self._sessions) - self._handoffs)
+
+    def _register(self) -> SessionRecord:
+        record = SessionRecord(uuid.uuid4().hex)
+        self._sessions[record.session_id] = record
+        self.admitted += 1
+        return record
+
+    async def admit(self) -> SessionRecord:
+        """Reserve a slot for a new call; raises SessionCapacityError when full"""
+        if self.available != 0 and not self._waiters:
+            return self._register()
+
+        if self.queue_timeout <= 0 or len(self._waiters) >= self.max_waiters:
+            self.rejected += 1
+            raise SessionCapacityError(self.retry_after)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            # Gave up just as a slot was handed over: pass it on
+            if waiter.done() and not waiter.cancelled():
+                self._handoffs -= 1
+                self._wake_next()
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected += 1
+                raise SessionCapacityError(self.retry_after)
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        # The finished session's slot was handed over to us in _wake_next()
+        self._handoffs -= 1
+        return self._register()
+
+    def launch(self, record: SessionRecord, room_url: str, bot: Awaitable) -> asyncio.Task:
+        """Run `bot` (a coroutine, or an already running task) as the task for an admitted session; its slot is released when it ends"""
+        record.room_url = room_url
+        record.task = asyncio.ensure_future(bot)
+        record.task.add_done_callback(lambda task: self._finished(record, task))
+        return record.task
+
+    def discard(self, record: SessionRecord):
+        """Give back the slot of an admitted session that was never launched"""
+        self._release(record)
+
+    def _finished(self, record: SessionRecord, task: asyncio.Task):
+        if task.cancelled():
+            self.completed += 1
+        elif task.exception() is not None:
+            # run_bot logs its own errors; this only keeps the exception from going unretrieved
+            self.failed += 1
+        else:
+            self.completed += 1
+        self._release(record)
+        logger.info(f"Session {record.session_id} ended after {time.time() - record.started_at:.0f}s ({len(self)} running)")
+
+    def _release(self, record: SessionRecord):
+        if self._sessions.pop(record.session_id, None) is not None:
+            self._wake_next()
+
+    def _wake_next(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._handoffs += 1
+                waiter.set_result(None)
+                break
+
+    def sessions(self) -> List[Dict[str, Any]]:
+        return [record.as_dict() for record in sorted(self._sessions.values(), key=lambda record: record.started_at)]
+
+    def capacity(self) -> Dict[str, Any]:
+        return {
+            "running": len(self._sessions),
+            "max": self.max_sessions if self.max_sessions > 0 else None,
+            "available": self.available,
+            "waiting": len(self._waiters),
+            "accepting": self.available != 0 or (self.queue_timeout > 0 and len(self._waiters) < self.max_waiters),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.capacity(),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+    async def shutdown(self, timeout: float = 10.0):
+        """Cancel running bots and wait for their cleanup (leaving their rooms)"""
+        tasks = [record.task for record in self._sessions.values() if record.task is not None]
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.cancel()
+        if not tasks:
+            return
+        logger.info(f"Cancelling {len(tasks)} running session(s)")
+        for task in tasks:
+            task.cancel()
+        await asyncio.wait(tasks, timeout=timeout)
@@ -0,0 +1,384 @@
+import asyncio
+import importlib
+import multiprocessing
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+# Messages are tuples over a multiprocessing Pipe, (kind, *args):
+#   supervisor -> worker: ("start", session_id, room_url, token, caller_id), ("cancel", session_id), ("stop",)
+#   worker -> supervisor: ("ready",), ("heartbeat", {session_id: state}), ("ended", session_id, error or None)
+
+
+def _load_app_module(name: str):
+    # Under "spawn" the supervisor's __main__ (e.g. `python server.py`) is already
+    # imported as __mp_main__ - reuse it rather than initializing the module twice
+    main = sys.modules.get("__mp_main__")
+    main_file = getattr(main, "__file__", None)
+    if main_file and os.path.splitext(os.path.basename(main_file))[0] == name:
+        return main
+    return importlib.import_module(name)
+
+
+def worker_main(worker_id: int, conn, app_module: str, heartbeat_interval: float):
+    """Entry point of a session worker process"""
+    app = _load_app_module(app_module)
+    logger.info(f"Session worker {worker_id} starting (pid {os.getpid()})")
+    try:
+        asyncio.run(_SessionWorker(worker_id, conn, app, heartbeat_interval).run())
+    except KeyboardInterrupt:
+        pass
+    logger.info(f"Session worker {worker_id} stopped")
+
+
+class _SessionWorker:
+    """
+    Runs bots in a worker process with the app module's own registry and services.
+
+    The app module must provide `start_services(session_worker=True)`,
+    `stop_services()`, `run_bot(room_url, token, caller_id=, record=)` and
+    `session_registry`.
+    """
+
+    def __init__(self, worker_id: int, conn, app, heartbeat_interval: float):
+        self.worker_id = worker_id
+        self._conn = conn
+        self._app = app
+        self._heartbeat_interval = heartbeat_interval
+        self._sessions: Dict[str, Any] = {}  # supervisor session id -> local SessionRecord
+        # Sessions still waiting in registry.admit(), and those of them cancelled meanwhile
+        self._admitting: Set[str] = set()
+        self._cancelled: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+
+    def _send(self, *message):
+        try:
+            self._conn.send(message)
+        except (OSError, ValueError):
+            # Supervisor is gone
+            self._stopping.set()
+
+    def _on_readable(self):
+        try:
+            while self._conn.poll():
+                self._handle(self._conn.recv())
+        except (EOFError, OSError):
+            logger.warning(f"Session worker {self.worker_id} lost its supervisor, stopping")
+            self._stopping.set()
+
+    def _handle(self, message: Tuple):
+        kind = message[0]
+        if kind == "start":
+            # Marked before the task first runs, so a "cancel" right behind it is not lost
+            self._admitting.add(message[1])
+            task = asyncio.create_task(self._start_session(*message[1:]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        elif kind == "cancel":
+            session_id = message[1]
+            if session_id in self._admitting:
+                # Acted on once admit() returns
+                self._cancelled.add(session_id)
+                return
+            record = self._sessions.get(session_id)
+            if record is not None and record.task is not None:
+                record.task.cancel()
+        elif kind == "stop":
+            self._stopping.set()
+
+    async def _start_session(self, session_id: str, room_url: str, token: str, caller_id: Optional[str]):
+        registry = self._app.session_registry
+        try:
+            record = await registry.admit()
+        except Exception as e:
+            self._send("ended", session_id, f"worker {self.worker_id} rejected the session: {e}")
+            return
+        finally:
+            self._admitting.discard(session_id)
+        if session_id in self._cancelled:
+            self._cancelled.discard(session_id)
+            registry.discard(record)
+            self._send("ended", session_id, None)
+            return
+        self._sessions[session_id] = record
+        task = registry.launch(record, room_url, self._app.run_bot(room_url, token, caller_id=caller_id, record=record))
+        task.add_done_callback(lambda task: self._session_ended(session_id, task))
+
+    def _session_ended(self, session_id: str, task: asyncio.Task):
+        self._sessions.pop(session_id, None)
+        error = None
+        if not task.cancelled() and task.exception() is not None:
+            error = repr(task.exception())
+        self._send("ended", session_id, error)
+
+    async def _heartbeat(self):
+        while not self._stopping.is_set():
+            self._send("heartbeat", {session_id: record.state for session_id, record in self._sessions.items()})
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self._heartbeat_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        loop.add_reader(self._conn.fileno(), self._on_readable)
+        await self._app.start_services(session_worker=True)
+        self._send("ready")
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            await self._stopping.wait()
+        finally:
+            loop.remove_reader(self._conn.fileno())
+            heartbeat.cancel()
+            # Sessions still waiting for admission are never launched
+            for task in list(self._tasks):
+                task.cancel()
+            # Calls still running end here; their transcripts are queued in the shared outbox
+            await self._app.session_registry.shutdown()
+            await self._app.stop_services()
+
+
+class _WorkerHandle:
+    def __init__(self, worker_id: int, process, conn, restarts: int):
+        self.worker_id = worker_id
+        self.process = process
+        self.conn = conn
+        self.restarts = restarts
+        self.started_at = time.monotonic()
+        self.last_heartbeat = 0.0
+        self.ready = False
+        self.alive = True
+        # session id -> (supervisor SessionRecord, future resolved when the session ends)
+        self.sessions: Dict[str, Tuple[Any, asyncio.Future]] = {}
+
+
+class SessionWorkerPool:
+    """
+    Supervisor side of the multi-process mode: runs `worker_count` worker processes,
+    each with its own event loop and bot pipelines, so per-call CPU work (VAD,
+    resampling) is spread over cores instead of sharing the API's event loop.
+
+    `reserve()` places a call on the least-loaded ready worker and `run_session()`
+    runs it there, completing when the call ends, so the supervisor's
+    SessionRegistry keeps counting and listing calls as in single-process mode. Workers report session states in
+    heartbeats; one that exits or stops sending heartbeats for `heartbeat_timeout`
+    seconds is killed and restarted with backoff, failing only its own calls.
+    """
+
+    def __init__(
+        self,
+        worker_count: int,
+        app_module: str = "server",
+        max_sessions_per_worker: int = 0,
+        heartbeat_interval: float = 1.0,
+        heartbeat_timeout: float = 15.0,
+        start_timeout: float = 120.0,
+        max_restart_backoff: float = 30.0,
+    ):
+        self.worker_count = worker_count
+        self.app_module = app_module
+        self.max_sessions_per_worker = max_sessions_per_worker
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.start_timeout = start_timeout
+        self.max_restart_backoff = max_restart_backoff
+        # spawn: a clean interpreter per worker (no forked event loop, threads or sockets)
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: Dict[int, _WorkerHandle] = {}
+        self._monitor: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        # Metrics
+        self.dispatched = 0
+        self.worker_failures = 0
+        self.lost_sessions = 0
+
+    def start(self):
+        for worker_id in range(self.worker_count):
+            self._spawn(worker_id, restarts=0)
+        self._monitor = asyncio.create_task(self._monitor_loop())
+        logger.info(f"Started {self.worker_count} session worker process(es)")
+
+    def _spawn(self, worker_id: int, restarts: int):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=worker_main,
+            args=(worker_id, child_conn, self.app_module, self.heartbeat_interval),
+            name=f"session-worker-{worker_id}",
+        )
+        process.start()
+        child_conn.close()
+        handle = _WorkerHandle(worker_id, process, parent_conn, restarts)
+        self._workers[worker_id] = handle
+        asyncio.get_running_loop().add_reader(parent_conn.fileno(), self._on_readable, handle)
+
+    def _on_readable(self, handle: _WorkerHandle):
+        try:
+            while handle.conn.poll():
+                self._handle(handle, handle.conn.recv())
+        except (EOFError, OSError):
+            self._worker_lost(handle, "closed its pipe")
+
+    def _handle(self, handle: _WorkerHandle, message: Tuple):
+        kind = message[0]
+        if kind == "ready":
+            handle.ready = True
+            handle.last_heartbeat = time.monotonic()
+            logger.info(f"Session worker {handle.worker_id} ready (pid {handle.process.pid})")
+        elif kind == "heartbeat":
+            handle.last_heartbeat = time.monotonic()
+            for session_id, state in message[1].items():
+                entry = handle.sessions.get(session_id)
+                if entry is not None:
+                    entry[0].state = state
+        elif kind == "ended":
+            entry = handle.sessions.get(message[1])
+            if entry is not None and not entry[1].done():
+                if message[2]:
+                    entry[1].set_exception(RuntimeError(message[2]))
+                else:
+                    entry[1].set_result(None)
+
+    def _load(self, handle: _WorkerHandle) -> int:
+        return len(handle.sessions)
+
+    def _pick(self) -> Optional[_WorkerHandle]:
+        candidates = [
+            handle for handle in self._workers.values()
+            if handle.alive and handle.ready
+            and (self.max_sessions_per_worker <= 0 or self._load(handle) < self.max_sessions_per_worker)
+        ]
+        return min(candidates, key=self._load) if candidates else None
+
+    def has_capacity(self) -> bool:
+        return self._pick() is not None
+
+    def reserve(self, record) -> Optional[_WorkerHandle]:
+        """
+        Claim a slot for `record` on the least-loaded ready worker, or return None if
+        none has room. Synchronous, so concurrent /start requests cannot all pass a
+        capacity check and then find no worker once their room exists.
+        """
+        handle = self._pick()
+        if handle is not None:
+            handle.sessions[record.session_id] = (record, asyncio.get_running_loop().create_future())
+            record.worker = handle.worker_id
+        return handle
+
+    def release(self, handle: _WorkerHandle, record):
+        """Give back a reservation whose call was never started"""
+        entry = handle.sessions.pop(record.session_id, None)
+        if entry is not None and entry[1].done() and not entry[1].cancelled():
+            # Failed by a worker loss; nobody will await it
+            entry[1].exception()
+
+    async def run_session(self, handle: _WorkerHandle, record, room_url: str, token: str, caller_id: Optional[str] = None):
+        """Run one call on the worker reserved for it with `reserve()`; returns when it ends there"""
+        entry = handle.sessions.get(record.session_id)
+        if entry is None:
+            raise RuntimeError(f"Session {record.session_id} has no reservation on worker {handle.worker_id}")
+        done = entry[1]
+        self.dispatched += 1
+        record.state = "dispatched"
+        try:
+            # Already failed if the worker was lost since the reservation
+            if not done.done():
+                handle.conn.send(("start", record.session_id, room_url, token, caller_id))
+            await done
+        except asyncio.CancelledError:
+            if handle.alive:
+                try:
+                    handle.conn.send(("cancel", record.session_id))
+                except OSError:
+                    pass
+            raise
+        finally:
+            handle.sessions.pop(record.session_id, None)
+
+    def _worker_lost(self, handle: _WorkerHandle, reason: str):
+        if not handle.alive:
+            return
+        handle.alive = False
+        asyncio.get_running_loop().remove_reader(handle.conn.fileno())
+        if handle.process.is_alive():
+            handle.process.kill()
+        handle.conn.close()
+        for _record, done in list(handle.sessions.values()):
+            if not done.done():
+                done.set_exception(RuntimeError(f"Session worker {handle.worker_id} {reason}"))
+        if self._stopping:
+            return
+
+        self.worker_failures += 1
+        self.lost_sessions += len(handle.sessions)
+        logger.error(f"Session worker {handle.worker_id} {reason}; failed {len(handle.sessions)} call(s), restarting it")
+        backoff = min(self.max_restart_backoff, 2 ** handle.restarts) if handle.restarts else 0
+        asyncio.get_running_loop().call_later(backoff, self._restart, handle.worker_id, handle.restarts + 1)
+
+    def _restart(self, worker_id: int, restarts: int):
+        if self._stopping:
+            return
+        handle = self._workers.get(worker_id)
+        handle.process.join(timeout=0)
+        self._spawn(worker_id, restarts)
+
+    async def _monitor_loop(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            now = time.monotonic()
+            for handle in list(self._workers.values()):
+                if not handle.alive:
+                    continue
+                if not handle.process.is_alive():
+                    self._worker_lost(handle, f"exited with code {handle.process.exitcode}")
+                elif handle.ready and now - handle.last_heartbeat > self.heartbeat_timeout:
+                    self._worker_lost(handle, f"sent no heartbeat for {now - handle.last_heartbeat:.0f}s")
+                elif not handle.ready and now - handle.started_at > self.start_timeout:
+                    self._worker_lost(handle, f"did not start within {self.start_timeout:.0f}s")
+                elif handle.ready and now - handle.started_at > self.max_restart_backoff * 4:
+                    # Stable again: the next crash restarts immediately
+                    handle.restarts = 0
+
+    async def stop(self, timeout: float = 20.0):
+        """Ask workers to end their calls and exit; kill any still running after `timeout`"""
+        self._stopping = True
+        if self._monitor:
+            self._monitor.cancel()
+        handles = [handle for handle in self._workers.values() if handle.alive]
+        for handle in handles:
+            try:
+                handle.conn.send(("stop",))
+            except OSError:
+                pass
+        deadline = time.monotonic() + timeout
+        while any(handle.process.is_alive() for handle in handles) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        for handle in handles:
+            self._worker_lost(handle, "stopped")
+            handle.process.join(timeout=1)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        workers: List[Dict[str, Any]] = [
+            {
+                "worker_id": handle.worker_id,
+                "pid": handle.process.pid,
+                "alive": handle.alive,
+                "ready": handle.ready,
+                "sessions": self._load(handle),
+                "restarts": handle.restarts,
+                "heartbeat_age_secs": round(now - handle.last_heartbeat, 1) if handle.ready else None,
+            }
+            for handle in sorted(self._workers.values(), key=lambda handle: handle.worker_id)
+        ]
+        return {
+            "workers": workers,
+            "ready": sum(1 for worker in workers if worker["alive"] and worker["ready"]),
+            "dispatched": self.dispatched,
+            "worker_failures": self.worker_failures,
+            "lost_sessions": self.lost_sessions,
+        }
@@ -0,0 +1,277 @@
+import time
+import weakref
+from collections import deque
+from importlib import resources
+from threading import Condition, Event, Lock, Thread
+from typing import Deque, Dict, List, Optional
+
+import numpy as np
+from loguru import logger
+from pipecat.audio.vad.silero import SileroOnnxModel, SileroVADAnalyzer
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams
+
+from background_jobs import percentile
+
+
+def silero_model_path() -> str:
+    """Path of the Silero VAD ONNX model bundled with pipecat"""
+    return str(resources.files("pipecat.audio.vad.data").joinpath("silero_vad.onnx"))
+
+
+class SileroModelManager:
+    """
+    Loads the Silero VAD ONNX model once per process and hands out per-stream models.
+
+    Each stream gets its own SileroOnnxModel state (a 2x1x128 RNN state and a
+    64-sample context, ~1 KB) over the one shared onnxruntime InferenceSession,
+    whose run() is safe to call from several analyzer threads at once. A new
+    call then costs an object copy instead of parsing and initializing the model.
+    """
+
+    def __init__(self, model_path: Optional[str] = None):
+        self.model_path = model_path
+        self._base: Optional[SileroOnnxModel] = None
+        self._lock = Lock()
+        self._streams: "weakref.WeakSet[SileroOnnxModel]" = weakref.WeakSet()
+
+        # Metrics
+        self.load_ms = 0.0
+        self.streams_created = 0
+
+    def load(self) -> SileroOnnxModel:
+        """Load the model if not loaded yet (blocking; call at startup)"""
+        if self._base is None:
+            with self._lock:
+                if self._base is None:
+                    started = time.perf_counter()
+                    self._base = SileroOnnxModel(self.model_path or silero_model_path(), force_onnx_cpu=True)
+                    self.load_ms = (time.perf_counter() - started) * 1000
+                    logger.info(f"Loaded Silero VAD model in {self.load_ms:.0f}ms")
+        return self._base
+
+    def stream(self) -> SileroOnnxModel:
+        """A model with fresh per-stream state sharing the loaded inference session"""
+        model = SileroOnnxModel.__new__(SileroOnnxModel)
+        base = self.load()
+        model.session = base.session
+        model.sample_rates = base.sample_rates
+        model.reset_states()
+        self._streams.add(model)
+        self.streams_created += 1
+        return model
+
+    @property
+    def active_streams(self) -> int:
+        return len(self._streams)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "loaded": self._base is not None,
+            "load_ms": round(self.load_ms, 1),
+            "streams_created": self.streams_created,
+            "streams_active": len(self._streams),
+        }
+
+
+class SharedSileroVADAnalyzer(SileroVADAnalyzer):
+    """SileroVADAnalyzer that takes its model from a SileroModelManager instead of loading one"""
+
+    def __init__(self, manager: SileroModelManager, *, sample_rate: Optional[int] = None, params: Optional[VADParams] = None):
+        # Skip SileroVADAnalyzer.__init__, which loads the model file
+        VADAnalyzer.__init__(self, sample_rate=sample_rate, params=params)
+        self._model = manager.stream()
+        self._last_reset_time = 0
+
+
+class _VADRequest:
+    __slots__ = ("model", "audio", "sample_rate", "enqueued_at", "claimed", "done", "result", "error")
+
+    def __init__(self, model: SileroOnnxModel, audio: np.ndarray, sample_rate: int):
+        self.model = model
+        self.audio = audio
+        self.sample_rate = sample_rate
+        self.enqueued_at = time.monotonic()
+        self.claimed = False
+        self.done = Event()
+        self.result = None
+        self.error: Optional[Exception] = None
+
+
+class _BatchedStream:
+    """Per-stream model handle whose calls go through a BatchedVADEngine"""
+
+    def __init__(self, engine: "BatchedVADEngine", model: SileroOnnxModel):
+        self._engine = engine
+        self.model = model
+
+    def __call__(self, x, sr: int):
+        return self._engine.infer(self.model, x, sr)
+
+    def reset_states(self, batch_size: int = 1):
+        self.model.reset_states(batch_size)
+
+
+class BatchedVADEngine:
+    """
+    Runs the VAD frames of all calls in the process through one batched ONNX call.
+
+    Analyzer threads submit a frame with its stream's model state and block; a
+    single batcher thread waits until every active stream has a frame queued (or
+    `max_batch` frames), but never longer than `max_wait_ms` after the oldest one,
+    then stacks the frames and RNN states into one session.run() and scatters the
+    probabilities and new states back. A frame not picked up within `timeout_ms`
+    is run on its own by the submitting thread, so batching adds at most that much
+    to any frame - and so to speech start/stop detection.
+    """
+
+    def __init__(self, manager: SileroModelManager, max_wait_ms: float = 4.0, max_batch: int = 64, timeout_ms: float = 20.0):
+        self._manager = manager
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch = max_batch
+        self.timeout = timeout_ms / 1000
+        self._queue: Deque[_VADRequest] = deque()
+        self._condition = Condition()
+        self._thread: Optional[Thread] = None
+        self._running = False
+        self._waits: Deque[float] = deque(maxlen=1000)
+
+        # Metrics
+        self.batches = 0
+        self.frames = 0
+        self.inline_fallbacks = 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._manager.load()
+        self._running = True
+        self._thread = Thread(target=self._run, name="vad-batcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Batched VAD started (max wait {self.max_wait * 1000:.1f}ms, max batch {self.max_batch})")
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def stream(self) -> _BatchedStream:
+        return _BatchedStream(self, self._manager.stream())
+
+    def infer(self, model: SileroOnnxModel, x, sr: int):
+        """Probability for one frame of `model`'s stream; blocks until its batch has run"""
+        if not self._running:
+            return model(x, sr)
+        request = _VADRequest(model, np.asarray(x, dtype=np.float32).reshape(-1), sr)
+        with self._condition:
+            self._queue.append(request)
+            self._condition.notify()
+
+        if not request.done.wait(self.timeout):
+            with self._condition:
+                inline = not request.claimed
+                if inline:
+                    request.claimed = True
+                    self._queue.remove(request)
+                    self.inline_fallbacks += 1
+            if inline:
+                # Batcher is behind: run this frame alone (outside the lock) rather than delay the call
+                return model(x, sr)
+            # Already in a running batch
+            request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _next_batch(self) -> List[_VADRequest]:
+        with self._condition:
+            while self._running and not self._queue:
+                self._condition.wait()
+            if not self._running:
+                return []
+            target = min(self.max_batch, max(1, self._manager.active_streams))
+            deadline = self._queue[0].enqueued_at + self.max_wait
+            while self._running and len(self._queue) < target:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            batch = []
+            while self._queue and len(batch) < self.max_batch:
+                request = self._queue.popleft()
+                request.claimed = True
+                batch.append(request)
+            return batch
+
+    def _run(self):
+        while self._running:
+            batch = self._next_batch()
+            if not batch:
+                continue
+            now = time.monotonic()
+            for request in batch:
+                self._waits.append(now - request.enqueued_at)
+            by_rate: Dict[int, List[_VADRequest]] = {}
+            for request in batch:
+                by_rate.setdefault(request.sample_rate, []).append(request)
+            for sample_rate, requests in by_rate.items():
+                try:
+                    self._run_batch(requests, sample_rate)
+                except Exception as e:
+                    for request in requests:
+                        request.error = e
+                finally:
+                    for request in requests:
+                        request.done.set()
+
+    def _run_batch(self, requests: List[_VADRequest], sr: int):
+        num_samples = 512 if sr == 16000 else 256
+        context_size = 64 if sr == 16000 else 32
+        inputs, states = [], []
+        for request in requests:
+            model = request.model
+            if sr not in model.sample_rates or request.audio.shape[0] != num_samples:
+                raise ValueError(f"Batched VAD needs {num_samples}-sample frames at 8000 or 16000 Hz")
+            # Same state handling as SileroOnnxModel.__call__, for a batch of one stream
+            if model._last_batch_size != 1 or (model._last_sr and model._last_sr != sr):
+                model.reset_states(1)
+            context = model._context if model._context.shape[1] else np.zeros((1, context_size), dtype=np.float32)
+            inputs.append(np.concatenate((context, request.audio[np.newaxis, :]), axis=1))
+            states.append(model._state)
+
+        x = np.concatenate(inputs, axis=0)
+        out, state = requests[0].model.session.run(
+            None, {"input": x, "state": np.concatenate(states, axis=1), "sr": np.array(sr, dtype="int64")}
+        )
+        for i, request in enumerate(requests):
+            model = request.model
+            model._state = state[:, i:i + 1, :].copy()
+            model._context = x[i:i + 1, -context_size:].copy()
+            model._last_sr = sr
+            model._last_batch_size = 1
+            request.result = out[i:i + 1]
+        self.batches += 1
+        self.frames += len(requests)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "running": self._running,
+            "batches": self.batches,
+            "frames": self.frames,
+            "mean_batch_size": round(self.frames / self.batches, 2) if self.batches else 0.0,
+            "inline_fallbacks": self.inline_fallbacks,
+            "queue_wait_p50_ms": round(percentile(self._waits, 0.5) * 1000, 3),
+            "queue_wait_p95_ms": round(percentile(self._waits, 0.95) * 1000, 3),
+        }
+
+
+class BatchedSileroVADAnalyzer(SileroVADAnalyzer):
+    """SileroVADAnalyzer whose inference runs in a BatchedVADEngine with other calls' frames"""
+
+    def __init__(self, engine: BatchedVADEngine, *, sample_rate: Optional[int] = None, params: Optional[VADParams] = None):
+        VADAnalyzer.__init__(self, sample_rate=sample_rate, params=params)
+        # voice_confidence() and its periodic reset_states() work unchanged on the stream handle
+        self._model = engine.stream()
+        self._last_reset_time = 0
@@ -0,0 +1,164 @@
+import asyncio
+import os
+import re
+import sqlite3
+import time
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from loguru import logger
+
+from ttl_cache import TTLCache
+
+
+def normalize_query(query: str) -> str:
+    """Normalize query text into a cache key (lowercase, punctuation stripped, single spaces)"""
+    query = re.sub(r"[^\w\s]", " ", (query or "").lower())
+    return " ".join(query.split())
+
+
+class SummaryCache:
+    """
+    Cache of preprocessor summaries keyed by normalized query text.
+
+    Summaries are held in an in-memory TTL/LRU cache backed by an optional SQLite
+    file, so they survive restarts. Only the spoken summary is cached; delivery to
+    a student's WhatsApp/email is a per-request side effect and is never cached.
+
+    Memory hits are answered on the event loop. Disk reads and writes run in a
+    thread (asyncio.to_thread), serialized on the connection by a lock, and the
+    file is pruned to its TTL and size limit every `prune_every` writes rather
+    than on each one.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 500,
+        ttl: float = 86400.0,
+        db_path: Optional[str] = None,
+        max_disk_entries: int = 5000,
+        prune_every: int = 100,
+    ):
+        self._memory = TTLCache(max_size=max_size, ttl=ttl)
+        self.ttl = ttl
+        self.max_disk_entries = max_disk_entries
+        self.prune_every = prune_every
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = Lock()
+        self._writes_since_prune = 0
+        self.disk_hits = 0
+
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS summaries (key TEXT PRIMARY KEY, query TEXT, summary TEXT, stored_at REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS summaries_stored_at ON summaries (stored_at)")
+            self._db.commit()
+
+    def _read(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._db_lock:
+            return self._db.execute("SELECT summary, stored_at FROM summaries WHERE key = ?", (key,)).fetchone()
+
+    def _write(self, key: str, query: str, summary: str, prune: bool):
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO summaries (key, query, summary, stored_at) VALUES (?, ?, ?, ?)",
+                (key, query, summary, time.time()),
+            )
+            if prune:
+                # Keep the file bounded: drop expired rows and the oldest rows over the limit
+                # (both range deletes on the stored_at index)
+                self._db.execute("DELETE FROM summaries WHERE stored_at < ?", (time.time() - self.ttl,))
+                self._db.execute(
+                    "DELETE FROM summaries WHERE stored_at < "
+                    "(SELECT stored_at FROM summaries ORDER BY stored_at DESC LIMIT 1 OFFSET ?)",
+                    (self.max_disk_entries - 1,),
+                )
+            self._db.commit()
+
+    def _delete(self, key: Optional[str]) -> int:
+        with self._db_lock:
+            if key is None:
+                count = self._db.execute("DELETE FROM summaries").rowcount
+            else:
+                count = self._db.execute("DELETE FROM summaries WHERE key = ?", (key,)).rowcount
+            self._db.commit()
+            return count
+
+    async def get(self, query: str) -> Optional[str]:
+        key = normalize_query(query)
+        if not key:
+            return None
+        hit, summary = self._memory.get(key)
+        if hit:
+            return summary
+
+        if self._db is not None:
+            try:
+                row = await asyncio.to_thread(self._read, key)
+            except sqlite3.Error as e:
+                logger.error(f"Error reading summary cache from disk: {e}")
+                return None
+            if row and row[1] + self.ttl > time.time():
+                self.disk_hits += 1
+                # Promote to memory for the remaining lifetime
+                self._memory.set(key, row[0], ttl=row[1] + self.ttl - time.time())
+                return row[0]
+        return None
+
+    async def contains(self, query: str) -> bool:
+        return await self.get(query) is not None
+
+    async def set(self, query: str, summary: str):
+        key = normalize_query(query)
+        if not key or not summary:
+            return
+        self._memory.set(key, summary)
+
+        if self._db is not None:
+            self._writes_since_prune += 1
+            prune = self._writes_since_prune >= self.prune_every
+            if prune:
+                self._writes_since_prune = 0
+            try:
+                await asyncio.to_thread(self._write, key, query, summary, prune)
+            except sqlite3.Error as e:
+                logger.error(f"Error writing summary cache to disk: {e}")
+
+    async def invalidate(self, query: Optional[str] = None) -> int:
+        """Drop one query, or everything when `query` is None"""
+        if query is None:
+            count = self._memory.clear()
+            if self._db is not None:
+                count = max(count, await asyncio.to_thread(self._delete, None))
+            return count
+
+        key = normalize_query(query)
+        removed = int(self._memory.invalidate(key))
+        if self._db is not None:
+            removed = max(removed, await asyncio.to_thread(self._delete, key))
+        return removed
+
+    def close(self):
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and disk size (blocking; async callers use asyncio.to_thread)"""
+        stats = self._memory.stats()
+        stats["disk_hits"] = self.disk_hits
+        if self._db is not None:
+            with self._db_lock:
+                stats["disk_size"] = self._db.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        return stats
+
+
+def load_warmup_queries(path: str) -> list:
+    """Read warm-up queries from a file: one query per line, blank lines and # comments ignored"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
@@ -0,0 +1,62 @@
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resilience import CircuitBreaker, CircuitOpenError, ResilientEndpoint  # noqa: E402
+
+
+def open_endpoint() -> ResilientEndpoint:
+    endpoint = ResilientEndpoint("test", max_attempts=1, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.0))
+    endpoint.breaker.record_failure()
+    assert endpoint.breaker.state == CircuitBreaker.HALF_OPEN
+    return endpoint
+
+
+def test_cancelled_half_open_trial_releases_the_trial_slot():
+    async def scenario():
+        endpoint = open_endpoint()
+        started = asyncio.Event()
+
+        async def hangs(timeout):
+            started.set()
+            await asyncio.sleep(3600)
+
+        trial = asyncio.create_task(endpoint.call(hangs))
+        await started.wait()
+        # While the trial runs, other calls fail fast
+        with pytest.raises(CircuitOpenError):
+            await endpoint.call(hangs)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        # Not counted as a failure (no re-open) nor a success (still half-open)
+        assert endpoint.breaker.state == CircuitBreaker.HALF_OPEN
+        assert endpoint.breaker.times_opened == 1
+
+        async def succeeds(timeout):
+            return "ok"
+
+        assert await endpoint.call(succeeds) == "ok"
+        assert endpoint.breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_failed_half_open_trial_reopens_the_circuit():
+    async def scenario():
+        endpoint = open_endpoint()
+
+        async def fails(timeout):
+            raise httpx.ConnectError("down")
+
+        with pytest.raises(httpx.ConnectError):
+            await endpoint.call(fails)
+        assert endpoint.breaker.times_opened == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,66 @@
+import heapq
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+from summary_cache import normalize_query
+
+# Words too common in student questions to say anything about which entry matches
+STOPWORDS = frozenset(
+    """
+    a an and are as at be but by can could do does did for from how i if in into is it its
+    me my of on or please should so tell than that the their them there these they this to
+    us was we what when where which who why will with would you your
+    """.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens with punctuation and stopwords removed"""
+    return [token for token in normalize_query(text).split() if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    In-memory Okapi BM25 index over a fixed list of documents.
+
+    Built once (O(total tokens)); a search only touches the posting lists of the
+    query's terms, so it stays fast as the collection grows. Rebuild the index
+    when the documents change.
+    """
+
+    def __init__(self, documents: Sequence[str], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self._doc_lengths: List[int] = []
+
+        for doc_id, document in enumerate(documents):
+            tokens = tokenize(document)
+            self._doc_lengths.append(len(tokens))
+            for term, frequency in Counter(tokens).items():
+                self._postings[term].append((doc_id, frequency))
+
+        count = len(self._doc_lengths)
+        self._avg_length = (sum(self._doc_lengths) / count) if count else 0.0
+        self._idf = {
+            term: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def search(self, query: str, k: int = 5, min_score: float = 0.0) -> List[Tuple[int, float]]:
+        """Return up to `k` (doc_id, score) pairs, best first"""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf[term]
+            for doc_id, frequency in postings:
+                norm = 1 - self.b + self.b * (self._doc_lengths[doc_id] / self._avg_length) if self._avg_length else 1.0
+                scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + self.k1 * norm)
+        best = heapq.nlargest(k, scores.items(), key=lambda entry: entry[1])
+        return [(doc_id, score) for doc_id, score in best if score >= min_score]
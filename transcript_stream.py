@@ -0,0 +1,103 @@
+import asyncio
+import json
+import os
+from collections import deque
+from typing import Deque, Dict, Iterator, Optional
+
+from loguru import logger
+
+SPEAKER_LABELS = {
+    "user": "User",
+    "assistant": "Natalie (Agent)",
+    "note": "Note",
+}
+
+
+def read_transcript(path: str) -> Iterator[Dict[str, str]]:
+    """Yield the turns stored in a transcript spool file"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def format_transcript(path: str) -> str:
+    """Render a transcript spool file in the "Speaker: text" format the postprocessor expects"""
+    return "\n".join(
+        f"{SPEAKER_LABELS.get(turn.get('role'), turn.get('role', 'Unknown'))}: {turn.get('content', '')}"
+        for turn in read_transcript(path)
+    )
+
+
+class TranscriptStream:
+    """
+    Per-call transcript written incrementally while the call is in progress.
+
+    Finalized turns are buffered in a bounded deque and appended to a JSONL spool
+    file every `flush_turns` turns or `flush_interval` seconds, so memory stays flat
+    for long calls and hang-up only has to flush the last few turns. The spool file
+    is what gets uploaded to the postprocessor after the call.
+    """
+
+    def __init__(self, path: str, flush_turns: int = 10, flush_interval: float = 5.0, max_buffered_turns: int = 500):
+        self.path = path
+        self.flush_turns = flush_turns
+        self.flush_interval = flush_interval
+        self._buffer: Deque[Dict[str, str]] = deque(maxlen=max_buffered_turns)
+        self._task: Optional[asyncio.Task] = None
+        self.turns = 0
+        self.flushed_turns = 0
+        self.dropped_turns = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def add(self, role: str, content: str, timestamp: Optional[str] = None):
+        """Record one finalized turn"""
+        content = (content or "").strip()
+        if not content:
+            return
+        if len(self._buffer) == self._buffer.maxlen:
+            # Only happens if flushing keeps failing; the oldest unflushed turn is lost
+            self.dropped_turns += 1
+        self._buffer.append({"role": role, "content": content, "timestamp": timestamp or ""})
+        self.turns += 1
+        if len(self._buffer) >= self.flush_turns:
+            self.flush()
+
+    def flush(self) -> int:
+        """Append buffered turns to the spool file. Returns the number of turns written."""
+        if not self._buffer:
+            return 0
+        turns = list(self._buffer)
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(turn, ensure_ascii=False) + "\n" for turn in turns))
+        except OSError as e:
+            logger.error(f"Error flushing transcript to {self.path}: {e}")
+            return 0
+        self._buffer.clear()
+        self.flushed_turns += len(turns)
+        return len(turns)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def close(self) -> int:
+        """Stop periodic flushing and write the final delta. Returns the number of turns written."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        return self.flush()
+
+    def discard(self):
+        """Remove the spool file (e.g. when the transcript is sent some other way)"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
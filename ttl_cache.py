@@ -0,0 +1,88 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Bounded in-process cache with per-entry TTL and LRU eviction.
+
+    `None` values are treated as negative results and expire after `negative_ttl`,
+    which is usually much shorter than the TTL for positive results. Meant to be used
+    from the event loop thread only, so it takes no locks.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: float = 3600.0, negative_ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+        # Metrics
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (True, value) on a hit (value may be None for a cached negative) or (False, None)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        if value is None:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+        return True, value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        if self.max_size <= 0:
+            return
+        if ttl is None:
+            ttl = self.negative_ttl if value is None else self.ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+            return True
+        return False
+
+    def clear(self) -> int:
+        count = len(self._entries)
+        self._entries.clear()
+        self.invalidations += count
+        return count
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,285 @@
+import asyncio
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Coroutine, Deque, Dict, Optional, Set, Tuple
+
+from loguru import logger
+
+from background_jobs import percentile
+from daily_rooms import PooledRoom
+from session_registry import SessionRecord
+
+
+async def _all_set(events: Tuple[asyncio.Event, ...]):
+    for event in events:
+        await event.wait()
+
+
+@dataclass(eq=False)
+class WarmBot:
+    """A bot already running in a room, waiting for /start to hand it a call"""
+    room: PooledRoom
+    # Prompt inputs the bot was built with (the guardrails version); stale bots are retired
+    version: Any = None
+    bot_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    created_at: float = field(default_factory=time.monotonic)
+    ready_at: Optional[float] = None
+    task: Optional[asyncio.Task] = None
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    # Resolved with (caller_id, record) when bound to a call, or None when retired
+    _binding: asyncio.Future = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+
+    @property
+    def bound(self) -> bool:
+        return self._binding.done() and self._binding.result() is not None
+
+    def bind(self, caller_id: Optional[str], record: SessionRecord):
+        self._binding.set_result((caller_id, record))
+
+    def retire(self):
+        """Make the bot leave its room without ever taking a call"""
+        if not self._binding.done():
+            self._binding.set_result(None)
+
+    async def wait_for_call(self, running: asyncio.Task, *ready: asyncio.Event) -> Optional[Tuple[Optional[str], SessionRecord]]:
+        """
+        Called by the bot itself once its pipeline task is `running`: marks the bot
+        ready when all `ready` events are set, then waits for a call. Returns
+        (caller_id, record), or None if the bot was retired or its pipeline ended.
+        """
+        warmed = asyncio.ensure_future(_all_set(ready))
+        try:
+            await asyncio.wait({warmed, running, self._binding}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            warmed.cancel()
+        if warmed.cancelled() or running.done() or self._binding.done():
+            # Retired, or the pipeline failed, before becoming ready
+            return None
+
+        self.ready_at = time.monotonic()
+        self.ready.set()
+        await asyncio.wait({running, self._binding}, return_when=asyncio.FIRST_COMPLETED)
+        if not self._binding.done():
+            return None
+        return self._binding.result()
+
+
+class WarmBotPool:
+    """
+    Keeps up to `size` bots joined to a room with their LLM session open, so /start
+    hands a caller a bot that is already listening instead of building one.
+
+    A refill loop warms bots until `size` are ready or warming. `acquire()` pops
+    the oldest ready bot in O(1), or returns None on a miss and the caller starts
+    a bot the usual way. Ready bots are retired after `idle_timeout` seconds (keep
+    it below the Live session's and the pipeline's own idle limits), when their
+    `version` no longer matches (e.g. guardrails changed since their prompt was
+    built) or when their room nears expiry. A retired bot's room goes back to the
+    next warm-up if it still has `min_room_remaining` seconds left.
+    """
+
+    def __init__(
+        self,
+        start_bot: Callable[[WarmBot], Coroutine],
+        acquire_room: Callable[[], Awaitable[PooledRoom]],
+        size: int = 2,
+        idle_timeout: float = 240.0,
+        warmup_timeout: float = 20.0,
+        refill_interval: float = 5.0,
+        min_room_remaining: int = 900,
+        version: Callable[[], Any] = lambda: None,
+    ):
+        """
+        Args:
+            start_bot: Coroutine running a bot for a WarmBot until its call (or retirement) ends.
+            acquire_room: Coroutine returning a room for a new warm bot.
+            size: Number of warm bots to keep (ready + warming).
+            idle_timeout: Seconds a ready bot may wait for a call before it is replaced.
+            warmup_timeout: Seconds a bot may take to become ready before it is given up on.
+            refill_interval: Seconds between retirement/refill passes.
+            min_room_remaining: Rooms with less lifetime left than this are not used.
+            version: Returns the current prompt version; bots built for another one are retired.
+        """
+        self._start_bot = start_bot
+        self._acquire_room = acquire_room
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.warmup_timeout = warmup_timeout
+        self.refill_interval = refill_interval
+        self.min_room_remaining = min_room_remaining
+        self._version = version
+
+        self._ready: Deque[WarmBot] = deque()
+        self._warming: Set[WarmBot] = set()
+        self._spare_rooms: Deque[PooledRoom] = deque()
+        self._warmups: Set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._warmup_secs: Deque[float] = deque(maxlen=200)
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.warmed = 0
+        self.warmup_failures = 0
+        self.retired_idle = 0
+        self.retired_stale = 0
+        self.rooms_reused = 0
+
+    def _room_usable(self, room: PooledRoom, now: float) -> bool:
+        return room.expires_at - now >= self.min_room_remaining
+
+    def _is_current(self, bot: WarmBot, now: float) -> bool:
+        return (
+            now - bot.ready_at < self.idle_timeout
+            and bot.version == self._version()
+            and self._room_usable(bot.room, time.time())
+        )
+
+    def acquire(self) -> Optional[WarmBot]:
+        """Take a ready bot (to `bind()` to a call), or return None if none is ready"""
+        now = time.monotonic()
+        while self._ready:
+            # Oldest bots sit on the left, so idle ones are retired first
+            bot = self._ready.popleft()
+            if self._is_current(bot, now) and not bot.task.done():
+                self.hits += 1
+                self._wakeup.set()
+                return bot
+            self._retire(bot)
+
+        self.misses += 1
+        self._wakeup.set()
+        return None
+
+    def _retire(self, bot: WarmBot):
+        if bot.version != self._version():
+            self.retired_stale += 1
+        else:
+            self.retired_idle += 1
+        bot.retire()
+
+    def _bot_done(self, bot: WarmBot, task: asyncio.Task):
+        self._warming.discard(bot)
+        if bot in self._ready:
+            self._ready.remove(bot)
+        if bot.bound:
+            # Its call ended; the session registry accounts for it
+            return
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Warm bot {bot.bot_id} failed: {task.exception()}")
+        # The bot has left its room by now; an unused room can host the next one
+        if self._room_usable(bot.room, time.time()):
+            self._spare_rooms.append(bot.room)
+        self._wakeup.set()
+
+    async def _warm_one(self):
+        now = time.time()
+        while self._spare_rooms and not self._room_usable(self._spare_rooms[0], now):
+            self._spare_rooms.popleft()
+        if self._spare_rooms:
+            room = self._spare_rooms.popleft()
+            self.rooms_reused += 1
+        else:
+            room = await self._acquire_room()
+
+        bot = WarmBot(room, self._version())
+        self._warming.add(bot)
+        bot.task = asyncio.create_task(self._start_bot(bot))
+        bot.task.add_done_callback(lambda task: self._bot_done(bot, task))
+        ready = asyncio.ensure_future(bot.ready.wait())
+        try:
+            await asyncio.wait({ready, bot.task}, timeout=self.warmup_timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            ready.cancel()
+            self._warming.discard(bot)
+        if not bot.ready.is_set() or bot.task.done():
+            self.warmup_failures += 1
+            if not bot.task.done():
+                logger.warning(f"Warm bot for {room.room_url} not ready after {self.warmup_timeout:.0f}s, giving up")
+            bot.retire()
+            return
+
+        self.warmed += 1
+        self._warmup_secs.append(bot.ready_at - bot.created_at)
+        self._ready.append(bot)
+        logger.info(f"Warm bot ready in {room.room_url} after {bot.ready_at - bot.created_at:.1f}s ({len(self._ready)} ready)")
+
+    async def refill_once(self):
+        """Retire stale ready bots and start warming replacements"""
+        now = time.monotonic()
+        for bot in [bot for bot in self._ready if not self._is_current(bot, now)]:
+            self._ready.remove(bot)
+            self._retire(bot)
+
+        for _ in range(self.size - len(self._ready) - len(self._warmups)):
+            warmup = asyncio.create_task(self._warm_one())
+            self._warmups.add(warmup)
+            warmup.add_done_callback(self._warmup_done)
+
+    def _warmup_done(self, warmup: asyncio.Task):
+        self._warmups.discard(warmup)
+        if not warmup.cancelled() and warmup.exception() is not None:
+            self.warmup_failures += 1
+            logger.error(f"Failed to warm a bot: {warmup.exception()}")
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refill_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error refilling warm bot pool: {e}", exc_info=True)
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.refill_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        """Start the background refill loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Warm bot pool started (size={self.size}, idle timeout {self.idle_timeout:.0f}s)")
+
+    async def stop(self, timeout: float = 10.0):
+        """Stop refilling and make the idle bots leave their rooms"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        bots = list(self._ready) + list(self._warming)
+        self._ready.clear()
+        for warmup in list(self._warmups):
+            warmup.cancel()
+        for bot in bots:
+            bot.retire()
+        tasks = [bot.task for bot in bots if bot.task is not None]
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": self.size,
+            "ready": len(self._ready),
+            "warming": len(self._warmups),
+            "spare_rooms": len(self._spare_rooms),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "warmed": self.warmed,
+            "warmup_failures": self.warmup_failures,
+            "retired_idle": self.retired_idle,
+            "retired_stale": self.retired_stale,
+            "rooms_reused": self.rooms_reused,
+            "warmup_p50_secs": round(percentile(self._warmup_secs, 0.5), 2),
+            "warmup_p95_secs": round(percentile(self._warmup_secs, 0.95), 2),
+        }